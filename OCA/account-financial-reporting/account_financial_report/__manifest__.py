@@ -18,6 +18,8 @@
     "depends": ["account", "date_range", "report_xlsx"],
     "data": [
         "security/ir.model.access.csv",
+        "security/account_balance_snapshot_security.xml",
+        "data/ir_cron.xml",
         "wizard/aged_partner_balance_wizard_view.xml",
         "wizard/general_ledger_wizard_view.xml",
         "wizard/journal_ledger_wizard_view.xml",
@@ -1,4 +1,6 @@
 from . import account_group
 from . import account
+from . import account_move
 from . import account_move_line
+from . import account_balance_snapshot
 from . import ir_actions_report
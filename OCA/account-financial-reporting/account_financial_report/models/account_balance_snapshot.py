@@ -0,0 +1,314 @@
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl.html).
+
+from datetime import timedelta
+
+from odoo import api, fields, models
+from odoo.osv import expression
+from odoo.tools import date_utils
+
+
+class AccountBalanceSnapshot(models.Model):
+    """Monthly sums of the posted journal items.
+
+    The initial balances of the reports are read from a few rows per account
+    and month instead of the whole history of journal items. The rows are
+    only ever inserted: the amounts of the posted journal items are added as
+    a new row when they are created or posted and subtracted as a new row
+    before they are modified, reset to draft, cancelled or removed, so that
+    concurrent postings never update the same row. A cron merges the rows
+    of each company, account, partner and month.
+    """
+
+    _name = "account.balance.snapshot"
+    _description = "Account Monthly Balance Snapshot"
+    _log_access = False
+    _order = "month, account_id, partner_id"
+
+    company_id = fields.Many2one(
+        comodel_name="res.company", required=True, readonly=True, index=True
+    )
+    account_id = fields.Many2one(
+        comodel_name="account.account",
+        required=True,
+        readonly=True,
+        ondelete="cascade",
+    )
+    partner_id = fields.Many2one(
+        comodel_name="res.partner", readonly=True, ondelete="cascade"
+    )
+    month = fields.Date(
+        required=True, readonly=True, help="First day of the month of the balances."
+    )
+    debit = fields.Float(readonly=True)
+    credit = fields.Float(readonly=True)
+    balance = fields.Float(readonly=True)
+    amount_currency = fields.Float(readonly=True)
+
+    # Domain leaves of account.move.line that have the same meaning
+    # on the snapshots
+    _SNAPSHOT_FIELDS = {
+        "company_id": "company_id",
+        "account_id": "account_id",
+        "partner_id": "partner_id",
+        "account_type": "account_id.account_type",
+        "account_id.account_type": "account_id.account_type",
+    }
+    _STATE_FIELDS = ("move_id.state", "parent_state")
+
+    def init(self):
+        self._cr.execute(
+            """
+            CREATE INDEX IF NOT EXISTS account_balance_snapshot_account_month_index
+            ON account_balance_snapshot (account_id, month)
+            """
+        )
+        self._cr.execute("SELECT 1 FROM account_balance_snapshot LIMIT 1")
+        if not self._cr.fetchone():
+            self._cr.execute(
+                """
+                INSERT INTO account_balance_snapshot (
+                    company_id, account_id, partner_id, month,
+                    debit, credit, balance, amount_currency
+                )
+                SELECT
+                    aml.company_id,
+                    aml.account_id,
+                    aml.partner_id,
+                    date_trunc('month', aml.date)::date,
+                    SUM(aml.debit),
+                    SUM(aml.credit),
+                    SUM(aml.balance),
+                    SUM(aml.amount_currency)
+                FROM account_move_line aml
+                WHERE aml.parent_state = 'posted' AND aml.account_id IS NOT NULL
+                GROUP BY 1, 2, 3, 4
+                """
+            )
+
+    @api.model
+    def _add_move_lines(self, move_lines, sign=1):
+        """Insert the amounts of the posted move lines as new snapshot rows,
+        or their opposite with a negative sign."""
+        if not move_lines:
+            return
+        move_lines.flush_model(
+            [
+                "account_id",
+                "partner_id",
+                "date",
+                "parent_state",
+                "company_id",
+                "debit",
+                "credit",
+                "balance",
+                "amount_currency",
+            ]
+        )
+        self._cr.execute(
+            """
+            INSERT INTO account_balance_snapshot (
+                company_id, account_id, partner_id, month,
+                debit, credit, balance, amount_currency
+            )
+            SELECT
+                aml.company_id,
+                aml.account_id,
+                aml.partner_id,
+                date_trunc('month', aml.date)::date,
+                %(sign)s * SUM(aml.debit),
+                %(sign)s * SUM(aml.credit),
+                %(sign)s * SUM(aml.balance),
+                %(sign)s * SUM(aml.amount_currency)
+            FROM account_move_line aml
+            WHERE aml.id IN %(ids)s
+                AND aml.parent_state = 'posted'
+                AND aml.account_id IS NOT NULL
+            GROUP BY 1, 2, 3, 4
+            """,
+            {"sign": sign, "ids": tuple(move_lines.ids)},
+        )
+        self.invalidate_model()
+
+    @api.model
+    def _cron_compact(self):
+        """Merge the rows of each company, account, partner and month into
+        one, dropping the rows whose amounts cancel out."""
+        self.flush_model()
+        self._cr.execute(
+            """
+            WITH to_compact AS (
+                SELECT company_id, account_id, COALESCE(partner_id, 0) AS partner,
+                    month
+                FROM account_balance_snapshot
+                GROUP BY 1, 2, 3, 4
+                HAVING COUNT(*) > 1
+            ), deleted AS (
+                DELETE FROM account_balance_snapshot s
+                USING to_compact c
+                WHERE s.company_id = c.company_id
+                    AND s.account_id = c.account_id
+                    AND COALESCE(s.partner_id, 0) = c.partner
+                    AND s.month = c.month
+                RETURNING s.company_id, s.account_id, s.partner_id, s.month,
+                    s.debit, s.credit, s.balance, s.amount_currency
+            )
+            INSERT INTO account_balance_snapshot (
+                company_id, account_id, partner_id, month,
+                debit, credit, balance, amount_currency
+            )
+            SELECT
+                company_id,
+                account_id,
+                partner_id,
+                month,
+                SUM(debit),
+                SUM(credit),
+                SUM(balance),
+                SUM(amount_currency)
+            FROM deleted
+            GROUP BY 1, 2, 3, 4
+            HAVING ROUND(SUM(debit)::numeric, 6) != 0
+                OR ROUND(SUM(credit)::numeric, 6) != 0
+                OR ROUND(SUM(amount_currency)::numeric, 6) != 0
+            """
+        )
+        self.invalidate_model()
+
+    @api.model
+    def _parse_date_leaf(self, operator, value, date_from, date_to):
+        """Narrow the [date_from, date_to) range with a leaf on the date.
+
+        Returns None if the operator is not supported.
+        """
+        value = fields.Date.to_date(value)
+        if operator in ("<=", ">"):
+            value += timedelta(days=1)
+        if operator in ("<", "<="):
+            return date_from, min(date_to or value, value)
+        if operator in (">=", ">"):
+            return max(date_from or value, value), date_to
+        return None
+
+    @api.model
+    def _parse_state_leaf(self, operator, value):
+        """Return the states of a leaf on the state of the entries, or None
+        if they cannot be served from the snapshots."""
+        if operator not in ("=", "in"):
+            return None
+        states = set(value) if operator == "in" else {value}
+        if "posted" not in states or not states <= {"posted", "draft"}:
+            return None
+        return states
+
+    @api.model
+    def _get_complete_months(self, date_from, date_to):
+        """Return the (month_from, month_to) range of the months completely
+        in [date_from, date_to), or None if there is none."""
+        if not date_to:
+            return None
+        month_from = date_from and date_utils.start_of(date_from, "month")
+        if month_from and month_from < date_from:
+            month_from = date_utils.add(month_from, months=1)
+        month_to = date_utils.start_of(date_to, "month")
+        if month_from and month_from >= month_to:
+            return None
+        return month_from, month_to
+
+    @api.model
+    def _split_move_line_domain(self, domain):
+        """Split a domain on account.move.line into a domain on the snapshots
+        covering the whole months, and domains on account.move.line for the
+        remaining days and the draft entries.
+
+        Returns None if the domain cannot be served from the snapshots.
+        """
+        date_from = date_to = None
+        # the snapshots only hold posted entries, so the domain must filter
+        # on the state
+        states = None
+        snapshot_domain = []
+        ml_domain = []
+        for leaf in domain:
+            if not isinstance(leaf, (list, tuple)):
+                # only implicit '&' operators are supported
+                return None
+            field_name, operator, value = leaf
+            if field_name == "date":
+                dates = self._parse_date_leaf(operator, value, date_from, date_to)
+                if not dates:
+                    return None
+                date_from, date_to = dates
+                continue
+            if field_name in self._STATE_FIELDS:
+                if states is not None:
+                    return None
+                states = self._parse_state_leaf(operator, value)
+                if not states:
+                    return None
+            elif field_name in self._SNAPSHOT_FIELDS:
+                snapshot_domain.append(
+                    (self._SNAPSHOT_FIELDS[field_name], operator, value)
+                )
+            else:
+                return None
+            ml_domain.append(leaf)
+        months = self._get_complete_months(date_from, date_to)
+        if not months or not states:
+            return None
+        month_from, month_to = months
+        if month_from:
+            snapshot_domain.append(("month", ">=", month_from))
+        snapshot_domain.append(("month", "<", month_to))
+        ml_domains = []
+        if date_from and date_from < month_from:
+            ml_domains.append(
+                ml_domain + [("date", ">=", date_from), ("date", "<", month_from)]
+            )
+        if month_to < date_to:
+            ml_domains.append(
+                ml_domain + [("date", ">=", month_to), ("date", "<", date_to)]
+            )
+        if "draft" in states:
+            draft_domain = [("parent_state", "=", "draft"), ("date", "<", month_to)]
+            if month_from:
+                draft_domain.append(("date", ">=", month_from))
+            ml_domains.append(expression.AND([ml_domain, draft_domain]))
+        return snapshot_domain, ml_domains
+
+    @api.model
+    def _read_group_move_lines(self, domain, fields, groupby, lazy=True):
+        """Same as read_group on account.move.line, the complete months
+        being read from the snapshots when the domain allows it.
+
+        Only the sums of the grouped journal items are returned.
+        """
+        aml_model = self.env["account.move.line"]
+        split = self._split_move_line_domain(domain)
+        if not split:
+            return aml_model.read_group(domain, fields, groupby, lazy=lazy)
+        snapshot_domain, ml_domains = split
+        groups = self.read_group(snapshot_domain, fields, groupby, lazy=lazy)
+        for ml_domain in ml_domains:
+            groups += aml_model.read_group(ml_domain, fields, groupby, lazy=lazy)
+        if not ml_domains:
+            return groups
+        # merge the groups of the snapshots and of the journal items
+        groupby = groupby[:1] if lazy else groupby
+        sum_fields = [
+            spec.split(":")[0] for spec in fields if spec.split(":")[0] not in groupby
+        ]
+        merged = {}
+        for group in groups:
+            key = tuple(
+                group[gb][0] if isinstance(group[gb], tuple) else group[gb]
+                for gb in groupby
+            )
+            if key not in merged:
+                merged[key] = group
+                continue
+            for field_name in sum_fields:
+                if field_name in group:
+                    merged[key][field_name] = (merged[key][field_name] or 0.0) + (
+                        group[field_name] or 0.0
+                    )
+        return list(merged.values())
@@ -0,0 +1,38 @@
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl.html).
+from odoo import models
+
+# Fields of the entries that change the snapshots of their journal items
+SNAPSHOT_FIELDS = {"state", "date", "partner_id", "line_ids"}
+
+
+class AccountMove(models.Model):
+    _inherit = "account.move"
+
+    def write(self, vals):
+        snapshot_fields = SNAPSHOT_FIELDS.intersection(vals)
+        if not snapshot_fields:
+            return super().write(vals)
+        # entries leaving or entering the posted state change the snapshots,
+        # as well as the changes of the posted entries
+        state = vals.get("state")
+        if snapshot_fields == {"state"}:
+            moves = self.filtered(
+                lambda move: (move.state == "posted") != (state == "posted")
+            )
+        else:
+            moves = self.filtered(
+                lambda move: move.state == "posted" or state == "posted"
+            )
+        snapshot_model = self.env["account.balance.snapshot"]
+        snapshot_model._add_move_lines(moves.line_ids, sign=-1)
+        # the journal items created, modified or removed with the entries
+        # are counted here, from their state before and after the write
+        self_skip = self.with_context(skip_balance_snapshot=True)
+        res = super(AccountMove, self_skip).write(vals)
+        snapshot_model._add_move_lines(moves.line_ids)
+        return res
+
+    def unlink(self):
+        self.env["account.balance.snapshot"]._add_move_lines(self.line_ids, sign=-1)
+        self_skip = self.with_context(skip_balance_snapshot=True)
+        return super(AccountMove, self_skip).unlink()
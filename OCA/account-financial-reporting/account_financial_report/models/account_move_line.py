@@ -3,6 +3,17 @@
 from odoo import api, fields, models
 
 
+SNAPSHOT_FIELDS = {
+    "account_id",
+    "partner_id",
+    "date",
+    "debit",
+    "credit",
+    "balance",
+    "amount_currency",
+}
+
+
 class AccountMoveLine(models.Model):
     _inherit = "account.move.line"
 
@@ -49,6 +60,33 @@ class AccountMoveLine(models.Model):
             ON account_move_line (account_id, partner_id)"""
             )
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super().create(vals_list)
+        if not self.env.context.get("skip_balance_snapshot"):
+            self.env["account.balance.snapshot"]._add_move_lines(
+                lines.filtered(lambda line: line.parent_state == "posted")
+            )
+        return lines
+
+    def write(self, vals):
+        skip_snapshot = self.env.context.get("skip_balance_snapshot")
+        if skip_snapshot or not SNAPSHOT_FIELDS.intersection(vals):
+            return super().write(vals)
+        posted_lines = self.filtered(lambda line: line.parent_state == "posted")
+        snapshot_model = self.env["account.balance.snapshot"]
+        snapshot_model._add_move_lines(posted_lines, sign=-1)
+        res = super().write(vals)
+        snapshot_model._add_move_lines(posted_lines)
+        return res
+
+    def unlink(self):
+        if not self.env.context.get("skip_balance_snapshot"):
+            self.env["account.balance.snapshot"]._add_move_lines(
+                self.filtered(lambda line: line.parent_state == "posted"), sign=-1
+            )
+        return super().unlink()
+
     @api.model
     def search_count(self, domain, limit=None):
         # In Big DataBase every time you change the domain widget this method
@@ -18,6 +18,15 @@ class AgedPartnerBalanceReport(models.AbstractModel):
         "name",
     ]
 
+    @api.model
+    def _read_group_initial_balances(self, domain, fields, groupby, lazy=True):
+        """read_group on the journal items of an initial balance, the
+        complete months being read from the monthly balance snapshots
+        when the domain allows it."""
+        return self.env["account.balance.snapshot"]._read_group_move_lines(
+            domain, fields, groupby, lazy=lazy
+        )
+
     @api.model
     def _get_move_lines_domain_not_reconciled(
         self, company_id, account_ids, partner_ids, only_posted_moves, date_from
@@ -16,6 +16,9 @@ class GeneralLedgerReport(models.AbstractModel):
     _description = "General Ledger Report"
     _inherit = "report.account_financial_report.abstract_report"
 
+    # number of move lines read at once when streaming the report
+    _ml_chunk_size = 5000
+
     def _get_analytic_data(self, account_ids):
         analytic_accounts = self.env["account.analytic.account"].browse(account_ids)
         analytic_data = {}
@@ -101,12 +104,12 @@ class GeneralLedgerReport(models.AbstractModel):
         return domain
 
     def _get_accounts_initial_balance(self, initial_domain_bs, initial_domain_pl):
-        gl_initial_acc_bs = self.env["account.move.line"].read_group(
+        gl_initial_acc_bs = self._read_group_initial_balances(
             domain=initial_domain_bs,
             fields=["account_id", "debit", "credit", "balance", "amount_currency:sum"],
             groupby=["account_id"],
         )
-        gl_initial_acc_pl = self.env["account.move.line"].read_group(
+        gl_initial_acc_pl = self._read_group_initial_balances(
             domain=initial_domain_pl,
             fields=["account_id", "debit", "credit", "balance", "amount_currency:sum"],
             groupby=["account_id"],
@@ -136,7 +139,7 @@ class GeneralLedgerReport(models.AbstractModel):
         domain = self._get_initial_balance_fy_pl_ml_domain(
             account_ids, company_id, fy_start_date, base_domain
         )
-        initial_balances = self.env["account.move.line"].read_group(
+        initial_balances = self._read_group_initial_balances(
             domain=domain,
             fields=["account_id", "debit", "credit", "balance", "amount_currency:sum"],
             groupby=["account_id"],
@@ -188,7 +191,7 @@ class GeneralLedgerReport(models.AbstractModel):
         return getattr(self, method)(data, domain, grouped_by)
 
     def _prepare_gen_ld_data_group_partners(self, data, domain, grouped_by):
-        gl_initial_acc_prt = self.env["account.move.line"].read_group(
+        gl_initial_acc_prt = self._read_group_initial_balances(
             domain=domain,
             fields=[
                 "account_id",
@@ -458,9 +461,10 @@ class GeneralLedgerReport(models.AbstractModel):
         )
         if extra_domain:
             domain += extra_domain
-        ml_fields = self._get_ml_fields()
-        move_lines = self.env["account.move.line"].search_read(
-            domain=domain, fields=ml_fields, order="date,move_name"
+        move_lines = (
+            move_line
+            for move_lines in self._iter_period_ml_chunks(domain)
+            for move_line in move_lines
         )
         journal_ids = set()
         full_reconcile_ids = set()
@@ -548,6 +552,57 @@ class GeneralLedgerReport(models.AbstractModel):
             rec_after_date_to_ids,
         )
 
+    def _iter_period_ml_chunks(self, domain, chunk_size=None):
+        """Read the move lines of domain ordered by date and entry, in chunks
+        of chunk_size lines, using keyset pagination instead of an increasing
+        offset. Each chunk is bounded by the date of the last line read, so
+        that the lines of the previous dates are not filtered again."""
+        chunk_size = chunk_size or self._ml_chunk_size
+        ml_fields = self._get_ml_fields()
+        keyset_domain = []
+        while True:
+            move_lines = self.env["account.move.line"].search_read(
+                domain=domain + keyset_domain,
+                fields=ml_fields,
+                order="date, move_name, id",
+                limit=chunk_size,
+            )
+            if not move_lines:
+                break
+            yield move_lines
+            if len(move_lines) < chunk_size:
+                break
+            last = move_lines[-1]
+            # the redundant date leaf bounds the chunk on the date index,
+            # which the OR of the keyset condition cannot use
+            if last["move_name"]:
+                keyset_domain = [
+                    ("date", ">=", last["date"]),
+                    "|",
+                    ("date", ">", last["date"]),
+                    "&",
+                    ("date", "=", last["date"]),
+                    "|",
+                    "|",
+                    ("move_name", ">", last["move_name"]),
+                    ("move_name", "=", False),
+                    "&",
+                    ("move_name", "=", last["move_name"]),
+                    ("id", ">", last["id"]),
+                ]
+            else:
+                # lines without entry name are sorted last within a date
+                keyset_domain = [
+                    ("date", ">=", last["date"]),
+                    "|",
+                    ("date", ">", last["date"]),
+                    "&",
+                    "&",
+                    ("date", "=", last["date"]),
+                    ("move_name", "=", False),
+                    ("id", ">", last["id"]),
+                ]
+
     @api.model
     def _recalculate_cumul_balance(
         self, move_lines, last_cumul_balance, rec_after_date_to_ids
@@ -862,6 +917,261 @@ class GeneralLedgerReport(models.AbstractModel):
             "currency_model": self.env["res.currency"],
         }
 
+    def _can_stream_report_values(self, data):
+        """Whether the report can be produced by _get_report_values_stream().
+
+        Lines grouped by taxes may be listed under several taxes, so that
+        grouping is only available when loading the whole report."""
+        return data["grouped_by"] != "taxes"
+
+    def _add_period_totals(self, item, total, foreign_currency):
+        for key_field in ["credit", "debit", "balance"]:
+            item["fin_bal"][key_field] += total[key_field]
+        if foreign_currency:
+            item["fin_bal"]["bal_curr"] += total["amount_currency"]
+
+    def _iter_stream_move_lines(self, domain, init_balance, stream_data, date_to):
+        """Yield the move lines of domain with their cumulative balance,
+        chunk by chunk, completing the journals, taxes, analytic and
+        reconciliation data of stream_data as they are met."""
+        cumul_balance = init_balance
+        for move_lines in self._iter_period_ml_chunks(domain):
+            journal_ids = set()
+            taxes_ids = set()
+            analytic_ids = set()
+            full_reconcile_ids = set()
+            for move_line in move_lines:
+                journal_ids.add(move_line["journal_id"][0])
+                taxes_ids.update(move_line["tax_ids"])
+                analytic_ids.update(
+                    int(analytic_account)
+                    for analytic_account in move_line["analytic_distribution"] or {}
+                )
+                if move_line["full_reconcile_id"]:
+                    rec_id, rec_name = move_line["full_reconcile_id"]
+                    full_reconcile_ids.add(rec_id)
+                    stream_data["full_reconcile_data"][rec_id] = {
+                        "id": rec_id,
+                        "name": rec_name,
+                    }
+            stream_data["journals_data"].update(
+                self._get_journals_data(
+                    list(journal_ids - set(stream_data["journals_data"]))
+                )
+            )
+            stream_data["taxes_data"].update(
+                self._get_taxes_data(list(taxes_ids - set(stream_data["taxes_data"])))
+            )
+            stream_data["analytic_data"].update(
+                self._get_analytic_data(
+                    list(analytic_ids - set(stream_data["analytic_data"]))
+                )
+            )
+            rec_after_date_to_ids = self._get_reconciled_after_date_to_ids(
+                full_reconcile_ids, date_to
+            )
+            move_lines_data = self._recalculate_cumul_balance(
+                [self._get_move_line_data(move_line) for move_line in move_lines],
+                cumul_balance,
+                rec_after_date_to_ids,
+            )
+            cumul_balance = move_lines_data[-1]["balance"]
+            yield from move_lines_data
+
+    def _iter_general_ledger(
+        self, gen_ld_data, accounts_data, period_domain, data, stream_data
+    ):
+        """Yield the accounts of the general ledger sorted by code, the move
+        lines of each account being read only when they are iterated."""
+        grouped_by = data["grouped_by"]
+        hide_account_at_0 = data["hide_account_at_0"]
+        date_to = data["date_to"]
+        rounding = self.env.company.currency_id.rounding
+        acc_ids = sorted(gen_ld_data, key=lambda acc_id: accounts_data[acc_id]["code"])
+        for acc_id in acc_ids:
+            acc_data = gen_ld_data[acc_id]
+            account_domain = period_domain + [("account_id", "=", acc_id)]
+            account = {
+                "id": acc_id,
+                "code": accounts_data[acc_id]["code"],
+                "name": accounts_data[acc_id]["name"],
+                "type": "account",
+                "currency_id": accounts_data[acc_id]["currency_id"],
+                "centralized": accounts_data[acc_id]["centralized"],
+                "grouped_by": grouped_by,
+                "init_bal": acc_data["init_bal"],
+                "fin_bal": acc_data["fin_bal"],
+            }
+            init_is_zero = float_is_zero(
+                acc_data["init_bal"]["balance"], precision_rounding=rounding
+            )
+            if grouped_by and acc_data[grouped_by]:
+                list_grouped = []
+                for item_id, item_data in acc_data.items():
+                    if not isinstance(item_id, int):
+                        continue
+                    if (
+                        hide_account_at_0
+                        and not item_data["period_count"]
+                        and float_is_zero(
+                            item_data["init_bal"]["balance"],
+                            precision_rounding=rounding,
+                        )
+                    ):
+                        continue
+                    item_domain = account_domain + [
+                        ("partner_id", "=", item_id or False)
+                    ]
+                    list_grouped.append(
+                        {
+                            "id": item_id,
+                            "name": item_data["name"],
+                            "init_bal": item_data["init_bal"],
+                            "fin_bal": item_data["fin_bal"],
+                            "move_lines": self._iter_stream_move_lines(
+                                item_domain,
+                                item_data["init_bal"]["balance"],
+                                stream_data,
+                                date_to,
+                            ),
+                        }
+                    )
+                if hide_account_at_0 and init_is_zero and not list_grouped:
+                    continue
+                account["list_grouped"] = list_grouped
+            else:
+                if hide_account_at_0 and init_is_zero and not acc_data["period_count"]:
+                    continue
+                account[grouped_by] = False
+                account["move_lines"] = self._iter_stream_move_lines(
+                    account_domain,
+                    acc_data["init_bal"]["balance"],
+                    stream_data,
+                    date_to,
+                )
+            if data["centralize"] and account["centralized"]:
+                centralized_ml = self._get_centralized_ml(account, date_to, grouped_by)
+                account["move_lines"] = self._recalculate_cumul_balance(
+                    centralized_ml, acc_data["init_bal"]["balance"], []
+                )
+                if grouped_by and account[grouped_by]:
+                    account[grouped_by] = False
+                    del account["list_grouped"]
+            yield account
+
+    def _get_report_values_stream(self, docids, data):
+        """Same as _get_report_values(), the general ledger being a generator
+        reading the move lines account by account and in chunks, so the
+        memory used does not depend on the number of move lines.
+
+        Journals, taxes, analytic and reconciliation data are completed
+        while the move lines are iterated.
+        """
+        company_id = data["company_id"]
+        partner_ids = data["partner_ids"]
+        foreign_currency = data["foreign_currency"]
+        grouped_by = data["grouped_by"]
+        gen_ld_data = self._get_initial_balance_data(
+            data["account_ids"],
+            partner_ids,
+            company_id,
+            data["date_from"],
+            foreign_currency,
+            data["only_posted_moves"],
+            data["unaffected_earnings_account"],
+            data["fy_start_date"],
+            data["cost_center_ids"],
+            data["domain"],
+            grouped_by,
+        )
+        period_domain = self._get_period_domain(
+            data["account_ids"],
+            partner_ids,
+            company_id,
+            data["only_posted_moves"],
+            data["date_to"],
+            data["date_from"],
+            data["cost_center_ids"],
+        )
+        if data["domain"]:
+            period_domain += data["domain"]
+        # Totals of the period, to know the accounts and partners to display
+        # and their ending balances before reading their move lines
+        total_fields = ["debit", "credit", "balance", "amount_currency:sum"]
+        for acc_data in gen_ld_data.values():
+            acc_data["period_count"] = 0
+            for item_id, item_data in acc_data.items():
+                if isinstance(item_id, int):
+                    item_data["period_count"] = 0
+        acc_totals = self.env["account.move.line"].read_group(
+            domain=period_domain,
+            fields=["account_id"] + total_fields,
+            groupby=["account_id"],
+        )
+        for total in acc_totals:
+            acc_id = total["account_id"][0]
+            if acc_id not in gen_ld_data:
+                gen_ld_data[acc_id] = self._initialize_data(foreign_currency)
+                gen_ld_data[acc_id]["id"] = acc_id
+                gen_ld_data[acc_id]["period_count"] = 0
+                if grouped_by:
+                    gen_ld_data[acc_id][grouped_by] = False
+            gen_ld_data[acc_id]["period_count"] = total["account_id_count"]
+            self._add_period_totals(gen_ld_data[acc_id], total, foreign_currency)
+        if grouped_by == "partners":
+            acc_prt_account_ids = self._get_acc_prt_accounts_ids(company_id, grouped_by)
+            prt_totals = self.env["account.move.line"].read_group(
+                domain=period_domain + [("account_id", "in", acc_prt_account_ids)],
+                fields=["account_id", "partner_id"] + total_fields,
+                groupby=["account_id", "partner_id"],
+                lazy=False,
+            )
+            for total in prt_totals:
+                acc_data = gen_ld_data[total["account_id"][0]]
+                prt_id = total["partner_id"][0] if total["partner_id"] else 0
+                if prt_id not in acc_data:
+                    acc_data[prt_id] = self._initialize_data(foreign_currency)
+                    acc_data[prt_id]["id"] = prt_id
+                    acc_data[prt_id]["name"] = (
+                        total["partner_id"][1]
+                        if total["partner_id"]
+                        else "Missing Partner"
+                    )
+                    acc_data[prt_id]["period_count"] = 0
+                    acc_data[grouped_by] = True
+                acc_data[prt_id]["period_count"] = total["__count"]
+                self._add_period_totals(acc_data[prt_id], total, foreign_currency)
+        accounts_data = self._get_accounts_data(list(gen_ld_data))
+        stream_data = {
+            "journals_data": {},
+            "taxes_data": {},
+            "analytic_data": {},
+            "full_reconcile_data": {},
+        }
+        company = self.env["res.company"].browse(company_id)
+        return {
+            "doc_ids": [data["wizard_id"]],
+            "doc_model": "general.ledger.report.wizard",
+            "docs": self.env["general.ledger.report.wizard"].browse(data["wizard_id"]),
+            "foreign_currency": foreign_currency,
+            "company_name": company.display_name,
+            "company_currency": company.currency_id,
+            "currency_name": company.currency_id.name,
+            "date_from": data["date_from"],
+            "date_to": data["date_to"],
+            "only_posted_moves": data["only_posted_moves"],
+            "hide_account_at_0": data["hide_account_at_0"],
+            "show_cost_center": data["show_cost_center"],
+            "general_ledger": self._iter_general_ledger(
+                gen_ld_data, accounts_data, period_domain, data, stream_data
+            ),
+            "accounts_data": accounts_data,
+            "centralize": data["centralize"],
+            "filter_partner_ids": True if partner_ids else False,
+            "currency_model": self.env["res.currency"],
+            **stream_data,
+        }
+
     def _get_ml_fields(self):
         return self.COMMON_ML_FIELDS + [
             "analytic_distribution",
@@ -132,9 +132,13 @@ class GeneralLedgerXslx(models.AbstractModel):
 
     # flake8: noqa: C901
     def _generate_report_content(self, workbook, report, data, report_data):
-        res_data = self.env[
-            "report.account_financial_report.general_ledger"
-        ]._get_report_values(report, data)
+        report_model = self.env["report.account_financial_report.general_ledger"]
+        # Read the move lines while writing them, the workbook being written
+        # in constant memory mode
+        if report_model._can_stream_report_values(data):
+            res_data = report_model._get_report_values_stream(report, data)
+        else:
+            res_data = report_model._get_report_values(report, data)
         general_ledger = res_data["general_ledger"]
         accounts_data = res_data["accounts_data"]
         journals_data = res_data["journals_data"]
@@ -190,7 +190,7 @@ class TrialBalanceReport(models.AbstractModel):
             only_posted_moves,
             show_partner_details,
         )
-        initial_balances = self.env["account.move.line"].read_group(
+        initial_balances = self._read_group_initial_balances(
             domain=domain,
             fields=["account_id", "balance", "amount_currency:sum"],
             groupby=["account_id"],
@@ -369,7 +369,7 @@ class TrialBalanceReport(models.AbstractModel):
             only_posted_moves,
             show_partner_details,
         )
-        tb_initial_acc_bs = self.env["account.move.line"].read_group(
+        tb_initial_acc_bs = self._read_group_initial_balances(
             domain=initial_domain_bs,
             fields=["account_id", "balance", "amount_currency:sum"],
             groupby=["account_id"],
@@ -384,7 +384,7 @@ class TrialBalanceReport(models.AbstractModel):
             show_partner_details,
             fy_start_date,
         )
-        tb_initial_acc_pl = self.env["account.move.line"].read_group(
+        tb_initial_acc_pl = self._read_group_initial_balances(
             domain=initial_domain_pl,
             fields=["account_id", "balance", "amount_currency:sum"],
             groupby=["account_id"],
@@ -421,13 +421,13 @@ class TrialBalanceReport(models.AbstractModel):
         )
 
         if show_partner_details:
-            tb_initial_prt_bs = self.env["account.move.line"].read_group(
+            tb_initial_prt_bs = self._read_group_initial_balances(
                 domain=initial_domain_bs,
                 fields=["account_id", "partner_id", "balance", "amount_currency:sum"],
                 groupby=["account_id", "partner_id"],
                 lazy=False,
             )
-            tb_initial_prt_pl = self.env["account.move.line"].read_group(
+            tb_initial_prt_pl = self._read_group_initial_balances(
                 domain=initial_domain_pl,
                 fields=["account_id", "partner_id", "balance", "amount_currency:sum"],
                 groupby=["account_id", "partner_id"],
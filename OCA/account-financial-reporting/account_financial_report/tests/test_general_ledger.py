@@ -90,6 +90,7 @@ class TestGeneralLedgerReport(AccountTestInvoicingCommon):
         }
         move = self.env["account.move"].create(move_vals)
         move.action_post()
+        return move
 
     def _get_report_lines(self, with_partners=False, account_ids=False):
         centralize = True
@@ -721,3 +722,117 @@ class TestGeneralLedgerReport(AccountTestInvoicingCommon):
         wizard.onchange_date_range_id()
         self.assertEqual(wizard.date_from, date(2018, 1, 1))
         self.assertEqual(wizard.date_to, date(2018, 12, 31))
+
+    def test_balance_snapshot(self):
+        snapshot_model = self.env["account.balance.snapshot"]
+        aml_model = self.env["account.move.line"]
+        self._add_move(date(2016, 2, 10), 100, 0, 0, 100)
+        move = self._add_move(date(2016, 3, 15), 250, 0, 0, 250)
+        self._add_move(date(2016, 4, 5), 40, 0, 0, 40)
+        fields_list = ["account_id", "partner_id", "balance", "amount_currency:sum"]
+        groupby = ["account_id", "partner_id"]
+
+        def group_key(group):
+            partner = group["partner_id"]
+            return group["account_id"][0], partner and partner[0]
+
+        def check_initial_balances(state_domain):
+            domain = [
+                ("company_id", "=", self.env.user.company_id.id),
+                ("account_id", "in", self.receivable_account.ids),
+                ("date", ">=", self.fy_date_start),
+                ("date", "<", date(2016, 4, 20)),
+            ] + state_domain
+            self.assertTrue(snapshot_model._split_move_line_domain(domain))
+            expected = {
+                group_key(group): group["balance"]
+                for group in aml_model.read_group(
+                    domain, fields_list, groupby, lazy=False
+                )
+            }
+            result = {
+                group_key(group): group["balance"]
+                for group in snapshot_model._read_group_move_lines(
+                    domain, fields_list, groupby, lazy=False
+                )
+            }
+            self.assertEqual(result, expected)
+            return result[(self.receivable_account.id, self.partner.id)]
+
+        posted = [("move_id.state", "=", "posted")]
+        all_states = [("move_id.state", "in", ["posted", "draft"])]
+        self.assertEqual(check_initial_balances(posted), 390)
+        snapshot_model._cron_compact()
+        snapshot_count = snapshot_model.search_count([])
+        # the snapshots follow the entries reset to draft and posted again
+        move.button_draft()
+        self.assertEqual(check_initial_balances(posted), 140)
+        self.assertEqual(check_initial_balances(all_states), 390)
+        move.action_post()
+        self.assertEqual(check_initial_balances(posted), 390)
+        # the amounts are inserted as new rows, merged back by the cron
+        self.assertGreater(snapshot_model.search_count([]), snapshot_count)
+        snapshot_model._cron_compact()
+        self.assertEqual(snapshot_model.search_count([]), snapshot_count)
+        self.assertEqual(check_initial_balances(posted), 390)
+        # domains on other fields are read from the journal items
+        self.assertFalse(
+            snapshot_model._split_move_line_domain(
+                posted + [("date", "<", self.fy_date_end), ("journal_id", "=", 1)]
+            )
+        )
+
+    def test_report_values_stream(self):
+        self._add_move(self.previous_fy_date_end, 100, 0, 0, 100)
+        for day in range(1, 8):
+            self._add_move(date(2016, 3, day), 10 * day, 0, 0, 10 * day)
+        self._add_move(date(2016, 3, 3), 0, 25, 25, 0)
+        report_model = self.env["report.account_financial_report.general_ledger"]
+        # small chunks so the keyset pagination is exercised
+        self.patch(type(report_model), "_ml_chunk_size", 3)
+
+        def summarize(general_ledger):
+            res = []
+            for account in general_ledger:
+                items = account.get("list_grouped") or [account]
+                res.append(
+                    (
+                        account["code"],
+                        account["init_bal"]["balance"],
+                        account["fin_bal"]["balance"],
+                        [
+                            (
+                                item["id"] if item is not account else None,
+                                [
+                                    (line["id"], line["balance"])
+                                    for line in item["move_lines"]
+                                ],
+                            )
+                            for item in items
+                        ],
+                    )
+                )
+            return res
+
+        for grouped_by in ("", "partners"):
+            wizard = self.env["general.ledger.report.wizard"].create(
+                {
+                    "date_from": self.fy_date_start,
+                    "date_to": self.fy_date_end,
+                    "target_move": "posted",
+                    "hide_account_at_0": True,
+                    "company_id": self.env.user.company_id.id,
+                    "fy_start_date": self.fy_date_start,
+                    "centralize": False,
+                    "grouped_by": grouped_by,
+                }
+            )
+            data = wizard._prepare_report_general_ledger()
+            self.assertTrue(report_model._can_stream_report_values(data))
+            expected = report_model._get_report_values(wizard, data)
+            streamed = report_model._get_report_values_stream(wizard, data)
+            self.assertEqual(
+                summarize(streamed["general_ledger"]),
+                summarize(expected["general_ledger"]),
+            )
+            self.assertEqual(streamed["journals_data"], expected["journals_data"])
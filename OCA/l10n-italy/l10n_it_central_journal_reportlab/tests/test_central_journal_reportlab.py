@@ -59,3 +59,57 @@ class TestCentralJournalReportlab(TransactionCase):
         self.minimal_reader_buffer = io.BytesIO(decode_giornale)
         self.minimal_pdf_reader = pdf.OdooPdfFileReader(self.minimal_reader_buffer)
         self.assertTrue(self.minimal_reader_buffer)
+
+    def _post_test_move(self):
+        journal = self.env["account.journal"].create(
+            {"name": "Test central journal", "code": "TCJ", "type": "general"}
+        )
+        debit_account, credit_account = self.env["account.account"].create(
+            [
+                {"code": "TCJ1", "name": "Debit", "account_type": "expense"},
+                {"code": "TCJ2", "name": "Credit", "account_type": "income"},
+            ]
+        )
+        move = self.env["account.move"].create(
+            {
+                "journal_id": journal.id,
+                "date": self.today.date(),
+                "line_ids": [
+                    (0, 0, {"account_id": debit_account.id, "debit": 100}),
+                    (0, 0, {"account_id": credit_account.id, "credit": 100}),
+                ],
+            }
+        )
+        move.action_post()
+        return journal
+
+    def test_wizard_reportlab_final(self):
+        journal = self._post_test_move()
+        wizard_form = Form(self.wizard_model)
+        wizard_form.daterange_id = self.current_period
+        wizard = wizard_form.save()
+        wizard.journal_ids = journal
+        wizard.print_giornale_reportlab_final()
+
+        self.assertTrue(wizard.report_giornale)
+        self.assertEqual(
+            self.current_period.progressive_line_number, wizard.start_row + 2
+        )
+        self.assertEqual(self.current_period.progressive_debit, 100)
+        self.assertEqual(self.current_period.progressive_credit, 100)
+
+    def test_wizard_reportlab_final_group_by_account(self):
+        journal = self._post_test_move()
+        wizard_form = Form(self.wizard_model)
+        wizard_form.daterange_id = self.current_period
+        wizard = wizard_form.save()
+        wizard.journal_ids = journal
+        wizard.group_by_account = True
+        wizard.print_giornale_reportlab_final()
+
+        self.assertTrue(wizard.report_giornale)
+        self.assertEqual(
+            self.current_period.progressive_line_number, wizard.start_row + 2
+        )
+        self.assertEqual(self.current_period.progressive_debit, 100)
+        self.assertEqual(self.current_period.progressive_credit, 100)
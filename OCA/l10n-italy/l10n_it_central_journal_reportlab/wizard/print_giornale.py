@@ -3,6 +3,7 @@
 
 import base64
 import io
+import itertools
 from datetime import timedelta
 
 from reportlab.lib import colors
@@ -16,13 +17,15 @@ from reportlab.platypus.paragraph import Paragraph
 
 from odoo import _, api, fields, models
 from odoo.exceptions import UserError
-from odoo.tools.misc import flatten, format_date, formatLang
+from odoo.tools.misc import format_date, formatLang
 
 gap = 1 * cm  # gap between header/footer and page content
 gap_text = 0.5 * cm  # gap between text
 margin_left = 0.5 * cm  # layout margin left
 margin_bottom = 0.5 * cm  # layout margin bottom
 footer_height = 2 * gap_text + 12  # layout footer height
+cell_padding = 1  # padding of table cells, see get_styles_report_giornale_line
+lines_chunk_size = 1000  # move lines read at once
 
 
 class WizardGiornaleReportlab(models.TransientModel):
@@ -165,13 +168,23 @@ class WizardGiornaleReportlab(models.TransientModel):
         list_grupped_line = self.env.cr.dictfetchall()
         return list_grupped_line
 
-    def get_line_reportlab_ids(self):
+    def iter_line_reportlab_ids(self):
+        """Yield the ids of the move lines to be printed, in chunks.
+
+        Lines are read with keyset pagination on the printing order,
+        so that only one chunk at a time is loaded.
+        """
         if self.target_move == "all":
             target_type = ["posted", "draft"]
         else:
             target_type = [self.target_move]
         sql = """
-            SELECT aml.id FROM account_move_line aml
+            SELECT
+                aml.id,
+                am.date,
+                COALESCE(am.name, '') AS move_name,
+                COALESCE(aa.code, '') AS account_code
+            FROM account_move_line aml
             LEFT JOIN account_move am ON (am.id = aml.move_id)
             LEFT JOIN account_account aa ON (aa.id = aml.account_id)
             WHERE
@@ -179,18 +192,43 @@ class WizardGiornaleReportlab(models.TransientModel):
             AND aml.date <= %(date_to)s
             AND am.state in %(target_type)s
             AND aml.journal_id in %(journal_ids)s
-            ORDER BY am.date, am.name, aa.code
+            {keyset}
+            ORDER BY am.date, COALESCE(am.name, ''), COALESCE(aa.code, ''), aml.id
+            LIMIT %(limit)s
+        """
+        # The redundant date bounds start each chunk from the last date read,
+        # the row comparison alone matches no index.
+        # The date of the lines is the date of their entry.
+        keyset = """
+            AND am.date >= %(last_date)s
+            AND aml.date >= %(last_date)s
+            AND (am.date, COALESCE(am.name, ''), COALESCE(aa.code, ''), aml.id)
+            > (%(last_date)s, %(last_move_name)s, %(last_account_code)s, %(last_id)s)
         """
         params = {
             "date_from": self.date_move_line_from,
             "date_to": self.date_move_line_to,
             "target_type": tuple(target_type),
             "journal_ids": tuple(self.journal_ids.ids),
+            "limit": lines_chunk_size,
         }
-        self.env.cr.execute(sql, params)
-        res = self.env.cr.fetchall()
-        move_line_ids = flatten(res)
-        return move_line_ids
+        query = sql.format(keyset="")
+        while True:
+            self.env.cr.execute(query, params)
+            res = self.env.cr.fetchall()
+            if not res:
+                break
+            yield [line_id for line_id, *_key in res]
+            if len(res) < lines_chunk_size:
+                break
+            last_id, last_date, last_move_name, last_account_code = res[-1]
+            params.update(
+                last_id=last_id,
+                last_date=last_date,
+                last_move_name=last_move_name,
+                last_account_code=last_account_code,
+            )
+            query = sql.format(keyset=keyset)
 
     def _get_account_name_reportlab(self, line):
         return " - ".join(filter(None, [line.account_id.code, line.account_id.name]))
@@ -313,22 +351,14 @@ class WizardGiornaleReportlab(models.TransientModel):
         ]
         return initial_balance_data
 
-    def get_grupped_final_tables_report_giornale(
-        self, list_grupped_line, tables, start_row, width_available
+    def get_grupped_final_rows_report_giornale(
+        self, list_grupped_line, start_row, styles
     ):
-        style_name = self.get_styles_report_giornale_line()["style_name"]
-        style_number = self.get_styles_report_giornale_line()["style_number"]
-        style_table = self.get_styles_report_giornale_line()["style_table"]
-        style_table_line_above = self.get_styles_report_giornale_line()[
-            "style_table_line_above"
-        ]
-        colwidths = self.get_colwidths_report_giornale(width_available)
+        """Yield (row number, row data, move name, debit, credit)
+        for each line of `list_grupped_line`."""
+        style_name = styles["style_name"]
+        style_number = styles["style_number"]
 
-        previous_move_name = ""
-        list_balance = [
-            (0, 0),
-            (self.progressive_debit2, self.progressive_credit),
-        ]
         for line in list_grupped_line:
             start_row += 1
             row = Paragraph(str(start_row), style_name)
@@ -346,83 +376,79 @@ class WizardGiornaleReportlab(models.TransientModel):
             name = Paragraph(line["name"], style_name)
             # dato che nel SQL ho la somma dei crediti e debiti potrei avere
             # che un conto ha sia debito che credito
-            lines_data = []
             if line["debit"] > 0:
                 debit = Paragraph(formatLang(self.env, line["debit"]), style_number)
                 credit = Paragraph(formatLang(self.env, 0), style_number)
-                list_balance.append((line["debit"], 0))
-                lines_data.append([[row, date, move, account, name, debit, credit]])
+                row_data = [row, date, "", move, account, name, debit, credit]
+                yield start_row, row_data, line["move_name"], line["debit"], 0
             if line["credit"] > 0:
                 debit = Paragraph(formatLang(self.env, 0), style_number)
                 credit = Paragraph(formatLang(self.env, line["credit"]), style_number)
-                list_balance.append((0, line["credit"]))
-                lines_data.append([[row, date, move, account, name, debit, credit]])
-            for line_data in lines_data:
-                if previous_move_name != line["move_name"]:
-                    previous_move_name = line["move_name"]
-                    tables.append(
-                        Table(
-                            line_data, colWidths=colwidths, style=style_table_line_above
-                        )
-                    )
+                row_data = [row, date, "", move, account, name, debit, credit]
+                yield start_row, row_data, line["move_name"], 0, line["credit"]
+
+    def get_final_rows_report_giornale(self, start_row, styles):
+        """Yield (row number, row data, move name, debit, credit)
+        for each move line to be printed."""
+        style_name = styles["style_name"]
+        style_number = styles["style_number"]
+
+        for line_ids in self.iter_line_reportlab_ids():
+            for line in self.env["account.move.line"].browse(line_ids):
+                start_row += 1
+                row = Paragraph(str(start_row), style_name)
+                date = Paragraph(format_date(self.env, line.date), style_name)
+                ref = Paragraph(str(line.ref or ""), style_name)
+                move_name = line.move_id.name or ""
+                move = Paragraph(move_name, style_name)
+                account_name = self._get_account_name_reportlab(line)
+                # evitiamo che i caratteri < o > vengano interpretato come tag html
+                # dalla libreria reportlab
+                account_name = account_name.replace("<", "&lt;").replace(">", "&gt;")
+                account = Paragraph(account_name, style_name)
+                if line.account_id.account_type in [
+                    "asset_receivable",
+                    "liability_payable",
+                ]:
+                    name = Paragraph(str(line.partner_id.name or ""), style_name)
                 else:
-                    tables.append(
-                        Table(line_data, colWidths=colwidths, style=style_table)
-                    )
-        return tables, list_balance
-
-    def get_final_tables_report_giornale(
-        self, move_line_ids, tables, start_row, width_available
+                    name = Paragraph(str(line.name or ""), style_name)
+                debit = Paragraph(formatLang(self.env, line.debit), style_number)
+                credit = Paragraph(formatLang(self.env, line.credit), style_number)
+                row_data = [row, date, ref, move, account, name, debit, credit]
+                yield start_row, row_data, move_name, line.debit, line.credit
+            # printed lines are not needed anymore: free the cache
+            self.env.invalidate_all()
+
+    def get_row_height_report_giornale(self, row_data, colwidths):
+        height = 0
+        for cell, colwidth in zip(row_data, colwidths, strict=True):
+            if isinstance(cell, Paragraph):
+                cell_width, cell_height = cell.wrap(colwidth - 2 * cell_padding, A4[1])
+                height = max(height, cell_height)
+        return height + 2 * cell_padding
+
+    def draw_page_table_report_giornale(
+        self, report, page_data, line_above_rows, colwidths, styles, height_available
     ):
-        style_name = self.get_styles_report_giornale_line()["style_name"]
-        style_number = self.get_styles_report_giornale_line()["style_number"]
-        style_table = self.get_styles_report_giornale_line()["style_table"]
-        style_table_line_above = self.get_styles_report_giornale_line()[
-            "style_table_line_above"
-        ]
-        colwidths = self.get_colwidths_report_giornale(width_available)
-
-        previous_move_name = ""
-        list_balance = [
-            (0, 0),
-            (self.progressive_debit2, self.progressive_credit),
+        """Draw all the rows of the page in one table."""
+        style = styles["style_table"] + [
+            ("LINEABOVE", (0, row_index), (-1, row_index), 1, colors.black)
+            for row_index in line_above_rows
         ]
+        table = Table(page_data, colWidths=colwidths, style=style)
+        table_width, table_height = table.wrapOn(
+            report, sum(colwidths), height_available
+        )
+        table.drawOn(report, margin_left, height_available - table_height)
 
-        for line in self.env["account.move.line"].browse(move_line_ids):
-            start_row += 1
-            row = Paragraph(str(start_row), style_name)
-            date = Paragraph(format_date(self.env, line.date), style_name)
-            ref = Paragraph(str(line.ref or ""), style_name)
-            move_name = line.move_id.name or ""
-            move = Paragraph(move_name, style_name)
-            account_name = self._get_account_name_reportlab(line)
-            # evitiamo che i caratteri < o > vengano interpretato come tag html
-            # dalla libreria reportlab
-            account_name = account_name.replace("<", "&lt;").replace(">", "&gt;")
-            account = Paragraph(account_name, style_name)
-            if line.account_id.account_type in [
-                "asset_receivable",
-                "liability_payable",
-            ]:
-                name = Paragraph(str(line.partner_id.name or ""), style_name)
-            else:
-                name = Paragraph(str(line.name or ""), style_name)
-            debit = Paragraph(formatLang(self.env, line.debit), style_number)
-            credit = Paragraph(formatLang(self.env, line.credit), style_number)
-            list_balance.append((line.debit, line.credit))
-            line_data = [[row, date, ref, move, account, name, debit, credit]]
-            if previous_move_name != move_name:
-                previous_move_name = move_name
-                tables.append(
-                    Table(line_data, colWidths=colwidths, style=style_table_line_above)
-                )
-            else:
-                tables.append(Table(line_data, colWidths=colwidths, style=style_table))
-        return tables, list_balance
-
-    def get_balance_data_report_giornale(self, tot_debit, tot_credit, final=False):
-        style_name = self.get_styles_report_giornale_line()["style_name"]
-        style_number = self.get_styles_report_giornale_line()["style_number"]
+    def get_balance_data_report_giornale(
+        self, tot_debit, tot_credit, final=False, styles=None
+    ):
+        if styles is None:
+            styles = self.get_styles_report_giornale_line()
+        style_name = styles["style_name"]
+        style_number = styles["style_number"]
 
         if final:
             name = Paragraph(_("Final Balance"), style_name)
@@ -448,113 +474,113 @@ class WizardGiornaleReportlab(models.TransientModel):
 
         WIDTH, HEIGHT = A4
         width_available = WIDTH - (2 * margin_left)
-        height_available = HEIGHT
         report = canvas.Canvas(pdf_bytes, pagesize=A4)
-        height_available = self.get_template_header_report_giornale(
-            report, height_available
-        )
-
-        style_table = self.get_styles_report_giornale_line()["style_table"]
-        style_table_line_above = self.get_styles_report_giornale_line()[
-            "style_table_line_above"
-        ]
 
+        styles = self.get_styles_report_giornale_line()
         colwidths = self.get_colwidths_report_giornale(width_available)
-        data_header = self.get_data_header_report_giornale()
-        tables = [Table(data_header, colWidths=colwidths, style=style_table)]
-        initial_balance_data = self.get_initial_balance_data_report_giornale()
-        tables.append(
-            Table(initial_balance_data, colWidths=colwidths, style=style_table)
-        )
         start_row = self.start_row
         if self.group_by_account:
             list_grupped_line = self.get_grupped_line_reportlab_ids()
-            if not list_grupped_line:
-                raise UserError(_("No documents found in the current selection"))
-            final_tables, list_balance = self.get_grupped_final_tables_report_giornale(
-                list_grupped_line, tables, start_row, width_available
+            rows = self.get_grupped_final_rows_report_giornale(
+                list_grupped_line, start_row, styles
             )
         else:
-            move_line_ids = self.get_line_reportlab_ids()
-            if not move_line_ids:
-                raise UserError(_("No documents found in the current selection"))
-            final_tables, list_balance = self.get_final_tables_report_giornale(
-                move_line_ids, tables, start_row, width_available
+            rows = self.get_final_rows_report_giornale(start_row, styles)
+        first_row = next(rows, None)
+        if first_row is None:
+            raise UserError(_("No documents found in the current selection"))
+
+        def get_rows_height(page_data):
+            return sum(
+                self.get_row_height_report_giornale(row_data, colwidths)
+                for row_data in page_data
             )
 
-        height_available -= gap
-        i = 0
-        tot_debit = 0
-        tot_credit = 0
-        for table in final_tables:
-            table_width, table_height = table.wrapOn(report, width_available, HEIGHT)
-            if height_available - footer_height < table_height:
+        def start_page(balance_data):
+            height_available = self.get_template_header_report_giornale(report, HEIGHT)
+            height_available -= gap
+            return height_available, data_header + balance_data
+
+        # Only the rows of the current page are kept in memory:
+        # each page is drawn as a single table as soon as it is full
+        data_header = self.get_data_header_report_giornale()
+        height_available, page_data = start_page(
+            self.get_initial_balance_data_report_giornale()
+        )
+        line_above_rows = []
+        used_height = get_rows_height(page_data)
+        min_balance_height = get_rows_height(
+            self.get_balance_data_report_giornale(0, 0, styles=styles)
+        )
+        tot_debit = self.progressive_debit2
+        tot_credit = self.progressive_credit
+        previous_move_name = ""
+        for row_number, row_data, move_name, debit, credit in itertools.chain(
+            [first_row], rows
+        ):
+            end_row = row_number
+            row_height = self.get_row_height_report_giornale(row_data, colwidths)
+            page_full = False
+            # the balance at the bottom of the page is only built
+            # when the page is close to be full
+            if (
+                used_height + row_height + min_balance_height
+                > height_available - footer_height
+            ):
                 balance_data = self.get_balance_data_report_giornale(
-                    tot_debit, tot_credit, final=False
+                    tot_debit, tot_credit, final=False, styles=styles
                 )
-                table_balance = Table(
-                    balance_data, colWidths=colwidths, style=style_table_line_above
+                page_full = (
+                    used_height + row_height + get_rows_height(balance_data)
+                    > height_available - footer_height
                 )
-                table_balance_width, table_balance_height = table_balance.wrapOn(
-                    report, WIDTH, HEIGHT
+            if page_full:
+                line_above_rows.append(len(page_data))
+                self.draw_page_table_report_giornale(
+                    report,
+                    page_data + balance_data,
+                    line_above_rows,
+                    colwidths,
+                    styles,
+                    height_available,
                 )
-                height_available -= table_balance_height
-                table_balance.drawOn(report, margin_left, height_available)
                 self.get_template_footer_report_giornale(report)
-
                 report.showPage()
-                height_available = self.get_template_header_report_giornale(
-                    report, HEIGHT
-                )
-                height_available -= gap
-                header_table = Table(
-                    data_header, colWidths=colwidths, style=style_table
-                )
-                header_table_width, header_table_height = header_table.wrapOn(
-                    report, WIDTH, HEIGHT
-                )
-                height_available -= header_table_height
-                header_table.drawOn(report, margin_left, height_available)
-                table_balance = Table(
-                    balance_data, colWidths=colwidths, style=style_table
-                )
-                table_balance.wrapOn(report, WIDTH, HEIGHT)
-                height_available -= header_table_height + table_balance_height
-                table_balance.drawOn(report, margin_left, height_available)
 
-            tot_debit += list_balance[i][0]
-            tot_credit += list_balance[i][1]
-            height_available -= table_height
-            table.drawOn(report, margin_left, height_available)
-            i += 1
+                height_available, page_data = start_page(balance_data)
+                line_above_rows = []
+                used_height = get_rows_height(page_data)
+
+            if previous_move_name != move_name:
+                previous_move_name = move_name
+                line_above_rows.append(len(page_data))
+            page_data.append(row_data)
+            used_height += row_height
+            tot_debit += debit
+            tot_credit += credit
 
         final_balance_data = self.get_balance_data_report_giornale(
-            tot_debit, tot_credit, final=True
+            tot_debit, tot_credit, final=True, styles=styles
         )
-        final_balance_table = Table(
-            final_balance_data, colWidths=colwidths, style=style_table_line_above
-        )
-        (
-            final_balance_table_width,
-            final_balance_table_height,
-        ) = final_balance_table.wrapOn(report, WIDTH, HEIGHT)
-        if height_available - footer_height >= final_balance_table_height:
-            height_available -= final_balance_table_height
-            final_balance_table.drawOn(report, margin_left, height_available)
-        else:
+        final_balance_height = get_rows_height(final_balance_data)
+        if used_height + final_balance_height > height_available - footer_height:
+            self.draw_page_table_report_giornale(
+                report, page_data, line_above_rows, colwidths, styles, height_available
+            )
             self.get_template_footer_report_giornale(report)
-
             report.showPage()
-            height_available = self.get_template_header_report_giornale(report, HEIGHT)
-            height_available -= gap
-            header_table = Table(data_header, colWidths=colwidths, style=style_table)
-            header_table_width, header_table_height = header_table.wrapOn(
-                report, WIDTH, HEIGHT
-            )
-            height_available -= header_table_height
-            header_table.drawOn(report, margin_left, height_available)
-            height_available -= header_table_height + final_balance_table_height
-            final_balance_table.drawOn(report, margin_left, height_available)
+
+            height_available, page_data = start_page([])
+            line_above_rows = []
+        line_above_rows.append(len(page_data))
+        self.draw_page_table_report_giornale(
+            report,
+            page_data + final_balance_data,
+            line_above_rows,
+            colwidths,
+            styles,
+            height_available,
+        )
         self.get_template_footer_report_giornale(report)
         report.showPage()
         report.save()
@@ -562,7 +588,7 @@ class WizardGiornaleReportlab(models.TransientModel):
         file_base64 = base64.b64encode(pdf_bytes.getvalue())
         self.write({"report_giornale": file_base64})
 
-        return start_row, tot_debit, tot_credit
+        return end_row, tot_debit, tot_credit
 
     def print_giornale_reportlab(self):
         self.create_report_giornale_reportlab()
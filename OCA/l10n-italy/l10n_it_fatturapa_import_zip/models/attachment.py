@@ -14,6 +14,9 @@ import lxml.etree as ET
 from odoo import fields, models
 
 from odoo.addons.l10n_it_fatturapa_in.wizard import efattura
+from odoo.addons.l10n_it_fatturapa_in.wizard.wizard_import_fatturapa import (
+    LOOKUP_CACHE_KEY,
+)
 
 _logger = logging.getLogger(__name__)
 
@@ -164,6 +167,8 @@ class FatturaPAAttachmentImportZIP(models.Model):
             # we don't have the received date
             self.env.company.in_invoice_registration_date = "inv_date"
 
+            # share the reference data looked up by the import wizards
+            lookup_cache = {}
             for xml_file in tmp_dir.rglob("*"):
                 # Process only files skipping non-XML/P7M files
                 if xml_file.is_file() and (
@@ -187,6 +192,7 @@ class FatturaPAAttachmentImportZIP(models.Model):
                         .with_context(
                             active_ids=attachment.ids,
                             active_model=attachment._name,
+                            **{LOOKUP_CACHE_KEY: lookup_cache},
                         )
                         .create({})
                     )
@@ -348,6 +348,24 @@ class TestFatturaPAXMLValidation(FatturapaCommon):
             "Alpha SRL'. Your System contains 'SOCIETA' ALPHA SRL'\n\n",
         )
 
+    def test_13_xml_import_lookup_cache(self):
+        # reference data is searched once per import run
+        attachment = self.create_attachment(
+            "test13_lookup_cache", "IT02780790107_11004.xml"
+        )
+        wizard = Form(
+            self.wizard_model.with_context(
+                active_ids=attachment.ids, active_model=attachment._name
+            )
+        ).save()
+        wizard = wizard.with_context(fatturapa_in_lookup_cache={})
+        domain = [("bic", "=", "TESTLOOKUP")]
+        self.assertFalse(wizard._cached_search("res.bank", domain))
+        bank = self.env["res.bank"].create({"name": "Test", "bic": "TESTLOOKUP"})
+        self.assertFalse(wizard._cached_search("res.bank", domain))
+        wizard._uncache_search("res.bank", domain)
+        self.assertEqual(wizard._cached_search("res.bank", domain), bank)
+
     def test_14_xml_import(self):
         # check: no tax code found , write inconsisteance and anyway
         # create draft
@@ -18,6 +18,10 @@ from . import efattura
 
 _logger = logging.getLogger(__name__)
 
+# Context key of the reference data looked up during an import run,
+# see `_cached_search`
+LOOKUP_CACHE_KEY = "fatturapa_in_lookup_cache"
+
 WT_CODES_MAPPING = {
     "RT01": "ritenuta",
     "RT02": "ritenuta",
@@ -121,14 +125,35 @@ class WizardImportFatturapa(models.TransientModel):
                     ].e_invoice_discount_decimal_digits
         return res
 
+    def _cached_search(self, model_name, domain, order=None, limit=None):
+        """
+        Search `model_name` records matching `domain`.
+        During an import the result is remembered for the whole run,
+        so that reference data (taxes, countries, payment methods...)
+        shared by many lines and bills is only searched once.
+        """
+        model = self.env[model_name]
+        lookup_cache = self.env.context.get(LOOKUP_CACHE_KEY)
+        if lookup_cache is None:
+            return model.search(domain, order=order, limit=limit)
+        key = (model_name, repr(domain), order, limit)
+        if key not in lookup_cache:
+            lookup_cache[key] = model.search(domain, order=order, limit=limit).ids
+        return model.browse(lookup_cache[key])
+
+    def _uncache_search(self, model_name, domain, order=None, limit=None):
+        """Forget the result of `_cached_search`, e.g. after creating a record."""
+        lookup_cache = self.env.context.get(LOOKUP_CACHE_KEY)
+        if lookup_cache is not None:
+            lookup_cache.pop((model_name, repr(domain), order, limit), None)
+
     def CountryByCode(self, CountryCode):
-        country_model = self.env["res.country"]
-        return country_model.search([("code", "=", CountryCode)])
+        return self._cached_search("res.country", [("code", "=", CountryCode)])
 
     def ProvinceByCode(self, provinceCode):
-        province_model = self.env["res.country.state"]
-        return province_model.search(
-            [("code", "=", provinceCode), ("country_id.code", "=", "IT")]
+        return self._cached_search(
+            "res.country.state",
+            [("code", "=", provinceCode), ("country_id.code", "=", "IT")],
         )
 
     def reset_inconsistencies(self):
@@ -329,7 +354,6 @@ class WizardImportFatturapa(models.TransientModel):
             no_contact_update = partner_model.browse(
                 partner_id
             ).electronic_invoice_no_contact_update
-        fiscalPosModel = self.env["fatturapa.fiscal_position"]
         if partner_id and not no_contact_update:
             partner_company_id = partner_model.browse(partner_id).company_id.id
             vals = {
@@ -370,7 +394,9 @@ class WizardImportFatturapa(models.TransientModel):
 
             if cedPrest.DatiAnagrafici.RegimeFiscale:
                 rfPos = cedPrest.DatiAnagrafici.RegimeFiscale
-                FiscalPos = fiscalPosModel.search([("code", "=", rfPos)])
+                FiscalPos = self._cached_search(
+                    "fatturapa.fiscal_position", [("code", "=", rfPos)]
+                )
                 if not FiscalPos:
                     raise UserError(
                         _("Tax Regime %s not present in your system.") % rfPos
@@ -492,7 +518,8 @@ class WizardImportFatturapa(models.TransientModel):
                 ],
             ]
         )
-        account_taxes = self.env["account.tax"].search(
+        account_taxes = self._cached_search(
+            "account.tax",
             tax_domain,
             order="sequence",
         )
@@ -533,7 +560,8 @@ class WizardImportFatturapa(models.TransientModel):
                 ],
             ]
         )
-        account_taxes = self.env["account.tax"].search(
+        account_taxes = self._cached_search(
+            "account.tax",
             tax_domain,
             order="sequence",
         )
@@ -577,28 +605,22 @@ class WizardImportFatturapa(models.TransientModel):
         product = self.env["product.product"].browse()
 
         # Search the product using supplier infos
-        supplier_info = self.env["product.supplierinfo"]
-        partner_supplier_info = supplier_info.search(
+        partner_supplier_info = self._cached_search(
+            "product.supplierinfo",
             [
                 ("partner_id", "=", partner.id),
-            ]
+            ],
         )
-        found_supplier_infos = supplier_info.browse()
+        found_supplier_infos = partner_supplier_info.browse()
         if len(line.CodiceArticolo or []) == 1:
             supplier_code = line.CodiceArticolo[0].CodiceValore
-            found_supplier_infos = supplier_info.search(
-                [
-                    ("id", "in", partner_supplier_info.ids),
-                    ("product_code", "=", supplier_code),
-                ]
+            found_supplier_infos = partner_supplier_info.filtered(
+                lambda info: info.product_code == supplier_code
             )
         if not found_supplier_infos:
             supplier_name = line.Descrizione
-            found_supplier_infos = supplier_info.search(
-                [
-                    ("id", "in", partner_supplier_info.ids),
-                    ("product_name", "=", supplier_name),
-                ]
+            found_supplier_infos = partner_supplier_info.filtered(
+                lambda info: info.product_name == supplier_name
             )
 
         if found_supplier_infos:
@@ -769,17 +791,18 @@ class WizardImportFatturapa(models.TransientModel):
         Natura = line.Natura or False
         kind_id = False
         if Natura:
-            kind = self.env["account.tax.kind"].search([("code", "=", Natura)])
+            kind = self._cached_search("account.tax.kind", [("code", "=", Natura)])
             if not kind:
                 self.log_inconsistency(_("Tax kind %s not found") % Natura)
             else:
                 kind_id = kind[0].id
 
         RiferimentoAmministrazione = line.RiferimentoAmministrazione or ""
-        WelfareTypeModel = self.env["welfare.fund.type"]
         if not TipoCassa:
             raise UserError(_("Welfare Fund is not defined."))
-        WelfareType = WelfareTypeModel.search([("name", "=", TipoCassa)])
+        WelfareType = self._cached_search(
+            "welfare.fund.type", [("name", "=", TipoCassa)]
+        )
 
         res = {
             "welfare_rate_tax": AlCassa,
@@ -865,12 +888,12 @@ class WizardImportFatturapa(models.TransientModel):
         details = line.DettaglioPagamento or False
         if details:
             PaymentModel = self.env["fatturapa.payment.detail"]
-            PaymentMethodModel = self.env["fatturapa.payment_method"]
             BankModel = self.env["res.bank"]
             PartnerBankModel = self.env["res.partner.bank"]
             for dline in details:
-                method = PaymentMethodModel.search(
-                    [("code", "=", dline.ModalitaPagamento)]
+                method = self._cached_search(
+                    "fatturapa.payment_method",
+                    [("code", "=", dline.ModalitaPagamento)],
                 )
                 if not method:
                     raise UserError(
@@ -906,7 +929,8 @@ class WizardImportFatturapa(models.TransientModel):
                 bank = False
                 payment_bank_id = False
                 if dline.BIC:
-                    banks = BankModel.search([("bic", "=", dline.BIC.strip())])
+                    bank_domain = [("bic", "=", dline.BIC.strip())]
+                    banks = self._cached_search("res.bank", bank_domain)
                     if not banks:
                         if not dline.IstitutoFinanziario:
                             self.log_inconsistency(
@@ -923,6 +947,7 @@ class WizardImportFatturapa(models.TransientModel):
                                     "bic": dline.BIC,
                                 }
                             )
+                            self._uncache_search("res.bank", bank_domain)
                     else:
                         bank = banks[0]
                 if dline.IBAN:
@@ -1005,7 +1030,8 @@ class WizardImportFatturapa(models.TransientModel):
 
     def get_journal(self, company):
         domain = self._get_journal_domain(company)
-        journal = self.env["account.journal"].search(
+        journal = self._cached_search(
+            "account.journal",
             domain,
             limit=1,
         )
@@ -1119,10 +1145,11 @@ class WizardImportFatturapa(models.TransientModel):
     def _get_currency(self, FatturaBody):
         # currency 2.1.1.2
         currency_code = FatturaBody.DatiGenerali.DatiGeneraliDocumento.Divisa
-        currency = self.env["res.currency"].search(
+        currency = self._cached_search(
+            "res.currency",
             [
                 ("name", "=", currency_code),
-            ]
+            ],
         )
         if not currency:
             raise UserError(
@@ -1138,7 +1165,8 @@ class WizardImportFatturapa(models.TransientModel):
             FatturaBody.DatiGenerali.DatiGeneraliDocumento.TipoDocumento
         )
         if fiscal_document_type_code:
-            fiscal_document_type = self.env["fiscal.document.type"].search(
+            fiscal_document_type = self._cached_search(
+                "fiscal.document.type",
                 [
                     ("code", "=", fiscal_document_type_code),
                 ],
@@ -1283,14 +1311,16 @@ class WizardImportFatturapa(models.TransientModel):
             "invoice": FatturaBody.DatiGenerali.DatiFattureCollegate,
         }
 
+        rel_docs_datas = []
         for rel_doc_key, rel_doc_data in rel_docs_dict.items():
             if not rel_doc_data:
                 continue
             for rel_doc in rel_doc_data:
-                doc_datas = self._prepareRelDocsLine(invoice.id, rel_doc, rel_doc_key)
-                for doc_data in doc_datas:
-                    # Note for v12: must take advantage of batch creation
-                    self.env["fatturapa.related_document_type"].create(doc_data)
+                rel_docs_datas.extend(
+                    self._prepareRelDocsLine(invoice.id, rel_doc, rel_doc_key)
+                )
+        if rel_docs_datas:
+            self.env["fatturapa.related_document_type"].create(rel_docs_datas)
 
         # 2.1.7
         self.set_activity_progress(FatturaBody, invoice)
@@ -1564,12 +1594,13 @@ class WizardImportFatturapa(models.TransientModel):
                 ).invoice_date_due = due_dates[0]
         if PaymentsData:
             PaymentDataModel = self.env["fatturapa.payment.data"]
-            PaymentTermsModel = self.env["fatturapa.payment_term"]
             for PaymentLine in PaymentsData:
                 cond = PaymentLine.CondizioniPagamento or False
                 if not cond:
                     raise UserError(_("Payment method code not found in document."))
-                terms = PaymentTermsModel.search([("code", "=", cond)])
+                terms = self._cached_search(
+                    "fatturapa.payment_term", [("code", "=", cond)]
+                )
                 if not terms:
                     raise UserError(_("Payment method code %s is incorrect.") % cond)
                 else:
@@ -1589,7 +1620,8 @@ class WizardImportFatturapa(models.TransientModel):
         e_withholding_taxes_values = []
         for Withholding in Withholdings:
             payment_reason_code = Withholding.CausalePagamento
-            withholding_taxes = withholding_tax_model.search(
+            withholding_taxes = self._cached_search(
+                "withholding.tax",
                 [("payment_reason_id.code", "=", payment_reason_code)],
             )
             if not withholding_taxes:
@@ -1757,12 +1789,15 @@ class WizardImportFatturapa(models.TransientModel):
         if e_invoice_lines:
             invoice_data["e_invoice_line_ids"] = [(6, 0, e_invoice_lines.ids)]
 
-    def _set_invoice_lines(
-        self, product, invoice_line_data, invoice_lines, invoice_line_model
-    ):
+    def _set_invoice_line_product(self, product, invoice_line_data):
         if product:
             invoice_line_data["product_id"] = product.id
             self.adjust_accounting_data(product, invoice_line_data)
+
+    def _set_invoice_lines(
+        self, product, invoice_line_data, invoice_lines, invoice_line_model
+    ):
+        self._set_invoice_line_product(product, invoice_line_data)
         self.create_and_get_line_id(
             invoice_lines, invoice_line_model, invoice_line_data
         )
@@ -1773,6 +1808,7 @@ class WizardImportFatturapa(models.TransientModel):
         self, FatturaBody, credit_account_id, partner, wt_founds, invoice
     ):
         invoice_lines = []
+        invoice_lines_data = []
         invoice_line_model = self.env["account.move.line"]
         if self.e_invoice_detail_level == "1":
             for nline, line in enumerate(FatturaBody.DatiBeniServizi.DatiRiepilogo):
@@ -1782,9 +1818,8 @@ class WizardImportFatturapa(models.TransientModel):
                 invoice_line_data["move_id"] = invoice.id
 
                 product = partner.e_invoice_default_product_id
-                self._set_invoice_lines(
-                    product, invoice_line_data, invoice_lines, invoice_line_model
-                )
+                self._set_invoice_line_product(product, invoice_line_data)
+                invoice_lines_data.append(invoice_line_data)
 
         elif self.e_invoice_detail_level == "2":
             for line in FatturaBody.DatiBeniServizi.DettaglioLinee:
@@ -1794,9 +1829,12 @@ class WizardImportFatturapa(models.TransientModel):
                 invoice_line_data["move_id"] = invoice.id
 
                 product = self.get_line_product(line, partner)
-                self._set_invoice_lines(
-                    product, invoice_line_data, invoice_lines, invoice_line_model
-                )
+                self._set_invoice_line_product(product, invoice_line_data)
+                invoice_lines_data.append(invoice_line_data)
+        # Create all the lines of the bill at once
+        self.create_and_get_line_ids(
+            invoice_lines, invoice_line_model, invoice_lines_data
+        )
         return invoice_lines
 
     def check_invoice_amount(self, invoice, FatturaElettronicaBody):
@@ -1851,6 +1889,16 @@ class WizardImportFatturapa(models.TransientModel):
         )
         invoice_line_ids.append(invoice_line_id)
 
+    def create_and_get_line_ids(
+        self, invoice_line_ids, invoice_line_model, upd_vals_list
+    ):
+        if not upd_vals_list:
+            return
+        invoice_lines = invoice_line_model.with_context(
+            check_move_validity=False
+        ).create(upd_vals_list)
+        invoice_line_ids.extend(invoice_lines.ids)
+
     def _set_decimal_precision(self, precision_name, field_name):
         precision = self.env["decimal.precision"].search(
             [("name", "=", precision_name)], limit=1
@@ -1910,6 +1958,10 @@ class WizardImportFatturapa(models.TransientModel):
         # convert to dict in order to be able to modify context
         fatturapa_attachments = self._get_selected_records()
         self.env.context = dict(self.env.context)
+        # Reference data is looked up once for all the selected attachments;
+        # callers importing many files can share it between runs
+        # by passing their own cache in the context
+        self.env.context.setdefault(LOOKUP_CACHE_KEY, {})
         for fatturapa_attachment in fatturapa_attachments:
             self.reset_inconsistencies()
             self._check_attachment(fatturapa_attachment)
@@ -1,11 +1,14 @@
 # Copyright 2018 Lorenzo Battistini <https://github.com/eLBati>
 
 import logging
+import re
 
 from odoo import _, fields, models
 
 _logger = logging.getLogger(__name__)
 MAX_POP_MESSAGES = 50
+IMAP_FETCH_CHUNK = 50
+IMAP_UID_REGEX = re.compile(rb"UID (\d+)")
 
 
 class Fetchmail(models.Model):
@@ -18,6 +21,13 @@ class Fetchmail(models.Model):
 
     last_pec_error_message = fields.Text("Last PEC Error Message", readonly=True)
     pec_error_count = fields.Integer("PEC error count", readonly=True)
+    pec_imap_uidvalidity = fields.Char("PEC IMAP UIDVALIDITY", readonly=True)
+    pec_imap_last_uid = fields.Integer(
+        "Last fetched PEC IMAP UID",
+        help="Messages of the IMAP mailbox up to this UID have already been "
+        "fetched, the ones that could not be processed are left unread and "
+        "fetched again. Set it to 0 to fetch again all the unread messages.",
+    )
     e_inv_notify_partner_ids = fields.Many2many(
         "res.partner",
         string="Contacts to notify",
@@ -26,6 +36,73 @@ class Fetchmail(models.Model):
         default=_default_e_inv_notify_partner_ids,
     )
 
+    def _process_pec_message(
+        self, MailThread, message, error_messages, **additional_context
+    ):
+        """
+        Process `message` in its own savepoint,
+        so that a failure only skips this message.
+
+        :return: True if the message has been processed
+        """
+        self.ensure_one()
+        try:
+            with self.env.cr.savepoint():
+                MailThread.with_context(**additional_context).message_process(
+                    self.object_id.model,
+                    message,
+                    save_original=self.original,
+                    strip_attachments=(not self.attach),
+                )
+        except Exception as e:
+            self.manage_pec_failure(e, error_messages)
+            return False
+        # if message is processed without exceptions
+        self.last_pec_error_message = ""
+        return True
+
+    def _get_imap_uidvalidity(self, imap_server):
+        _result, data = imap_server.response("UIDVALIDITY")
+        uidvalidity = data and data[0] or b""
+        if isinstance(uidvalidity, bytes):
+            uidvalidity = uidvalidity.decode()
+        return uidvalidity
+
+    def _search_imap_new_uids(self, imap_server):
+        """UIDs of the messages received after the last fetched one,
+        and of the previous ones left unread because they failed."""
+        self.ensure_one()
+        last_uid = self.pec_imap_last_uid
+        if not last_uid:
+            # First fetch: only the unread messages
+            _result, data = imap_server.uid("search", None, "(UNSEEN)")
+            return sorted(int(uid) for uid in data[0].split())
+        _result, data = imap_server.uid("search", None, f"UID {last_uid + 1}:*")
+        # "N:*" always matches the last message of the mailbox,
+        # even if its UID is lower than N
+        uids = {int(uid) for uid in data[0].split() if int(uid) > last_uid}
+        _result, data = imap_server.uid("search", None, f"(UNSEEN UID 1:{last_uid})")
+        uids.update(int(uid) for uid in data[0].split())
+        return sorted(uids)
+
+    def _fetch_imap_messages(self, imap_server, uids):
+        """
+        Fetch the messages `uids` at once,
+        without marking them as read.
+
+        :return: dictionary {UID: raw message}
+        """
+        uid_set = ",".join(str(uid) for uid in uids)
+        _result, data = imap_server.uid("fetch", uid_set, "(UID BODY.PEEK[])")
+        messages = {}
+        for item in data:
+            if not isinstance(item, tuple):
+                continue
+            match = IMAP_UID_REGEX.search(item[0])
+            if match:
+                messages[int(match.group(1))] = item[1]
+        return messages
+
     def fetch_mail_server_type_imap(
         self, server, MailThread, error_messages, **additional_context
     ):
@@ -33,24 +110,41 @@ class Fetchmail(models.Model):
         try:
             imap_server = server.connect()
             imap_server.select()
-            result, data = imap_server.search(None, "(UNSEEN)")
-            for num in data[0].split():
-                result, data = imap_server.fetch(num, "(RFC822)")
-                imap_server.store(num, "-FLAGS", "\\Seen")
-                try:
-                    MailThread.with_context(**additional_context).message_process(
-                        server.object_id.model,
-                        data[0][1],
-                        save_original=server.original,
-                        strip_attachments=(not server.attach),
+            uidvalidity = server._get_imap_uidvalidity(imap_server)
+            if uidvalidity != (server.pec_imap_uidvalidity or ""):
+                # UIDs have been reassigned by the server:
+                # the last fetched UID is meaningless
+                server.write(
+                    {
+                        "pec_imap_uidvalidity": uidvalidity,
+                        "pec_imap_last_uid": 0,
+                    }
+                )
+            uids = server._search_imap_new_uids(imap_server)
+            for index in range(0, len(uids), IMAP_FETCH_CHUNK):
+                chunk_uids = uids[index : index + IMAP_FETCH_CHUNK]
+                messages = server._fetch_imap_messages(imap_server, chunk_uids)
+                processed_uids = [
+                    uid
+                    for uid in chunk_uids
+                    if uid in messages
+                    and server._process_pec_message(
+                        MailThread, messages[uid], error_messages, **additional_context
+                    )
+                ]
+                # Messages that can't be processed are left unread
+                # and notified, they don't block the following ones
+                if processed_uids:
+                    imap_server.uid(
+                        "store",
+                        ",".join(str(uid) for uid in processed_uids),
+                        "+FLAGS",
+                        "\\Seen",
                     )
-                    # if message is processed without exceptions
-                    server.last_pec_error_message = ""
-                except Exception as e:
-                    server.manage_pec_failure(e, error_messages)
-                    continue
-                imap_server.store(num, "+FLAGS", "\\Seen")
-                # We need to commit because message is processed:
+                # Failed messages are searched again by being unread,
+                # the UID of the last message fetched is never lowered
+                server.pec_imap_last_uid = max(server.pec_imap_last_uid, chunk_uids[-1])
+                # We need to commit because messages are processed:
                 # Possible next exceptions, out of try, should not
                 # rollback processed messages
                 self._cr.commit()  # pylint: disable=invalid-commit
@@ -66,29 +160,28 @@ class Fetchmail(models.Model):
     ):
         pop_server = None
         try:
+            # Messages that can't be processed are not deleted,
+            # so after reconnecting they come before the ones to be fetched
+            failed_count = 0
             while True:
                 pop_server = server.connect()
                 (num_messages, total_size) = pop_server.stat()
                 pop_server.list()
-                for num in range(1, min(MAX_POP_MESSAGES, num_messages) + 1):
+                last_num = min(failed_count + MAX_POP_MESSAGES, num_messages)
+                for num in range(failed_count + 1, last_num + 1):
                     (header, messages, octets) = pop_server.retr(num)
                     message = "\n".join(messages)
-                    try:
-                        MailThread.with_context(**additional_context).message_process(
-                            server.object_id.model,
-                            message,
-                            save_original=server.original,
-                            strip_attachments=(not server.attach),
-                        )
+                    if server._process_pec_message(
+                        MailThread, message, error_messages, **additional_context
+                    ):
                         pop_server.dele(num)
-                        # See the comments in the IMAP part
-                        server.last_pec_error_message = ""
-                    except Exception as e:
-                        server.manage_pec_failure(e, error_messages)
+                    else:
+                        failed_count += 1
                         continue
+                    # See the comments in the IMAP part
                     # pylint: disable=invalid-commit
                     self._cr.commit()
-                if num_messages < MAX_POP_MESSAGES:
+                if last_num == num_messages:
                     break
                 pop_server.quit()
         except Exception as e:
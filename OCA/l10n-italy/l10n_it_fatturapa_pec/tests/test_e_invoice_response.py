@@ -11,6 +11,61 @@ from odoo.tools import mute_logger, pycompat
 from .e_invoice_common import EInvoiceCommon
 
 
+class IMAPStub:
+    """Local IMAP server holding `messages` {UID: raw message}."""
+
+    def __init__(self, messages, uidvalidity=b"1"):
+        self.messages = messages
+        self.uidvalidity = uidvalidity
+        self.seen = set()
+        self.fetched_uids = []
+
+    def select(self, mailbox="INBOX"):
+        return "OK", [str(len(self.messages)).encode()]
+
+    def response(self, code):
+        return code, [self.uidvalidity]
+
+    def uid(self, command, *args):
+        if command == "search":
+            criteria = args[-1]
+            if criteria == "(UNSEEN)":
+                uids = [uid for uid in self.messages if uid not in self.seen]
+            elif criteria.startswith("(UNSEEN UID 1:"):
+                last_uid = int(criteria[:-1].split(":")[1])
+                uids = [
+                    uid
+                    for uid in self.messages
+                    if uid not in self.seen and uid <= last_uid
+                ]
+            else:
+                first_uid = int(criteria.split()[1].split(":")[0])
+                uids = [uid for uid in self.messages if uid >= first_uid]
+                # like real servers, "N:*" matches at least the last message
+                uids = uids or [max(self.messages)]
+            return "OK", [" ".join(str(uid) for uid in sorted(uids)).encode()]
+        uids = [int(uid) for uid in args[0].split(",")]
+        if command == "fetch":
+            self.fetched_uids.append(uids)
+            data = []
+            for uid in uids:
+                message = self.messages[uid].encode()
+                data.append(
+                    (b"%d (UID %d BODY[] {%d}" % (uid, uid, len(message)), message)
+                )
+                data.append(b")")
+            return "OK", data
+        if command == "store":
+            self.seen.update(uids)
+            return "OK", []
+
+    def close(self):
+        pass
+
+    def logout(self):
+        pass
+
+
 @tagged("post_install", "-at_install")
 class TestEInvoiceResponse(EInvoiceCommon):
     def setUp(self):
@@ -164,3 +219,39 @@ class TestEInvoiceResponse(EInvoiceCommon):
         return email.message_from_string(
             pycompat.to_text(text), policy=email.policy.SMTP
         )
+
+    def test_fetch_imap_incremental(self):
+        """Messages are fetched once by UID,
+        a message that can't be processed does not block the others"""
+        e_invoice = self._create_e_invoice()
+        self.set_e_invoice_file_id(e_invoice, "IT03339130126_00009.xml")
+        e_invoice.send_via_pec()
+        self.PEC_server.server_type = "imap"
+
+        not_sdi_mail = (
+            "From: someone@example.com\n"
+            "To: pec@example.com\n"
+            "Subject: Not an e-invoice\n"
+            "Message-Id: <imap-stub-not-sdi@example.com>\n"
+            "\n"
+            "Hello"
+        )
+        incoming_mail = self._get_file(
+            "POSTA CERTIFICATA_ Ricevuta di consegna 6782414.txt"
+        )
+        imap_stub = IMAPStub({3: not_sdi_mail, 5: incoming_mail})
+        with mock.patch.object(
+            type(self.PEC_server), "connect", return_value=imap_stub
+        ), mute_logger("odoo.addons.l10n_it_fatturapa_pec.models.fetchmail"):
+            self.PEC_server.fetch_mail()
+            self.assertEqual(e_invoice.state, "validated")
+            self.assertEqual(imap_stub.fetched_uids, [[3, 5]])
+            self.assertEqual(imap_stub.seen, {5})
+            self.assertEqual(self.PEC_server.pec_imap_last_uid, 5)
+            self.assertEqual(self.PEC_server.pec_error_count, 1)
+
+            # Nothing new in the mailbox: only the failed message is fetched again
+            self.PEC_server.fetch_mail()
+            self.assertEqual(imap_stub.fetched_uids, [[3, 5], [3]])
+            self.assertEqual(imap_stub.seen, {5})
+            self.assertEqual(self.PEC_server.pec_imap_last_uid, 5)
@@ -1,6 +1,8 @@
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
 import time
+from collections import defaultdict
+from functools import partial
 
 from odoo import api, models
 from odoo.exceptions import UserError
@@ -18,18 +20,30 @@ class ReportRegistroIva(models.AbstractModel):
 
         date_format = data["form"]["date_format"]
 
+        # Amounts of all the moves are computed at once,
+        # the template only reads them
+        moves = self.env["account.move"].browse(data["ids"])
+        amounts_by_move_id = self._tax_amounts_by_move_id(
+            moves, data["form"]["registry_type"]
+        )
+        totals_by_move_id = self._get_move_totals(moves)
+
         docargs = {
             "doc_ids": data["ids"],
             "doc_model": self.env["account.move"],
             "data": data["form"],
             "docs": self.env["account.move"].browse(data["ids"]),
             "get_move": self._get_move,
-            "tax_lines": self._get_tax_lines,
+            "tax_lines": partial(
+                self._get_tax_lines, amounts_by_move_id=amounts_by_move_id
+            ),
             "format_date": self._format_date,
             "from_date": self._format_date(data["form"]["from_date"], date_format),
             "to_date": self._format_date(data["form"]["to_date"], date_format),
             "registry_type": data["form"]["registry_type"],
-            "invoice_total": self._get_move_total,
+            "invoice_total": partial(
+                self._get_move_total, totals_by_move_id=totals_by_move_id
+            ),
             "tax_registry_name": data["form"]["tax_registry_name"],
             "env": self.env,
             "formatLang": formatLang,
@@ -57,28 +71,89 @@ class ReportRegistroIva(models.AbstractModel):
             formatted_date = my_date.strftime(date_format)
         return formatted_date or ""
 
-    def _get_move_line(self, move, data):
-        return [move_line for move_line in move.line_ids]
-
-    def _tax_amounts_by_tax_id(self, move, move_lines, registry_type):
-        res = {}
-
-        for move_line in move_lines:
-            set_cee_absolute_value = False
-            if not (move_line.tax_line_id or move_line.tax_ids):
-                continue
+    def _get_tax_amounts_rows(self, moves):
+        """Sum the balance of the lines of `moves` by move and tax.
 
-            if move_line.tax_ids and len(move_line.tax_ids) != 1:
-                raise UserError(
-                    _("Move line %s has too many base taxes") % move_line.name
+        A line is a base line if it has a tax in `tax_ids`,
+        otherwise it is a tax line if it has `tax_line_id`.
+        """
+        self.env["account.move.line"].flush_model(
+            ["move_id", "tax_ids", "tax_line_id", "debit", "credit", "name"]
+        )
+        self.env.cr.execute(
+            """
+            SELECT aml.name
+            FROM account_move_line aml
+            JOIN account_move_line_account_tax_rel rel
+                ON rel.account_move_line_id = aml.id
+            WHERE aml.move_id IN %(move_ids)s
+            GROUP BY aml.id
+            HAVING COUNT(*) > 1
+            LIMIT 1
+            """,
+            {"move_ids": tuple(moves.ids)},
+        )
+        too_many_taxes = self.env.cr.fetchone()
+        if too_many_taxes:
+            raise UserError(
+                _("Move line %s has too many base taxes") % too_many_taxes[0]
+            )
+        self.env.cr.execute(
+            """
+            SELECT
+                aml.move_id,
+                rel.account_tax_id AS tax_id,
+                TRUE AS is_base,
+                MIN(aml.id) AS first_line_id,
+                SUM(aml.debit - aml.credit) AS amount,
+                SUM(ABS(aml.debit - aml.credit)) AS absolute_amount
+            FROM account_move_line aml
+            JOIN account_move_line_account_tax_rel rel
+                ON rel.account_move_line_id = aml.id
+            WHERE aml.move_id IN %(move_ids)s
+            GROUP BY aml.move_id, rel.account_tax_id
+            UNION ALL
+            SELECT
+                aml.move_id,
+                aml.tax_line_id AS tax_id,
+                FALSE AS is_base,
+                MIN(aml.id) AS first_line_id,
+                SUM(aml.debit - aml.credit) AS amount,
+                SUM(ABS(aml.debit - aml.credit)) AS absolute_amount
+            FROM account_move_line aml
+            WHERE aml.move_id IN %(move_ids)s
+                AND aml.tax_line_id IS NOT NULL
+                AND NOT EXISTS (
+                    SELECT 1
+                    FROM account_move_line_account_tax_rel rel
+                    WHERE rel.account_move_line_id = aml.id
                 )
+            GROUP BY aml.move_id, aml.tax_line_id
+            ORDER BY move_id, first_line_id
+            """,
+            {"move_ids": tuple(moves.ids)},
+        )
+        return self.env.cr.dictfetchall()
 
-            if move_line.tax_ids:
-                tax = move_line.tax_ids[0]
-                is_base = True
-            else:
-                tax = move_line.tax_line_id
-                is_base = False
+    def _tax_amounts_by_move_id(self, moves, registry_type):
+        """
+        Returns:
+            A dictionary {move id: {tax id: {"name", "base", "tax"}}}
+            where taxes are grouped by their main tax.
+        """
+        res = defaultdict(dict)
+        if not moves:
+            return res
+        rows = self._get_tax_amounts_rows(moves)
+        # Read the taxes and the moves involved all at once
+        taxes = self.env["account.tax"].browse({row["tax_id"] for row in rows})
+        taxes.mapped("parent_tax_ids")
+        moves.mapped("financial_type")
+
+        for row in rows:
+            move = moves.browse(row["move_id"])
+            tax = taxes.browse(row["tax_id"])
+            set_cee_absolute_value = False
 
             if (registry_type == "customer" and tax.cee_type == "sale") or (
                 registry_type == "supplier" and tax.cee_type == "purchase"
@@ -95,35 +170,39 @@ class ReportRegistroIva(models.AbstractModel):
             if tax.exclude_from_registries:
                 continue
 
-            if not res.get(tax.id):
-                res[tax.id] = {
+            move_amounts = res[move.id]
+            if not move_amounts.get(tax.id):
+                move_amounts[tax.id] = {
                     "name": tax.name,
                     "base": 0,
                     "tax": 0,
                 }
-            tax_amount = move_line.debit - move_line.credit
 
             if set_cee_absolute_value:
-                tax_amount = abs(tax_amount)
+                tax_amount = float(row["absolute_amount"])
+            else:
+                tax_amount = float(row["amount"])
             if "receivable" in move.financial_type:
                 # otherwise refund would be positive and invoices
                 # negative.
                 tax_amount = -tax_amount
 
-            if is_base:
+            if row["is_base"]:
                 # recupero il valore dell'imponibile
-                res[tax.id]["base"] += tax_amount
+                move_amounts[tax.id]["base"] += tax_amount
             else:
                 # recupero il valore dell'imposta
-                res[tax.id]["tax"] += tax_amount
+                move_amounts[tax.id]["tax"] += tax_amount
 
         return res
 
-    def _get_tax_lines(self, move, data):
+    def _get_tax_lines(self, move, data, amounts_by_move_id=None):
         """
 
         Args:
             move: the account.move representing the invoice
+            amounts_by_move_id: the amounts computed by
+                `_tax_amounts_by_move_id`, including `move`
 
         Returns:
             A tuple of lists: (INVOICE_TAXES, TAXES_USED)
@@ -142,11 +221,11 @@ class ReportRegistroIva(models.AbstractModel):
         else:
             invoice_type = "FA"
 
-        move_lines = self._get_move_line(move, data)
-
-        amounts_by_tax_id = self._tax_amounts_by_tax_id(
-            move, move_lines, data["registry_type"]
-        )
+        if amounts_by_move_id is None:
+            amounts_by_move_id = self._tax_amounts_by_move_id(
+                move, data["registry_type"]
+            )
+        amounts_by_tax_id = amounts_by_move_id.get(move.id, {})
 
         for tax_id in amounts_by_tax_id:
             tax = self.env["account.tax"].browse(tax_id)
@@ -164,9 +243,7 @@ class ReportRegistroIva(models.AbstractModel):
                 # dictionary itself (instead of receiving a raw-data-only dict)
                 "tax_rec": tax,
                 "move_rec": move,
-                "move_line_rec": self.env["account.move.line"].browse(
-                    [move_line.id for move_line in move_lines]
-                ),
+                "move_line_rec": move.line_ids,
                 "invoice_rec": move,
             }
             inv_taxes.append(tax_item)
@@ -175,23 +252,59 @@ class ReportRegistroIva(models.AbstractModel):
 
         return inv_taxes, used_taxes
 
-    def _get_move_total(self, move):
-        total = 0.0
-        receivable_payable_found = False
-        for move_line in move.line_ids:
-            if move_line.account_id.account_type == "asset_receivable":
-                total += move_line.debit or (-move_line.credit)
-                receivable_payable_found = True
-            elif move_line.account_id.account_type == "liability_payable":
-                total += (-move_line.debit) or move_line.credit
-                receivable_payable_found = True
-        if receivable_payable_found:
-            total = abs(total)
-        else:
-            total = abs(move.amount_total)
-        if "refund" in move.move_type:
-            total = -total
-        return total
+    def _get_move_totals(self, moves):
+        """
+        Returns:
+            A dictionary {move id: total}
+        """
+        if not moves:
+            return {}
+        self.env["account.move.line"].flush_model(
+            ["move_id", "account_id", "debit", "credit"]
+        )
+        self.env["account.account"].flush_model(["account_type"])
+        self.env.cr.execute(
+            """
+            SELECT
+                aml.move_id,
+                SUM(
+                    CASE
+                        WHEN aa.account_type = 'asset_receivable'
+                            THEN CASE
+                                WHEN aml.debit != 0 THEN aml.debit
+                                ELSE -aml.credit
+                            END
+                        ELSE CASE
+                            WHEN aml.debit != 0 THEN -aml.debit
+                            ELSE aml.credit
+                        END
+                    END
+                ) AS total
+            FROM account_move_line aml
+            JOIN account_account aa ON aa.id = aml.account_id
+            WHERE aml.move_id IN %(move_ids)s
+                AND aa.account_type IN ('asset_receivable', 'liability_payable')
+            GROUP BY aml.move_id
+            """,
+            {"move_ids": tuple(moves.ids)},
+        )
+        receivable_payable_totals = dict(self.env.cr.fetchall())
+
+        totals = {}
+        for move in moves:
+            if move.id in receivable_payable_totals:
+                total = abs(float(receivable_payable_totals[move.id]))
+            else:
+                total = abs(move.amount_total)
+            if "refund" in move.move_type:
+                total = -total
+            totals[move.id] = total
+        return totals
+
+    def _get_move_total(self, move, totals_by_move_id=None):
+        if totals_by_move_id is None:
+            totals_by_move_id = self._get_move_totals(move)
+        return totals_by_move_id[move.id]
 
     def _compute_totals_tax(self, tax, data):
         """
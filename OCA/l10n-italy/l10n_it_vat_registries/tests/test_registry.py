@@ -84,6 +84,12 @@ class TestRegistry(TransactionCase):
 
         self.assertTrue(b"Tax 10.0" in html[0])
 
+        report_model = self.env["report.l10n_it_vat_registries.report_registro_iva"]
+        amounts = report_model._tax_amounts_by_move_id(invoice, "customer")
+        self.assertEqual(amounts[invoice.id][tax.id]["base"], 100)
+        self.assertEqual(amounts[invoice.id][tax.id]["tax"], 10)
+        self.assertEqual(report_model._get_move_total(invoice), 110)
+
     def test_no_report_from_invoice(self):
         """Check that the report is not available from invoice context menu."""
         report_id = self.ref("l10n_it_vat_registries.action_report_registro_iva")
@@ -3,6 +3,7 @@
 
 import re
 from collections import defaultdict
+from datetime import timedelta
 
 from odoo import _, fields
 from odoo.exceptions import UserError
@@ -51,6 +52,9 @@ class AccountingExpressionProcessor(object):
           to notify the processor that it can prepare to query (mainly
           search all accounts - children, consolidation - that will need to
           be queried;
+        * optionally, when several periods will be evaluated with the same
+          move line filter, call prefetch_queries() with all these periods
+          so their data is fetched at once;
         * for each period, call do_queries(), then call replace_expr() for each
           expression to replace accounting variables with their resulting value
           for the given period.
@@ -64,7 +68,12 @@ class AccountingExpressionProcessor(object):
           (note: it seems the orm then does one query per account to fetch
           the account name...);
         * additionally, one query per view/consolidation account is done to
-          discover the children accounts.
+          discover the children accounts;
+        * when periods have been prefetched, there is instead one query per
+          move line domain for all periods and modes, grouped by account,
+          company and date bucket (the buckets being delimited by the period
+          and fiscal year boundaries); do_queries() then sums the relevant
+          buckets of each period without querying the database again.
     """
 
     MODE_VARIATION = "p"
@@ -108,6 +117,14 @@ class AccountingExpressionProcessor(object):
         self.smart_end = True
         # Account model
         self._account_model = self.env[account_model].with_context(active_test=False)
+        # prefetched data: {(aml_model, additional_move_line_filter): cube}
+        self._cubes = {}
+        # ids of accounts for which the initial balance is carried over
+        self._include_initial_balance_account_ids = set()
+        # {accounting variable: (field, mode, acc_domain, ml_domain)}
+        self._parsed_vars = {}
+        # {expr: (compiled expr, [(name, field, mode, acc_domain, ml_domain)])}
+        self._compiled_exprs = {}
 
     def _account_codes_to_domain(self, account_codes):
         """Convert a comma separated list of account codes
@@ -127,6 +144,12 @@ class AccountingExpressionProcessor(object):
 
         Returns field, mode, account domain, move line domain.
         """
+        var = mo.group()
+        if var not in self._parsed_vars:
+            self._parsed_vars[var] = self._parse_var(mo)
+        return self._parsed_vars[var]
+
+    def _parse_var(self, mo):
         domain_eval_context = {
             "ref": self.env.ref,
             "user": self.env.user,
@@ -247,6 +270,12 @@ class AccountingExpressionProcessor(object):
         #      AND(OR(aml_domains[mode]), date_domain[mode]) for each mode
         return expression.OR(aml_domains) + expression.OR(date_domain_by_mode.values())
 
+    def _get_fy_date_from(self, date_from):
+        date_from_date = fields.Date.to_date(date_from)
+        # TODO this takes the fy from the first company
+        # make that user controllable (nice to have)?
+        return self.companies[0].compute_fiscalyear_dates(date_from_date)["date_from"]
+
     def get_aml_domain_for_dates(self, date_from, date_to, mode):
         if mode == self.MODE_VARIATION:
             domain = [("date", ">=", date_from), ("date", "<=", date_to)]
@@ -254,12 +283,7 @@ class AccountingExpressionProcessor(object):
             # for income and expense account, sum from the beginning
             # of the current fiscal year only, for balance sheet accounts
             # sum from the beginning of time
-            date_from_date = fields.Date.from_string(date_from)
-            # TODO this takes the fy from the first company
-            # make that user controllable (nice to have)?
-            fy_date_from = self.companies[0].compute_fiscalyear_dates(date_from_date)[
-                "date_from"
-            ]
+            fy_date_from = self._get_fy_date_from(date_from)
             domain = [
                 "|",
                 ("date", ">=", fields.Date.to_string(fy_date_from)),
@@ -270,12 +294,7 @@ class AccountingExpressionProcessor(object):
             elif mode == self.MODE_END:
                 domain.append(("date", "<=", date_to))
         elif mode == self.MODE_UNALLOCATED:
-            date_from_date = fields.Date.from_string(date_from)
-            # TODO this takes the fy from the first company
-            # make that user controllable (nice to have)?
-            fy_date_from = self.companies[0].compute_fiscalyear_dates(date_from_date)[
-                "date_from"
-            ]
+            fy_date_from = self._get_fy_date_from(date_from)
             domain = [
                 ("date", "<", fields.Date.to_string(fy_date_from)),
                 ("account_id.user_type_id.include_initial_balance", "=", False),
@@ -294,6 +313,182 @@ class AccountingExpressionProcessor(object):
             company_rates[company.id] = (rate, company.currency_id.decimal_places)
         return company_rates
 
+    def _get_aml_model(self, aml_model=None):
+        if not aml_model:
+            aml_model = self.env["account.move.line"]
+        else:
+            aml_model = self.env[aml_model]
+        return aml_model.with_context(active_test=False)
+
+    @staticmethod
+    def _get_cube_key(additional_move_line_filter, aml_model):
+        # domains may contain lists, so use their representation as key
+        return (aml_model or "account.move.line", repr(additional_move_line_filter))
+
+    def prefetch_queries(
+        self,
+        periods,
+        additional_move_line_filter=None,
+        aml_model=None,
+    ):
+        """Query sums of debit and credit for several periods at once.
+
+        :param periods: an iterable of (date_from, date_to) tuples
+
+        All periods are fetched with one query per move line domain,
+        grouped by account, company and date bucket. Subsequent calls to
+        do_queries() for one of these periods, with the same
+        additional_move_line_filter and aml_model, are then served from
+        the fetched data instead of querying the database.
+
+        This method must be executed after done_parsing().
+        """
+        periods = {
+            (fields.Date.to_date(date_from), fields.Date.to_date(date_to))
+            for date_from, date_to in periods
+        }
+        if not periods:
+            return
+        aml_model = self._get_aml_model(aml_model)
+        # {ml_domain: set(mode)}, {ml_domain: set(account_ids)}
+        modes_by_ml_domain = defaultdict(set)
+        account_ids_by_ml_domain = defaultdict(set)
+        for (ml_domain, mode), account_ids in self._map_account_ids.items():
+            modes_by_ml_domain[ml_domain].add(mode)
+            account_ids_by_ml_domain[ml_domain].update(account_ids)
+        all_modes = set().union(*modes_by_ml_domain.values())
+        # the bucket boundaries
+        boundaries = set()
+        for date_from, date_to in periods:
+            boundaries.add(date_from)
+            boundaries.add(date_to + timedelta(days=1))
+            if all_modes - {self.MODE_VARIATION}:
+                boundaries.add(self._get_fy_date_from(date_from))
+        boundaries = sorted(boundaries)
+        all_account_ids = set().union(*account_ids_by_ml_domain.values())
+        self._include_initial_balance_account_ids.update(
+            self._account_model.search(
+                [
+                    ("id", "in", list(all_account_ids)),
+                    ("user_type_id.include_initial_balance", "=", True),
+                ]
+            ).ids
+        )
+        # {ml_domain: {(account_id, company_id): {bucket: (debit, credit)}}}
+        data = {}
+        for ml_domain, modes in modes_by_ml_domain.items():
+            domain = list(ml_domain) + [
+                ("account_id", "in", list(account_ids_by_ml_domain[ml_domain])),
+                ("date", "<", fields.Date.to_string(boundaries[-1])),
+            ]
+            if modes == {self.MODE_VARIATION}:
+                min_date_from = min(period[0] for period in periods)
+                domain.append(("date", ">=", fields.Date.to_string(min_date_from)))
+            if additional_move_line_filter:
+                domain.extend(additional_move_line_filter)
+            data[ml_domain] = self._query_buckets(aml_model, domain, boundaries)
+        cube_key = self._get_cube_key(additional_move_line_filter, aml_model._name)
+        self._cubes[cube_key] = {
+            "periods": periods,
+            "boundaries": boundaries,
+            "data": data,
+        }
+
+    def _query_buckets(self, aml_model, domain, boundaries):
+        """Fetch sums of debit and credit for move lines matching domain,
+        grouped by account_id, company_id and date bucket.
+
+        Bucket 0 contains the move lines before the first boundary, and
+        bucket i contains the move lines between boundaries i-1 (included)
+        and i (excluded).
+        """
+        aml_model.check_access_rights("read")
+        query = aml_model._where_calc(domain)
+        aml_model._apply_ir_rules(query, "read")
+        from_clause, where_clause, where_params = query.get_sql()
+        table = aml_model._table
+        sql = f"""
+            SELECT
+                "{table}".account_id,
+                "{table}".company_id,
+                width_bucket("{table}".date, %s::date[]),
+                SUM("{table}".debit),
+                SUM("{table}".credit)
+            FROM {from_clause}
+            WHERE {where_clause or "TRUE"}
+            GROUP BY 1, 2, 3
+        """
+        self.env.cr.execute(sql, [boundaries] + where_params)
+        res = defaultdict(dict)
+        for account_id, company_id, bucket, debit, credit in self.env.cr.fetchall():
+            res[(account_id, company_id)][bucket] = (debit or 0.0, credit or 0.0)
+        return res
+
+    def _get_bucket_range(self, cube, account_id, mode, date_from, date_to):
+        """Return the (first, last) buckets to sum for an account in a mode,
+        or None if the account is not involved in that mode."""
+        boundaries = cube["boundaries"]
+        from_bucket = boundaries.index(date_from)
+        to_bucket = boundaries.index(date_to + timedelta(days=1))
+        if mode == self.MODE_VARIATION:
+            return from_bucket + 1, to_bucket
+        include_initial_balance = (
+            account_id in self._include_initial_balance_account_ids
+        )
+        fy_bucket = boundaries.index(self._get_fy_date_from(date_from))
+        if mode == self.MODE_UNALLOCATED:
+            if include_initial_balance:
+                return None
+            return 0, fy_bucket
+        # for income and expense account, sum from the beginning
+        # of the current fiscal year only, for balance sheet accounts
+        # sum from the beginning of time
+        first = 0 if include_initial_balance else fy_bucket + 1
+        if mode == self.MODE_INITIAL:
+            return first, from_bucket
+        elif mode == self.MODE_END:
+            return first, to_bucket
+
+    def _read_cube(self, cube, key, date_from, date_to):
+        """Sum the buckets of prefetched data for a (domain, mode) key
+        over a period, yielding (account_id, company_id, debit, credit)."""
+        ml_domain, mode = key
+        account_ids = set(self._map_account_ids[key])
+        for (account_id, company_id), buckets in cube["data"][ml_domain].items():
+            if account_id not in account_ids:
+                continue
+            bucket_range = self._get_bucket_range(
+                cube, account_id, mode, date_from, date_to
+            )
+            if not bucket_range:
+                continue
+            first, last = bucket_range
+            found = False
+            debit = credit = 0.0
+            for bucket, (bucket_debit, bucket_credit) in buckets.items():
+                if first <= bucket <= last:
+                    found = True
+                    debit += bucket_debit
+                    credit += bucket_credit
+            if found:
+                yield account_id, company_id, debit, credit
+
+    def _read_group(self, aml_model, domain):
+        # fetch sum of debit/credit, grouped by account_id
+        accs = aml_model.read_group(
+            domain,
+            ["debit", "credit", "account_id", "company_id"],
+            ["account_id", "company_id"],
+            lazy=False,
+        )
+        for acc in accs:
+            yield (
+                acc["account_id"][0],
+                acc["company_id"][0],
+                acc["debit"] or 0.0,
+                acc["credit"] or 0.0,
+            )
+
     def do_queries(
         self,
         date_from,
@@ -304,14 +499,19 @@ class AccountingExpressionProcessor(object):
         """Query sums of debit and credit for all accounts and domains
         used in expressions.
 
+        If the period has been prefetched with prefetch_queries(),
+        the sums are obtained from the prefetched data.
+
         This method must be executed after done_parsing().
         """
-        if not aml_model:
-            aml_model = self.env["account.move.line"]
-        else:
-            aml_model = self.env[aml_model]
-        aml_model = aml_model.with_context(active_test=False)
+        aml_model = self._get_aml_model(aml_model)
         company_rates = self._get_company_rates(date_to)
+        cube = self._cubes.get(
+            self._get_cube_key(additional_move_line_filter, aml_model._name)
+        )
+        period = (fields.Date.to_date(date_from), fields.Date.to_date(date_to))
+        if cube and period not in cube["periods"]:
+            cube = None
         # {(domain, mode): {account_id: (debit, credit)}}
         self._data = defaultdict(dict)
         domain_by_mode = {}
@@ -322,31 +522,26 @@ class AccountingExpressionProcessor(object):
                 # postpone computation of ending balance
                 ends.append((domain, mode))
                 continue
-            if mode not in domain_by_mode:
-                domain_by_mode[mode] = self.get_aml_domain_for_dates(
-                    date_from, date_to, mode
-                )
-            domain = list(domain) + domain_by_mode[mode]
-            domain.append(("account_id", "in", self._map_account_ids[key]))
-            if additional_move_line_filter:
-                domain.extend(additional_move_line_filter)
-            # fetch sum of debit/credit, grouped by account_id
-            accs = aml_model.read_group(
-                domain,
-                ["debit", "credit", "account_id", "company_id"],
-                ["account_id", "company_id"],
-                lazy=False,
-            )
-            for acc in accs:
-                rate, dp = company_rates[acc["company_id"][0]]
-                debit = acc["debit"] or 0.0
-                credit = acc["credit"] or 0.0
+            if cube:
+                accs = self._read_cube(cube, key, *period)
+            else:
+                if mode not in domain_by_mode:
+                    domain_by_mode[mode] = self.get_aml_domain_for_dates(
+                        date_from, date_to, mode
+                    )
+                domain = list(domain) + domain_by_mode[mode]
+                domain.append(("account_id", "in", self._map_account_ids[key]))
+                if additional_move_line_filter:
+                    domain.extend(additional_move_line_filter)
+                accs = self._read_group(aml_model, domain)
+            for account_id, company_id, debit, credit in accs:
+                rate, dp = company_rates[company_id]
                 if mode in (self.MODE_INITIAL, self.MODE_UNALLOCATED) and float_is_zero(
                     debit - credit, precision_digits=self.dp
                 ):
                     # in initial mode, ignore accounts with 0 balance
                     continue
-                self._data[key][acc["account_id"][0]] = (debit * rate, credit * rate)
+                self._data[key][account_id] = (debit * rate, credit * rate)
         # compute ending balances by summing initial and variation
         for key in ends:
             domain, mode = key
@@ -360,6 +555,80 @@ class AccountingExpressionProcessor(object):
                 )
                 self._data[key][account_id] = (di + dv, ci + cv)
 
+    def _get_value(self, field, mode, acc_domain, ml_domain):
+        """Get the amount of an accounting variable.
+
+        This method must be executed after do_queries().
+        """
+        key = (ml_domain, mode)
+        account_ids_data = self._data[key]
+        v = AccountingNone
+        account_ids = self._account_ids_by_acc_domain[acc_domain]
+        for account_id in account_ids:
+            debit, credit = account_ids_data.get(
+                account_id, (AccountingNone, AccountingNone)
+            )
+            if field == "bal":
+                v += debit - credit
+            elif field == "pbal" and debit >= credit:
+                v += debit - credit
+            elif field == "nbal" and debit < credit:
+                v += debit - credit
+            elif field == "deb":
+                v += debit
+            elif field == "crd":
+                v += credit
+        # in initial balance mode, assume 0 is None
+        # as it does not make sense to distinguish 0 from "no data"
+        if (
+            v is not AccountingNone
+            and mode in (self.MODE_INITIAL, self.MODE_UNALLOCATED)
+            and float_is_zero(v, precision_digits=self.dp)
+        ):
+            v = AccountingNone
+        return v
+
+    def _get_value_for_account(self, account_id, field, mode, acc_domain, ml_domain):
+        """Get the amount of an accounting variable for a given account.
+
+        This method must be executed after do_queries().
+        """
+        key = (ml_domain, mode)
+        # first check if account_id is involved in
+        # the current expression part
+        if account_id not in self._account_ids_by_acc_domain[acc_domain]:
+            return AccountingNone
+        # here we know account_id is involved in acc_domain
+        account_ids_data = self._data[key]
+        debit, credit = account_ids_data.get(
+            account_id, (AccountingNone, AccountingNone)
+        )
+        if field == "bal":
+            v = debit - credit
+        elif field == "pbal":
+            if debit >= credit:
+                v = debit - credit
+            else:
+                v = AccountingNone
+        elif field == "nbal":
+            if debit < credit:
+                v = debit - credit
+            else:
+                v = AccountingNone
+        elif field == "deb":
+            v = debit
+        elif field == "crd":
+            v = credit
+        # in initial balance mode, assume 0 is None
+        # as it does not make sense to distinguish 0 from "no data"
+        if (
+            v is not AccountingNone
+            and mode in (self.MODE_INITIAL, self.MODE_UNALLOCATED)
+            and float_is_zero(v, precision_digits=self.dp)
+        ):
+            v = AccountingNone
+        return v
+
     def replace_expr(self, expr):
         """Replace accounting variables in an expression by their amount.
 
@@ -369,37 +638,62 @@ class AccountingExpressionProcessor(object):
         """
 
         def f(mo):
-            field, mode, acc_domain, ml_domain = self._parse_match_object(mo)
-            key = (ml_domain, mode)
-            account_ids_data = self._data[key]
-            v = AccountingNone
-            account_ids = self._account_ids_by_acc_domain[acc_domain]
-            for account_id in account_ids:
-                debit, credit = account_ids_data.get(
-                    account_id, (AccountingNone, AccountingNone)
-                )
-                if field == "bal":
-                    v += debit - credit
-                elif field == "pbal" and debit >= credit:
-                    v += debit - credit
-                elif field == "nbal" and debit < credit:
-                    v += debit - credit
-                elif field == "deb":
-                    v += debit
-                elif field == "crd":
-                    v += credit
-            # in initial balance mode, assume 0 is None
-            # as it does not make sense to distinguish 0 from "no data"
-            if (
-                v is not AccountingNone
-                and mode in (self.MODE_INITIAL, self.MODE_UNALLOCATED)
-                and float_is_zero(v, precision_digits=self.dp)
-            ):
-                v = AccountingNone
+            v = self._get_value(*self._parse_match_object(mo))
             return "(" + repr(v) + ")"
 
         return self._ACC_RE.sub(f, expr)
 
+    def compile_expr(self, expr):
+        """Replace accounting variables in an expression by variable names.
+
+        Returns a tuple (new expression, variables) where variables is
+        a list of (name, field, mode, account domain, move line domain).
+        The new expression does not depend on the period, so it can be
+        compiled once and evaluated for each period with the values
+        returned by get_values().
+
+        Prerequisite: done_parsing() must have been invoked.
+        """
+        if expr not in self._compiled_exprs:
+            variables = []
+
+            def f(mo):
+                name = "_aep_{}".format(len(variables))
+                variables.append((name,) + self._parse_match_object(mo))
+                return name
+
+            self._compiled_exprs[expr] = (self._ACC_RE.sub(f, expr), variables)
+        return self._compiled_exprs[expr]
+
+    def get_values(self, variables, account_id=None):
+        """Get the amounts of variables returned by compile_expr(),
+        optionally for a given account.
+
+        Returns a dictionary {name: amount}.
+
+        This method must be executed after do_queries().
+        """
+        if account_id is None:
+            return {var[0]: self._get_value(*var[1:]) for var in variables}
+        return {
+            var[0]: self._get_value_for_account(account_id, *var[1:])
+            for var in variables
+        }
+
+    def get_account_ids_with_data(self, variables):
+        """Get the ids of the accounts having data for variables
+        returned by compile_expr().
+
+        This method must be executed after do_queries().
+        """
+        account_ids = set()
+        for _name, _field, mode, acc_domain, ml_domain in variables:
+            account_ids_data = self._data[(ml_domain, mode)]
+            for account_id in self._account_ids_by_acc_domain[acc_domain]:
+                if account_id in account_ids_data:
+                    account_ids.add(account_id)
+        return account_ids
+
     def replace_exprs_by_account_id(self, exprs):
         """Replace accounting variables in a list of expression
         by their amount, iterating by accounts involved in the expression.
@@ -410,54 +704,13 @@ class AccountingExpressionProcessor(object):
         """
 
         def f(mo):
-            field, mode, acc_domain, ml_domain = self._parse_match_object(mo)
-            key = (ml_domain, mode)
-            # first check if account_id is involved in
-            # the current expression part
-            if account_id not in self._account_ids_by_acc_domain[acc_domain]:
-                return "(AccountingNone)"
-            # here we know account_id is involved in acc_domain
-            account_ids_data = self._data[key]
-            debit, credit = account_ids_data.get(
-                account_id, (AccountingNone, AccountingNone)
-            )
-            if field == "bal":
-                v = debit - credit
-            elif field == "pbal":
-                if debit >= credit:
-                    v = debit - credit
-                else:
-                    v = AccountingNone
-            elif field == "nbal":
-                if debit < credit:
-                    v = debit - credit
-                else:
-                    v = AccountingNone
-            elif field == "deb":
-                v = debit
-            elif field == "crd":
-                v = credit
-            # in initial balance mode, assume 0 is None
-            # as it does not make sense to distinguish 0 from "no data"
-            if (
-                v is not AccountingNone
-                and mode in (self.MODE_INITIAL, self.MODE_UNALLOCATED)
-                and float_is_zero(v, precision_digits=self.dp)
-            ):
-                v = AccountingNone
+            v = self._get_value_for_account(account_id, *self._parse_match_object(mo))
             return "(" + repr(v) + ")"
 
-        account_ids = set()
+        variables = []
         for expr in exprs:
-            for mo in self._ACC_RE.finditer(expr):
-                field, mode, acc_domain, ml_domain = self._parse_match_object(mo)
-                key = (ml_domain, mode)
-                account_ids_data = self._data[key]
-                for account_id in self._account_ids_by_acc_domain[acc_domain]:
-                    if account_id in account_ids_data:
-                        account_ids.add(account_id)
-
-        for account_id in account_ids:
+            variables.extend(self.compile_expr(expr)[1])
+        for account_id in self.get_account_ids_with_data(variables):
             yield account_id, [self._ACC_RE.sub(f, expr) for expr in exprs]
 
     @classmethod
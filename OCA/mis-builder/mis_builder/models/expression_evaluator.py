@@ -1,6 +1,8 @@
 # Copyright 2020 ACSONE SA/NV (<http://acsone.eu>)
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl.html).
 
+from collections import ChainMap
+
 from .mis_safe_eval import NameDataError, mis_safe_eval
 
 
@@ -37,14 +39,20 @@ class ExpressionEvaluator(object):
         for expression in expressions:
             expr = expression and expression.name or "AccountingNone"
             if self.aep:
-                replaced_expr = self.aep.replace_expr(expr)
+                # accounting variables are replaced by names, so the
+                # compiled expression is the same for all periods
+                replaced_expr, aep_vars = self.aep.compile_expr(expr)
+            else:
+                replaced_expr, aep_vars = expr, None
+            if aep_vars:
+                eval_dict = ChainMap(locals_dict, self.aep.get_values(aep_vars))
             else:
-                replaced_expr = expr
-            val = mis_safe_eval(replaced_expr, locals_dict)
+                eval_dict = locals_dict
+            val = mis_safe_eval(replaced_expr, eval_dict)
             vals.append(val)
             if isinstance(val, NameDataError):
                 name_error = True
-            if replaced_expr != expr:
+            if aep_vars:
                 drilldown_args.append({"expr": expr})
             else:
                 drilldown_args.append(None)
@@ -54,14 +62,19 @@ class ExpressionEvaluator(object):
         if not self.aep:
             return
         exprs = [e and e.name or "AccountingNone" for e in expressions]
-        for account_id, replaced_exprs in self.aep.replace_exprs_by_account_id(exprs):
+        compiled_exprs = [self.aep.compile_expr(expr) for expr in exprs]
+        all_aep_vars = [var for _expr, aep_vars in compiled_exprs for var in aep_vars]
+        for account_id in self.aep.get_account_ids_with_data(all_aep_vars):
             vals = []
             drilldown_args = []
             name_error = False
-            for expr, replaced_expr in zip(exprs, replaced_exprs):
-                val = mis_safe_eval(replaced_expr, locals_dict)
+            for expr, (replaced_expr, aep_vars) in zip(exprs, compiled_exprs):
+                eval_dict = ChainMap(
+                    locals_dict, self.aep.get_values(aep_vars, account_id)
+                )
+                val = mis_safe_eval(replaced_expr, eval_dict)
                 vals.append(val)
-                if replaced_expr != expr:
+                if aep_vars:
                     drilldown_args.append({"expr": expr, "account_id": account_id})
                 else:
                     drilldown_args.append(None)
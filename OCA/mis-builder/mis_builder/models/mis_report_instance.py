@@ -840,6 +840,30 @@ class MisReportInstance(models.Model):
         elif period.source == SRC_CMPCOL:
             return self._add_column_cmpcol(aep, kpi_matrix, period, label, description)
 
+    def _prefetch_aep_queries(self, aep):
+        """Fetch the accounting data of all move lines columns at once,
+        grouping the columns that share the same move lines model and
+        additional filter."""
+        periods_by_filter = {}
+        for period in self.period_ids:
+            if period.source not in (SRC_ACTUALS, SRC_ACTUALS_ALT):
+                continue
+            if not period.date_from or not period.date_to:
+                continue
+            aml_model = period._get_aml_model_name()
+            additional_move_line_filter = period._get_additional_move_line_filter()
+            key = (aml_model, repr(additional_move_line_filter))
+            periods_by_filter.setdefault(
+                key, (aml_model, additional_move_line_filter, [])
+            )[2].append((period.date_from, period.date_to))
+        for (
+            aml_model,
+            additional_move_line_filter,
+            periods,
+        ) in periods_by_filter.values():
+            if len(periods) > 1:
+                aep.prefetch_queries(periods, additional_move_line_filter, aml_model)
+
     def _compute_matrix(self):
         """Compute a report and return a KpiMatrix.
 
@@ -848,6 +872,7 @@ class MisReportInstance(models.Model):
         """
         self.ensure_one()
         aep = self.report_id._prepare_aep(self.query_company_ids, self.currency_id)
+        self._prefetch_aep_queries(aep)
         kpi_matrix = self.report_id.prepare_kpi_matrix(self.multi_company)
         for period in self.period_ids:
             description = None
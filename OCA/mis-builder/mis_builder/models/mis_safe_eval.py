@@ -2,6 +2,7 @@
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl.html).
 
 import traceback
+from functools import lru_cache
 
 from odoo.tools.safe_eval import _BUILTINS, _SAFE_OPCODES, test_expr
 
@@ -10,6 +11,13 @@ from .data_error import DataError, NameDataError
 __all__ = ["mis_safe_eval"]
 
 
+@lru_cache(maxsize=4096)
+def _compile_expr(expr):
+    """Check and compile an expression, caching the code object
+    so expressions evaluated for each column are compiled once."""
+    return test_expr(expr, _SAFE_OPCODES, mode="eval")
+
+
 def mis_safe_eval(expr, locals_dict):
     """Evaluate an expression using safe_eval
 
@@ -19,7 +27,7 @@ def mis_safe_eval(expr, locals_dict):
     present in local_dict.
     """
     try:
-        c = test_expr(expr, _SAFE_OPCODES, mode="eval")
+        c = _compile_expr(expr)
         globals_dict = {"__builtins__": _BUILTINS}
         # pylint: disable=eval-used,eval-referenced
         val = eval(c, globals_dict, locals_dict)
@@ -3,6 +3,7 @@
 
 import datetime
 import time
+from unittest import mock
 
 import odoo.tests.common as common
 from odoo import fields
@@ -262,6 +263,71 @@ class TestAEP(common.TransactionCase):
         end = self._eval_by_account_id("bale[]")
         self.assertEqual(end, {self.account_ar.id: 900, self.account_in.id: -800})
 
+    def test_aep_prefetch(self):
+        self.aep.done_parsing()
+        prev_year, curr_year = self.prev_year, self.curr_year
+        periods = [
+            (datetime.date(prev_year, 12, 1), datetime.date(prev_year, 12, 31)),
+            (datetime.date(curr_year, 1, 1), datetime.date(curr_year, 1, 31)),
+            (datetime.date(curr_year, 3, 1), datetime.date(curr_year, 3, 31)),
+            (datetime.date(curr_year, 1, 1), datetime.date(curr_year, 3, 31)),
+        ]
+        exprs = [
+            "bali[]",
+            "bale[]",
+            "balp[]",
+            "balu[]",
+            "bali[400AR]",
+            "bale[400AR]",
+            "balp[400AR]",
+            "bali[700IN]",
+            "bale[700IN]",
+            "balp[700IN]",
+            "crdp[700I%]",
+            "debp[400A%]",
+            "balp[][('account_id.code', '=', '400AR')]",
+        ]
+        expected = []
+        for date_from, date_to in periods:
+            self._do_queries(date_from, date_to)
+            expected.append([self._eval(expr) for expr in exprs])
+        self.aep.prefetch_queries(periods)
+        for (date_from, date_to), values in zip(periods, expected):
+            # accounting data is now read from the prefetched buckets
+            with mock.patch.object(AEP, "_read_group") as read_group:
+                self._do_queries(date_from, date_to)
+            read_group.assert_not_called()
+            self.assertEqual([self._eval(expr) for expr in exprs], values)
+        # a period that has not been prefetched is still queried
+        with mock.patch.object(AEP, "_read_group", return_value=[]) as read_group:
+            self._do_queries(
+                datetime.date(curr_year, 2, 1), datetime.date(curr_year, 2, 28)
+            )
+        read_group.assert_called()
+
+    def test_aep_compile_expr(self):
+        self.aep.done_parsing()
+        self._do_queries(
+            datetime.date(self.curr_year, 3, 1), datetime.date(self.curr_year, 3, 31)
+        )
+        expr = "bale[400AR] + balp[700IN] - bali[700IN]"
+        compiled_expr, variables = self.aep.compile_expr(expr)
+        self.assertEqual(compiled_expr, "_aep_0 + _aep_1 - _aep_2")
+        # compiled expressions are cached
+        self.assertIs(self.aep.compile_expr(expr)[1], variables)
+        eval_dict = {"AccountingNone": AccountingNone}
+        eval_dict.update(self.aep.get_values(variables))
+        self.assertEqual(safe_eval(compiled_expr, eval_dict), self._eval(expr))
+        self.assertEqual(
+            self.aep.get_account_ids_with_data(variables),
+            {self.account_ar.id, self.account_in.id},
+        )
+        values = self.aep.get_values(variables, self.account_ar.id)
+        self.assertEqual(
+            values,
+            {"_aep_0": 900, "_aep_1": AccountingNone, "_aep_2": AccountingNone},
+        )
+
     def test_aep_convenience_methods(self):
         initial = AEP.get_balances_initial(self.company, time.strftime("%Y") + "-03-01")
         self.assertEqual(
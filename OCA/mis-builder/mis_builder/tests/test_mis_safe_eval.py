@@ -3,7 +3,12 @@
 
 import odoo.tests.common as common
 
-from ..models.mis_safe_eval import DataError, NameDataError, mis_safe_eval
+from ..models.mis_safe_eval import (
+    DataError,
+    NameDataError,
+    _compile_expr,
+    mis_safe_eval,
+)
 
 
 class TestMisSafeEval(common.TransactionCase):
@@ -23,3 +28,8 @@ class TestMisSafeEval(common.TransactionCase):
         val = mis_safe_eval("a + 1", {})
         self.assertTrue(isinstance(val, NameDataError))
         self.assertEqual(val.name, "#NAME")
+
+    def test_compile_cache(self):
+        self.assertIs(_compile_expr("a * 2"), _compile_expr("a * 2"))
+        self.assertEqual(mis_safe_eval("a * 2", {"a": 3}), 6)
+        self.assertEqual(mis_safe_eval("a * 2", {"a": 4}), 8)
@@ -1027,3 +1027,28 @@ class TestFatturaPAXMLValidation(FatturaPACommon):
         invoice.action_post()
 
         self.assertEqual(invoice.state, "posted")
+
+    def test_bulk_xml_export(self):
+        """
+        Check that exporting invoices of different partners at once
+        creates one e-invoice per partner, with different file names.
+        """
+        invoice_0 = self._create_invoice()
+        invoice_2 = self.init_invoice(
+            "out_invoice",
+            partner=self.res_partner_fatturapa_2,
+            products=self.product_product_10,
+        )
+        invoices = invoice_0 | invoice_2
+        invoices._post()
+
+        res = self.run_wizard(invoices.ids)
+
+        attachments = self.attach_model.search(res["domain"])
+        self.assertEqual(len(attachments), 2)
+        self.assertEqual(len(set(attachments.mapped("name"))), 2)
+        self.assertEqual(invoices.fatturapa_attachment_out_id, attachments)
+        self.assertNotEqual(
+            invoice_0.fatturapa_attachment_out_id,
+            invoice_2.fatturapa_attachment_out_id,
+        )
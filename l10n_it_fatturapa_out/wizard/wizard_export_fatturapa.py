@@ -50,16 +50,18 @@ class WizardExportFatturapa(models.TransientModel):
         help="This report will be automatically included in the created XML",
     )
 
-    def saveAttachment(self, fatturapa, number):
-        attach_obj = self.env["fatturapa.attachment.out"]
-        vat = attach_obj.get_file_vat()
-
+    def _prepare_attachment_vals(self, fatturapa, number, vat=None):
+        if vat is None:
+            vat = self.env["fatturapa.attachment.out"].get_file_vat()
         attach_str = fatturapa.to_xml(self.env)
-        attach_vals = {
+        return {
             "name": f"{vat}_{number}.xml",
             "datas": base64.encodebytes(attach_str),
         }
-        return attach_obj.create(attach_vals)
+
+    def saveAttachment(self, fatturapa, number):
+        attach_obj = self.env["fatturapa.attachment.out"]
+        return attach_obj.create(self._prepare_attachment_vals(fatturapa, number))
 
     def getPartnerId(self, invoice_ids):
         invoice_model = self.env["account.move"]
@@ -232,24 +234,32 @@ class WizardExportFatturapa(models.TransientModel):
         # max_invoice_in_xml field
         return res
 
-    def setProgressivoInvio(self, attach=False):
+    def setProgressivoInvio(self, attach=False, reserved_file_ids=None):
         # if the attachment is given than we will reuse its file_id
         if attach:
             file_id = attach.name.split("_")[1].split(".")[0]
         else:
+            # reserved_file_ids: file ids already used by attachments
+            # that are not created yet (see exportFatturaPA)
+            reserved_file_ids = reserved_file_ids or set()
             file_id = id_generator()
             Attachment = self.env["fatturapa.attachment.out"]
-            while Attachment.file_name_exists(file_id):
+            while file_id in reserved_file_ids or Attachment.file_name_exists(file_id):
                 file_id = id_generator()
+            reserved_file_ids.add(file_id)
         return file_id
 
     def _get_efattura_class(self):
         return EFatturaOut
 
-    def exportInvoiceXML(self, partner, invoice_ids, attach=False, context=None):
+    def exportInvoiceXML(
+        self, partner, invoice_ids, attach=False, context=None, reserved_file_ids=None
+    ):
         EFatturaOut = self._get_efattura_class()
 
-        progressivo_invio = self.setProgressivoInvio(attach)
+        progressivo_invio = self.setProgressivoInvio(
+            attach, reserved_file_ids=reserved_file_ids
+        )
         invoice_ids = (
             self.env["account.move"].with_context(**context).browse(invoice_ids)
         )
@@ -270,21 +280,41 @@ class WizardExportFatturapa(models.TransientModel):
     def exportFatturaPA(self):
         invoice_obj = self.env["account.move"]
         invoices_by_partner = self.group_invoices_by_partner()
-        attachments = self.env["fatturapa.attachment.out"]
+        # Browse every invoice at once so that the prefetching of the
+        # invoices and their lines spans the whole export
+        invoices = invoice_obj.browse(self.env.context.get("active_ids", []))
+        if self.report_print_menu:
+            self.generate_attach_reports(
+                invoices.filtered(
+                    lambda inv: not inv.fatturapa_attachment_out_id
+                    and not inv.fatturapa_doc_attachments
+                )
+            )
+
+        vat = self.env["fatturapa.attachment.out"].get_file_vat()
+        reserved_file_ids = set()
+        attachments_vals = []
+        attachments_invoices = []
         for partner in invoices_by_partner:
             context_partner = self.env.context.copy()
             context_partner.update({"lang": partner.lang})
             for invoice_ids in invoices_by_partner[partner]:
                 fatturapa, progressivo_invio = self.exportInvoiceXML(
-                    partner, invoice_ids, context=context_partner
+                    partner,
+                    invoice_ids,
+                    context=context_partner,
+                    reserved_file_ids=reserved_file_ids,
                 )
+                attachments_vals.append(
+                    self._prepare_attachment_vals(fatturapa, progressivo_invio, vat)
+                )
+                attachments_invoices.append(invoice_ids)
 
-                attach = self.saveAttachment(fatturapa, progressivo_invio)
-                attachments |= attach
-
-                for invoice_id in invoice_ids:
-                    inv = invoice_obj.browse(invoice_id)
-                    inv.write({"fatturapa_attachment_out_id": attach.id})
+        attachments = self.env["fatturapa.attachment.out"].create(attachments_vals)
+        for attach, invoice_ids in zip(attachments, attachments_invoices):
+            invoice_obj.browse(invoice_ids).write(
+                {"fatturapa_attachment_out_id": attach.id}
+            )
 
         action = {
             "name": "Export Electronic Invoice",
@@ -299,40 +329,48 @@ class WizardExportFatturapa(models.TransientModel):
             action["domain"] = [("id", "in", attachments.ids)]
         return action
 
-    def generate_attach_report(self, inv):
+    def _get_attach_report(self):
         try:
             report_id = int(self.report_print_menu)
         except ValueError as exc:
             raise UserError(_("Print report not found")) from exc
+        return self.env["ir.actions.report"].sudo().browse(report_id)
 
-        report_model = self.env["ir.actions.report"].sudo().browse(report_id)
-        attachment, attachment_type = report_model._render_qweb_pdf(
-            report_model, inv.ids
-        )
-        att_id = self.env["ir.attachment"].create(
-            {
-                "name": f"{inv.name}.pdf",
-                "type": "binary",
-                "datas": base64.encodebytes(attachment),
-                "res_model": "account.move",
-                "res_id": inv.id,
-                "mimetype": "application/x-pdf",
-            }
-        )
-        inv.sudo().write(
-            {
-                "fatturapa_doc_attachments": [
-                    (
-                        0,
-                        0,
-                        {
-                            "is_pdf_invoice_print": True,
-                            "ir_attachment_id": att_id.id,
-                            "description": _(
-                                "Attachment generated by " "electronic invoice export"
-                            ),
-                        },
-                    )
-                ]
-            }
+    def generate_attach_report(self, inv):
+        self.generate_attach_reports(inv)
+
+    def generate_attach_reports(self, invoices):
+        """Render the PDF of every invoice, then create the attachments
+        and link them to the invoices in one go"""
+        if not invoices:
+            return
+        report_model = self._get_attach_report()
+        attachments_vals = []
+        for inv in invoices:
+            attachment, attachment_type = report_model._render_qweb_pdf(
+                report_model, inv.ids
+            )
+            attachments_vals.append(
+                {
+                    "name": f"{inv.name}.pdf",
+                    "type": "binary",
+                    "datas": base64.encodebytes(attachment),
+                    "res_model": "account.move",
+                    "res_id": inv.id,
+                    "mimetype": "application/x-pdf",
+                }
+            )
+        attachments = self.env["ir.attachment"].create(attachments_vals)
+        self.env["fatturapa.attachments"].sudo().create(
+            [
+                {
+                    "invoice_id": inv.id,
+                    "is_pdf_invoice_print": True,
+                    "ir_attachment_id": att_id.id,
+                    "description": _(
+                        "Attachment generated by " "electronic invoice export"
+                    ),
+                }
+                for inv, att_id in zip(invoices, attachments)
+            ]
         )
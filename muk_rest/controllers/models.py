@@ -40,10 +40,13 @@
 #
 ###################################################################################
 
+import json
 import werkzeug
+import collections
 
-from odoo import http
+from odoo import http, api, registry
 from odoo.http import request
+from odoo.osv import expression
 from odoo.models import check_method_name
 from odoo.tools import misc, osutil
 
@@ -96,6 +99,25 @@ class ModelController(http.Controller):
                     'type': 'object',
                     'description': 'A map of field names and their corresponding values.'
                 },
+                'UpsertResult': {
+                    'type': 'array',
+                    'items': {
+                        'type': 'object',
+                        'properties': {
+                            'id': {
+                                'type': 'integer',
+                            },
+                            'operation': {
+                                'type': 'string',
+                                'enum': ['create', 'write'],
+                            },
+                            'error': {
+                                'type': 'string',
+                            },
+                        },
+                    },
+                    'description': 'The result of each given row in the same order.'
+                },
                 'MultiWriteValues': {
                     'type': 'array',
                     'items': {
@@ -114,6 +136,42 @@ class ModelController(http.Controller):
             }
         }
   
+    #----------------------------------------------------------
+    # Helper
+    #----------------------------------------------------------
+    
+    def _search_keyset(self, model, domain, limit, cursor):
+        limit = limit or tools.common.KEYSET_PAGE_SIZE
+        records = request.env[model].search(expression.AND([
+            domain, [('id', '>', tools.common.decode_cursor(cursor))]
+        ]), limit=limit, order='id')
+        if len(records) == limit:
+            return records, tools.common.encode_cursor(records[-1].id)
+        return records, None
+    
+    def _stream_records(self, model, domain, limit, serialize):
+        request.env[model].check_access_rights('read')
+        dbname, uid = request.env.cr.dbname, request.env.uid
+        context = dict(request.env.context)
+        chunk_size = tools.common.STREAM_CHUNK_SIZE
+        
+        def generate():
+            with registry(dbname).cursor() as cr:
+                env = api.Environment(cr, uid, context)
+                last_id, count = 0, 0
+                while not limit or count < limit:
+                    size = min(chunk_size, limit - count) if limit else chunk_size
+                    records = env[model].search(expression.AND([
+                        domain, [('id', '>', last_id)]
+                    ]), limit=size, order='id')
+                    yield from serialize(records)
+                    if len(records) < size:
+                        break
+                    last_id, count = records[-1].id, count + len(records)
+                    env.invalidate_all()
+        
+        return tools.http.make_ndjson_response(generate())
+    
     #----------------------------------------------------------
     # Generic Method
     #----------------------------------------------------------
@@ -507,6 +565,24 @@ class ModelController(http.Controller):
                         'type': 'string'
                     },
                 },
+                'cursor': {
+                    'name': 'cursor',
+                    'description': (
+                        'Continuation token of the previous page, pass an empty value '
+                        'to get the first page. The records are ordered by ID and the '
+                        'result is wrapped together with the token of the next page.'
+                    ),
+                    'schema': {
+                        'type': 'string'
+                    },
+                },
+                'stream': {
+                    'name': 'stream',
+                    'description': 'Stream the records ordered by ID as newline delimited JSON',
+                    'schema': {
+                        'type': 'boolean'
+                    },
+                },
             },
             responses={
                 '200': {
@@ -536,12 +612,23 @@ class ModelController(http.Controller):
         limit=None, 
         offset=0, 
         order=None, 
+        cursor=None,
+        stream=False,
         **kw
     ):
         domain = tools.common.parse_domain(domain)
         fields = tools.common.parse_value(fields)
         limit = limit and int(limit) or None
         offset = offset and int(offset) or None
+        if tools.common.parse_value(stream, False):
+            return self._stream_records(
+                model, domain, limit, lambda records: records.read(fields)
+            )
+        if cursor is not None:
+            records, next_cursor = self._search_keyset(model, domain, limit, cursor)
+            return request.make_json_response({
+                'records': records.read(fields), 'cursor': next_cursor
+            })
         return request.make_json_response(request.env[model].search_read(
             domain, fields=fields, offset=offset, limit=limit, order=order
         ))
@@ -740,6 +827,13 @@ class ModelController(http.Controller):
                     },
                     'example': 'array',
                 },
+                'stream': {
+                    'name': 'stream',
+                    'description': 'Stream the array export ordered by ID as newline delimited JSON',
+                    'schema': {
+                        'type': 'boolean'
+                    },
+                },
             },
             responses={
                 '200': {
@@ -767,11 +861,16 @@ class ModelController(http.Controller):
             default_responses=['400', '401', '500'],
         ),
     )
-    def export(self, model, ids, fields=None, type='array', **kw):
+    def export(self, model, ids, fields=None, type='array', stream=False, **kw):
         records = request.env[model].browse(
             tools.common.parse_ids(ids)
         )
         field_names = tools.common.parse_value(fields)
+        if type == 'array' and tools.common.parse_value(stream, False):
+            return self._stream_records(
+                model, [('id', 'in', records.ids)], None, 
+                lambda records: records.export_data(field_names).get('datas', [])
+            )
         data  = records.export_data(field_names).get('datas', [])
         if type in ('csv', 'xlsx'):
             exporter = CSVExport() if type == 'csv' else ExcelExport()
@@ -950,6 +1049,24 @@ class ModelController(http.Controller):
                         'type': 'boolean'
                     },
                 },
+                'cursor': {
+                    'name': 'cursor',
+                    'description': (
+                        'Continuation token of the previous page, pass an empty value '
+                        'to get the first page. The records are ordered by ID and the '
+                        'result is wrapped together with the token of the next page.'
+                    ),
+                    'schema': {
+                        'type': 'string'
+                    },
+                },
+                'stream': {
+                    'name': 'stream',
+                    'description': 'Stream the records ordered by ID as newline delimited JSON',
+                    'schema': {
+                        'type': 'boolean'
+                    },
+                },
             },
             responses={
                 '200': {
@@ -980,11 +1097,26 @@ class ModelController(http.Controller):
         offset=0, 
         order=None, 
         metadata=False,
+        cursor=None,
+        stream=False,
         **kw
     ):
         domain = tools.common.parse_domain(domain)
+        fields = tools.common.parse_value(fields)
         limit = limit and int(limit) or None
         offset = offset and int(offset) or None
+        if tools.common.parse_value(stream, False):
+            return self._stream_records(
+                model, domain, limit, lambda records: records.rest_extract_data(
+                    fields, metadata=metadata
+                )
+            )
+        if cursor is not None:
+            records, next_cursor = self._search_keyset(model, domain, limit, cursor)
+            return request.make_json_response({
+                'records': records.rest_extract_data(fields, metadata=metadata), 
+                'cursor': next_cursor
+            })
         records = request.env[model].search(
             domain, limit=limit, offset=offset, order=order
         )
@@ -992,10 +1124,7 @@ class ModelController(http.Controller):
         context.pop('active_test', False)
         records.with_context(context)
         return request.make_json_response(
-            records.rest_extract_data(
-                tools.common.parse_value(fields),
-                metadata=metadata
-            )
+            records.rest_extract_data(fields, metadata=metadata)
         )
      
     #----------------------------------------------------------
@@ -1296,6 +1425,163 @@ class ModelController(http.Controller):
             records.ids
         )
 
+    @core.http.rest_route(
+        routes=build_route([
+            '/upsert',
+            '/upsert/<string:model>',
+        ]), 
+        methods=['POST'],
+        protected=True,
+        docs=dict(
+            tags=['Model'], 
+            summary='Bulk Create or Update',
+            description=(
+                'Creates or updates many records at once. Each row is matched '
+                'with existing records on the given key fields.'
+            ),
+            parameter={
+                'model': {
+                    'name': 'model',
+                    'description': 'Model',
+                    'required': True,
+                    'schema': {
+                        'type': 'string'
+                    },
+                    'example': 'res.partner',
+                },
+                'key': {
+                    'name': 'key',
+                    'description': 'Match Key Fields',
+                    'required': True,
+                    'content': {
+                        'application/json': {
+                            'schema': {
+                                '$ref': '#/components/schemas/RecordFields',
+                            },
+                        }
+                    },
+                    'example': ['ref'],
+                },
+                'values': {
+                    'name': 'values',
+                    'description': 'Values',
+                    'required': True,
+                    'content': {
+                        'application/json': {
+                            'schema': {
+                                'type': 'array',
+                                'items': {
+                                    '$ref': '#/components/schemas/RecordValues'
+                                },
+                            },
+                        },
+                    },
+                    'example': [
+                        {'ref': 'C0001', 'name': 'First Customer'},
+                        {'ref': 'C0002', 'name': 'Second Customer'},
+                    ],
+                },
+            },
+            responses={
+                '200': {
+                    'description': 'Row Results',
+                    'content': {
+                        'application/json': {
+                            'schema': {
+                                '$ref': '#/components/schemas/UpsertResult'
+                            },
+                            'example': [
+                                {'id': 14, 'operation': 'write'},
+                                {'id': 52, 'operation': 'create'},
+                            ]
+                        }
+                    }
+                }
+            },
+            default_responses=['400', '401', '500'],
+        ),
+    )
+    def upsert(self, model, key=None, values=None, **kw):
+        model = request.env[model]
+        values = tools.common.parse_value(values, [])
+        key = tools.common.parse_value(key, key)
+        key = [key] if isinstance(key, str) else list(key or [])
+        if not key or any(fname not in model._fields for fname in key):
+            raise werkzeug.exceptions.BadRequest('Invalid match key!')
+        if not isinstance(values, list) or not all(isinstance(vals, dict) for vals in values):
+            raise werkzeug.exceptions.BadRequest('Values must be a list of objects!')
+        
+        def match_key(vals):
+            return tuple(vals.get(fname) for fname in key)
+        
+        def record_key(record):
+            return tuple(
+                model._fields[fname].convert_to_write(record[fname], record) 
+                for fname in key
+            )
+        
+        existing = collections.defaultdict(list)
+        for record in model.search([
+            (fname, 'in', list({vals[fname] for vals in values if vals.get(fname) is not None})) 
+            for fname in key
+        ]):
+            existing[record_key(record)].append(record.id)
+        
+        results = [None] * len(values)
+        to_write, to_create, seen = {}, [], set()
+        for index, vals in enumerate(values):
+            row_key = match_key(vals)
+            if None in row_key:
+                results[index] = {'error': 'The match key is missing!'}
+            elif row_key in seen:
+                results[index] = {'error': 'Duplicate key in the given values!'}
+            elif len(existing.get(row_key, [])) > 1:
+                results[index] = {'error': 'Multiple records were found for the given key!'}
+            elif row_key in existing:
+                write_vals = {
+                    fname: value for fname, value in vals.items() if fname not in key
+                }
+                write_key = json.dumps(write_vals, sort_keys=True, default=str)
+                to_write.setdefault(write_key, (write_vals, []))[1].append(
+                    (index, existing[row_key][0])
+                )
+            else:
+                to_create.append(index)
+            seen.add(row_key)
+        
+        def run_rows(rows, operation, func):
+            try:
+                with request.env.cr.savepoint():
+                    record_ids = func(rows)
+            except Exception as exc:
+                if len(rows) > 1:
+                    for row in rows:
+                        run_rows([row], operation, func)
+                else:
+                    results[rows[0][0]] = {
+                        'error': tools.common.parse_exception(exc)['message']
+                    }
+                return
+            for (index, record_id), result_id in zip(rows, record_ids):
+                results[index] = {'id': result_id, 'operation': operation}
+        
+        def write_rows(rows, vals):
+            records = model.browse([record_id for index, record_id in rows])
+            records.write(vals)
+            return records.ids
+        
+        def create_rows(rows):
+            return model.create([values[index] for index, record_id in rows]).ids
+        
+        for write_vals, rows in to_write.values():
+            run_rows(rows, 'write', lambda rows, vals=write_vals: write_rows(rows, vals))
+        batch_size = tools.common.UPSERT_BATCH_SIZE
+        for start in range(0, len(to_create), batch_size):
+            run_rows([
+                (index, None) for index in to_create[start:start + batch_size]
+            ], 'create', create_rows)
+        return request.make_json_response(results)
+
     @core.http.rest_route(
         routes=build_route([
             '/unlink',
@@ -43,7 +43,7 @@
 from odoo import models, api, fields
 from odoo.exceptions import AccessError
 from odoo.addons.base.models.res_users import check_identity
-from odoo.addons.muk_rest.tools import common
+from odoo.addons.muk_rest.tools import common, cache
     
 
 class AccessToken(models.Model):
@@ -100,13 +100,26 @@ class AccessToken(models.Model):
     def _check_resource(self, key):
         if not key:
             return False
+        if common.TOKEN_CACHE_TTL <= 0:
+            key_id = self._verify_resource(key)
+        else:
+            cache_key = (self.env.cr.dbname, self._name, common.token_digest(key))
+            key_id = cache.tokens.get(cache_key)
+            if not key_id:
+                key_id = self._verify_resource(key)
+                if key_id:
+                    cache.tokens.set(cache_key, key_id, common.TOKEN_CACHE_TTL)
+        return key_id and self.browse([key_id]).exists() or False
+    
+    @api.model
+    def _verify_resource(self, key):
         self.env.cr.execute("""
             SELECT id, resource_owner_key FROM {table} 
             WHERE index = %s
         """.format(table=self._table), [key[:common.TOKEN_INDEX]])
         for key_id, key_hash in self.env.cr.fetchall():
             if common.KEY_CRYPT_CONTEXT.verify(key, key_hash):
-                return self.browse([key_id])
+                return key_id
         return False
     
     @api.model
@@ -142,6 +155,17 @@ class AccessToken(models.Model):
             raise AccessError(_("You can not remove a Session!"))
         self.sudo().unlink()
     
+    #----------------------------------------------------------
+    # Create / Update / Delete
+    #----------------------------------------------------------
+
+    def unlink(self):
+        dbname, model_name, ids = self.env.cr.dbname, self._name, set(self.ids)
+        cache.tokens.discard(lambda key, value: (
+            key[:2] == (dbname, model_name) and value in ids
+        ))
+        return super(AccessToken, self).unlink()
+    
     #----------------------------------------------------------
     # Actions
     #----------------------------------------------------------
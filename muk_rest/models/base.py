@@ -77,60 +77,72 @@ class Base(models.AbstractModel):
         return build_fields(fields_to_extract)
     
     def _rest_extract_data(self, fields, metadata, toplevel=True):
-        record_splittor = lambda records: records
-
-        def subset_splittor(records):
-            for idx in range(0, len(records), 1000):
-                subset = records[idx:idx+1000]
-                for record in subset:
-                    yield record
-                subset.invalidate_recordset()
-        
         if toplevel:
-            record_splittor = subset_splittor
+            extracted_data = []
+            for idx in range(0, len(self), 1000):
+                subset = self[idx:idx+1000]
+                extracted_data.extend(
+                    subset._rest_extract_data(fields, metadata, toplevel=False)
+                )
+                self.env.invalidate_all()
+            return extracted_data
         
-        extracted_data = []
-        for record in record_splittor(self):
-            record_values = (
-                {'id-integer': record.id}
-                if metadata else {'id': record.id}
-            )
-            for fnames in fields:
-                record_values_key = fnames[0]
-                value = record[record_values_key]
-                field = record._fields[record_values_key]
-                
-                if metadata:
-                    record_values_key = '{}-{}'.format(
+        extracted_data = [
+            {'id-integer': record.id} if metadata else {'id': record.id}
+            for record in self
+        ]
+        for fnames in fields:
+            record_values_key = fnames[0]
+            field = self._fields[record_values_key]
+            
+            if metadata:
+                record_values_key = '{}-{}'.format(
+                    record_values_key,
+                    field.type
+                )
+                if field.relational:
+                    record_values_key = '{}/{}'.format(
                         record_values_key,
-                        field.type
+                        field.comodel_name
                     )
-                    if field.relational:
-                        record_values_key = '{}/{}'.format(
-                            record_values_key,
-                            field.comodel_name
-                        )
-                        
-                if isinstance(value, models.BaseModel):
-                    extract_data = (
-                        value._rest_extract_data(
+            
+            values = [record[fnames[0]] for record in self]
+            if field.relational:
+                if fnames[1]:
+                    comodel_records = self.mapped(fnames[0])
+                    comodel_data = dict(zip(
+                        comodel_records.ids,
+                        comodel_records._rest_extract_data(
                             fnames[1], metadata, toplevel=False,
                         )
-                        if fnames[1]
-                        else value.ids
-                    )
+                    ))
+                    extract_data = [
+                        [comodel_data[value_id] for value_id in value.ids]
+                        for value in values
+                    ]
+                else:
+                    extract_data = [value.ids for value in values]
+                for record_values, value_data in zip(extracted_data, extract_data):
                     if field.type == 'many2one':
                         record_values[record_values_key] = (
-                            extract_data[0] if extract_data else False
+                            value_data[0] if value_data else False
                         )
                     else:
-                        record_values[record_values_key] = extract_data
-                else:
-                    output = record._fields[fnames[0]].convert_to_read(
-                        value, record, False
-                    )
-                    record_values[record_values_key] = output
-            extracted_data.append(record_values)
+                        record_values[record_values_key] = value_data
+            else:
+                for record_values, record, value in zip(extracted_data, self, values):
+                    if isinstance(value, models.BaseModel):
+                        record_values[record_values_key] = (
+                            value._rest_extract_data(
+                                fnames[1], metadata, toplevel=False,
+                            )
+                            if fnames[1]
+                            else value.ids
+                        )
+                    else:
+                        record_values[record_values_key] = field.convert_to_read(
+                            value, record, False
+                        )
         return extracted_data
     
     #----------------------------------------------------------
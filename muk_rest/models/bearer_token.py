@@ -43,7 +43,7 @@
 from odoo import models, api, fields
 from odoo.exceptions import AccessError
 from odoo.addons.base.models.res_users import check_identity
-from odoo.addons.muk_rest.tools import common
+from odoo.addons.muk_rest.tools import common, cache
     
     
 class BearerToken(models.Model):
@@ -110,13 +110,26 @@ class BearerToken(models.Model):
     def _check_token(self, token):
         if not token:
             return False
+        if common.TOKEN_CACHE_TTL <= 0:
+            token_id = self._verify_token(token)
+        else:
+            cache_key = (self.env.cr.dbname, self._name, common.token_digest(token))
+            token_id = cache.tokens.get(cache_key)
+            if not token_id:
+                token_id = self._verify_token(token)
+                if token_id:
+                    cache.tokens.set(cache_key, token_id, common.TOKEN_CACHE_TTL)
+        return token_id and self.browse([token_id]).exists() or False
+    
+    @api.model
+    def _verify_token(self, token):
         self.env.cr.execute("""
             SELECT id, access_token FROM {table} 
             WHERE access_index = %s
         """.format(table=self._table), [token[:common.TOKEN_INDEX]])
         for token_id, token_hash in self.env.cr.fetchall():
             if common.KEY_CRYPT_CONTEXT.verify(token, token_hash):
-                return self.browse([token_id])
+                return token_id
         return False
     
     @api.model
@@ -161,6 +174,17 @@ class BearerToken(models.Model):
             raise AccessError(_("You can not remove a Session!"))
         self.sudo().unlink()
     
+    #----------------------------------------------------------
+    # Create / Update / Delete
+    #----------------------------------------------------------
+
+    def unlink(self):
+        dbname, model_name, ids = self.env.cr.dbname, self._name, set(self.ids)
+        cache.tokens.discard(lambda key, value: (
+            key[:2] == (dbname, model_name) and value in ids
+        ))
+        return super(BearerToken, self).unlink()
+    
     #----------------------------------------------------------
     # Actions
     #----------------------------------------------------------
@@ -40,6 +40,7 @@
 #
 ###################################################################################
 
+import json
 import base64
 import logging
 import dateutil
@@ -52,11 +53,12 @@ from odoo import tools, models, api, fields, _
 from odoo.exceptions import ValidationError
 from odoo.tools import DEFAULT_SERVER_DATE_FORMAT
 from odoo.tools import DEFAULT_SERVER_DATETIME_FORMAT
-from odoo.tools.safe_eval import safe_eval, test_python_expr
+from odoo.tools.safe_eval import test_python_expr
 from odoo.tools.safe_eval import datetime, time, dateutil
 
-from odoo.addons.muk_rest.tools import common, docs
+from odoo.addons.muk_rest.tools import common, docs, cache
 from odoo.addons.muk_rest.tools.safe_eval import responses, exceptions
+from odoo.addons.muk_rest.tools.safe_eval import compile_expr, eval_compiled
 
 
 class Endpoint(models.Model):
@@ -214,6 +216,15 @@ class Endpoint(models.Model):
         default=True,
     )
     
+    cache_ttl = fields.Integer(
+        string="Cache Duration",
+        default=0,
+        help=(
+            "Number of seconds the responses of GET requests are cached for, "
+            "per user, companies, language and parameters. Zero disables the cache."
+        ),
+    )
+    
     show_logging = fields.Boolean(
         compute='_compute_show_logging',
         string="Show Logging",
@@ -389,27 +400,33 @@ class Endpoint(models.Model):
         model_with_user = self.env[self.model_id.model].with_user(user)
         model = model_with_user.sudo() if self.eval_sudo else model_with_user   
         fields = self.domain_field_ids.mapped('name') or None
-        domain = safe_eval(self.domain or '[]', {
+        domain = eval_compiled(self._get_compiled_expr('domain'), {
             'datetime': datetime, 'uid': user.id,
         })
         limit = request.params.get('limit', None)
         offset = request.params.get('offset', None)
+        limit = limit and int(limit) or None
+        offset = offset and int(offset) or None
         result = model.search_read(
             domain,
             fields=fields,
-            limit=limit and int(limit) or None,
-            offset=offset and int(offset) or None,
+            limit=limit,
+            offset=offset,
         )
         if self.wrap_response:
+            if (not limit or len(result) < limit) and (not offset or result):
+                count = (offset or 0) + len(result)
+            else:
+                count = model.search_count(domain)
             return request.make_json_response({
                 'endpoint': self.route,
                 'model': model._name,
                 'domain': domain,
                 'fields': fields,
-                'limit': limit and int(limit) or None,
-                'offset': offset and int(offset) or None,
+                'limit': limit,
+                'offset': offset,
                 'result': result,
-                'count': model.search_count(domain),
+                'count': count,
             })
         return request.make_json_response(result)
 
@@ -435,7 +452,7 @@ class Endpoint(models.Model):
         model_with_user = self.env[self.model_id.model].with_user(user)
         model = model_with_user.sudo() if self.eval_sudo else model_with_user
         eval_context = self._get_eval_context(request, model)
-        safe_eval(self.code.strip(), eval_context, mode="exec", nocopy=True)   
+        eval_compiled(self._get_compiled_expr('code'), eval_context)
         if eval_context.get('result', False):
             return request.make_json_response({
                 'endpoint': self.route, 
@@ -447,6 +464,44 @@ class Endpoint(models.Model):
             return eval_context['response']
         return request.make_json_response(True)
     
+    @tools.ormcache('self.id', 'self.write_date', 'fname')
+    def _get_compiled_expr(self, fname):
+        if fname == 'code':
+            return compile_expr(self.code.strip(), mode='exec')
+        return compile_expr((self.domain or '[]').strip())
+    
+    def _get_response_cache_key(self, request, user):
+        user_env = self.with_user(user).env
+        return (
+            self.env.cr.dbname, self.id, self.write_date, user.id,
+            tuple(user_env.companies.ids), user_env.context.get('lang'),
+            json.dumps(request.params, sort_keys=True, default=str),
+        )
+    
+    @api.model
+    @tools.ormcache('endpoint')
+    def _get_logging_flag(self, endpoint):
+        record = self.search([('endpoint', '=', endpoint)], limit=1)
+        return not record or record.logging
+
+    #----------------------------------------------------------
+    # Create / Update / Delete
+    #----------------------------------------------------------
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        self.clear_caches()
+        return super(Endpoint, self).create(vals_list)
+
+    def write(self, vals):
+        if {'endpoint', 'logging', 'active', 'code', 'domain'}.intersection(vals):
+            self.clear_caches()
+        return super(Endpoint, self).write(vals)
+
+    def unlink(self):
+        self.clear_caches()
+        return super(Endpoint, self).unlink()
+
     #----------------------------------------------------------
     # Actions
     #----------------------------------------------------------
@@ -512,7 +567,19 @@ class Endpoint(models.Model):
 
     def evaluate(self, request, user):
         self.ensure_one()
-        if hasattr(self, '_evaluate_{}'.format(self.state)):
+        if not hasattr(self, '_evaluate_{}'.format(self.state)):
+            return exceptions.BadRequest('Invalid endpoint!')
+        if self.cache_ttl <= 0 or self.method != 'GET':
             return getattr(self, '_evaluate_{}'.format(self.state))(request, user)
-        return exceptions.BadRequest('Invalid endpoint!')
+        cache_key = self._get_response_cache_key(request, user)
+        cached_response = cache.responses.get(cache_key)
+        if cached_response:
+            data, headers, status = cached_response
+            return request.make_response(data, headers, status=status)
+        response = getattr(self, '_evaluate_{}'.format(self.state))(request, user)
+        if getattr(response, 'status_code', None) == 200 and not response.is_streamed:
+            cache.responses.set(cache_key, (
+                response.get_data(), response.headers.to_wsgi_list(), 200
+            ), self.cache_ttl)
+        return response
         
\ No newline at end of file
@@ -45,12 +45,12 @@ import threading
 import werkzeug
 import contextlib
 
-from odoo import api, models, tools, registry, SUPERUSER_ID
-from odoo.tools import ustr, ignore, mute_logger
+from odoo import api, models, tools, SUPERUSER_ID
+from odoo.tools import ustr, ignore
 from odoo.http import request, Response
 
 from odoo.addons.muk_rest.core import http
-from odoo.addons.muk_rest.tools import common, security, encoder
+from odoo.addons.muk_rest.tools import common, security, encoder, logger
 
 
 class IrHttp(models.AbstractModel):
@@ -102,44 +102,35 @@ class IrHttp(models.AbstractModel):
     def _rest_logging(cls, endpoint, response):
         if (
             tools.config.get('rest_logging', True) and 
-            not endpoint.routing.get('disable_logging', False)
+            not endpoint.routing.get('disable_logging', False) and
+            logger.buffer.sample(getattr(response, 'status_code', None))
         ): 
-            with contextlib.suppress(Exception), mute_logger('odoo.sql_db'), registry(
-                request.session.db
-            ).cursor() as cr:
-                env = api.Environment(cr, SUPERUSER_ID, {})
-
-                def create_log(env, response):
-                    env['muk_rest.logging'].create({
-                        'user_id': request.session.uid,
-                        'url': request.httprequest.base_url,
-                        'ip_address': request.httprequest.remote_addr,
-                        'method': request.httprequest.method,
-                        'request': '{}\r\n\r\n\r\n{}'.format(
-                            '\r\n'.join([
-                                '{}: {}'.format(
-                                    key, 'authorization' in key.lower() and '***' or value
-                                )
-                                for key, value in request.httprequest.headers.to_wsgi_list()
-                            ]),
-                            encoder.encode_request(request)
-                        ),
-                        'status': getattr(response, 'status_code', None),
-                        'response': '{}\r\n{}'.format(
-                            ustr(getattr(response, 'headers', '')),
-                            encoder.encode_response(response)
-                        ),
-                    })
-                
+            with contextlib.suppress(Exception):
                 if endpoint.routing.get('rest_custom', False):
-                    endpoint = env['muk_rest.endpoint'].search(
-                        [('endpoint', '=', request.params.get('endpoint'))], 
-                        limit=1
-                    )
-                    if not endpoint or endpoint.logging:
-                        create_log(env, response)
-                else:
-                    create_log(env, response)
+                    if not request.env['muk_rest.endpoint'].sudo()._get_logging_flag(
+                        request.params.get('endpoint')
+                    ):
+                        return
+                logger.buffer.append(request.session.db, {
+                    'user_id': request.session.uid,
+                    'url': request.httprequest.base_url,
+                    'ip_address': request.httprequest.remote_addr,
+                    'method': request.httprequest.method,
+                    'request': '{}\r\n\r\n\r\n{}'.format(
+                        '\r\n'.join([
+                            '{}: {}'.format(
+                                key, 'authorization' in key.lower() and '***' or value
+                            )
+                            for key, value in request.httprequest.headers.to_wsgi_list()
+                        ]),
+                        encoder.encode_request(request)
+                    ),
+                    'status': getattr(response, 'status_code', None),
+                    'response': '{}\r\n{}'.format(
+                        ustr(getattr(response, 'headers', '')),
+                        encoder.encode_response(response)
+                    ),
+                })
 
     #----------------------------------------------------------
     # Dispatch
@@ -63,3 +63,5 @@ from . import test_rules
 from . import test_export
 from . import test_extract
 from . import test_create_update
+from . import test_logging
+from . import test_token
@@ -133,6 +133,7 @@ class RestfulCase(common.HttpCase):
         self.write_url = self.url_prepare(WRITE_URL)
         self.unlink_url = self.url_prepare(UNLINK_URL)
         self.create_update_url = self.url_prepare(CREATE_UPDATE_URL)
+        self.upsert_url = self.url_prepare(UPSERT_URL)
         
     def setUpAccessUrls(self):
         self.access_url = self.url_prepare(ACCESS_URL)
@@ -72,3 +72,24 @@ class CreateUpdateTestCase(RestfulCase):
         tester = self.env['res.partner'].browse(response.json()).name
         self.assertTrue(response)
         self.assertEqual('Restful Partner', tester)
+        
+    @skip_check_authentication()
+    def test_upsert(self):
+        client = self.authenticate()
+        partner = self.env['res.partner'].create({'name': 'Upsert Partner', 'ref': 'REST-UPSERT-1'})
+        self.env.flush_all()
+        values = json.dumps([
+            {'ref': 'REST-UPSERT-1', 'name': 'Restful Partner'},
+            {'ref': 'REST-UPSERT-2', 'name': 'Restful Partner'},
+            {'ref': 'REST-UPSERT-2', 'name': 'Restful Duplicate'},
+        ])
+        response = client.post(self.upsert_url, data={
+            'model': 'res.partner', 'key': json.dumps(['ref']), 'values': values,
+        })
+        self.assertTrue(response)
+        results = response.json()
+        self.assertEqual(results[0], {'id': partner.id, 'operation': 'write'})
+        self.assertEqual(results[1]['operation'], 'create')
+        self.assertTrue(results[2].get('error'))
+        partners = self.env['res.partner'].browse([results[0]['id'], results[1]['id']])
+        self.assertEqual(partners.mapped('name'), ['Restful Partner', 'Restful Partner'])
\ No newline at end of file
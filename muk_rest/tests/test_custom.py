@@ -115,6 +115,25 @@ class CustomTestCase(RestfulCase):
         self.assertTrue(response)
         self.assertTrue(response.json())
         
+    @skip_check_authentication()
+    def test_domain_count(self):
+        client = self.authenticate()
+        response = client.get(self.url_prepare(self.domain_endpoint.route), data={'limit': 1})
+        self.assertTrue(response)
+        self.assertEqual(response.json()['count'], self.env['res.partner'].search_count([]))
+        
+    @skip_check_authentication()
+    def test_domain_cache(self):
+        client = self.authenticate()
+        self.domain_endpoint.write({'domain': '[["id","=",1]]', 'cache_ttl': 60})
+        self.env.flush_all()
+        response = client.get(self.url_prepare(self.domain_endpoint.route))
+        self.assertTrue(response)
+        self.env['res.partner'].browse(1).write({'name': 'Cached Partner'})
+        self.env.flush_all()
+        cached_response = client.get(self.url_prepare(self.domain_endpoint.route))
+        self.assertEqual(cached_response.json(), response.json())
+        
     @skip_check_authentication()
     def test_domain_field(self):
         client = self.authenticate()
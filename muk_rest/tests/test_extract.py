@@ -92,4 +92,15 @@ class ExtractTestCase(RestfulCase):
         })
         self.assertTrue(response)
         self.assertEqual(response.json(), tester)
-        
\ No newline at end of file
+        
+        
+    def test_extract_nested(self):
+        partners = self.env['res.partner'].search([], limit=10)
+        data = partners.rest_extract_data(['name', 'parent_id/name', 'category_id'])
+        self.assertEqual([values['id'] for values in data], partners.ids)
+        for values, partner in zip(data, partners):
+            self.assertEqual(values['name'], partner.name)
+            self.assertEqual(values['category_id'], partner.category_id.ids)
+            self.assertEqual(values['parent_id'], partner.parent_id and {
+                'id': partner.parent_id.id, 'name': partner.parent_id.name
+            } or False)
\ No newline at end of file
@@ -0,0 +1,84 @@
+###################################################################################
+#
+#    Copyright (c) 2017-today MuK IT GmbH.
+#
+#    This file is part of MuK REST for Odoo
+#    (see https://mukit.at).
+#
+#    MuK Proprietary License v1.0
+#
+#    This software and associated files (the "Software") may only be used
+#    (executed, modified, executed after modifications) if you have
+#    purchased a valid license from MuK IT GmbH.
+#
+#    The above permissions are granted for a single database per purchased
+#    license. Furthermore, with a valid license it is permitted to use the
+#    software on other databases as long as the usage is limited to a testing
+#    or development environment.
+#
+#    You may develop modules based on the Software or that use the Software
+#    as a library (typically by depending on it, importing it and using its
+#    resources), but without copying any source code or material from the
+#    Software. You may distribute those modules under the license of your
+#    choice, provided that this license is compatible with the terms of the
+#    MuK Proprietary License (For example: LGPL, MIT, or proprietary licenses
+#    similar to this one).
+#
+#    It is forbidden to publish, distribute, sublicense, or sell copies of
+#    the Software or modified copies of the Software.
+#
+#    The above copyright notice and this permission notice must be included
+#    in all copies or substantial portions of the Software.
+#
+#    THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+#    OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#    FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+#    THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#    FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#    DEALINGS IN THE SOFTWARE.
+#
+###################################################################################
+
+
+import logging
+
+from odoo.tests import common
+
+from odoo.addons.muk_rest.tools.logger import LogBuffer
+
+_logger = logging.getLogger(__name__)
+
+
+class LoggingTestCase(common.TransactionCase):
+    
+    def setUp(self):
+        super(LoggingTestCase, self).setUp()
+        self.endpoint = self.env['muk_rest.endpoint'].create({
+            'name': 'Logging Test',
+            'endpoint': 'logging_test',
+            'model_id': self.ref('base.model_res_partner'),
+            'method': 'GET',
+            'state': 'domain'
+        })
+        
+    def test_logging_flag(self):
+        model = self.env['muk_rest.endpoint']
+        self.assertTrue(model._get_logging_flag('logging_test'))
+        self.assertTrue(model._get_logging_flag('logging_test_missing'))
+        self.endpoint.write({'logging': False})
+        self.assertFalse(model._get_logging_flag('logging_test'))
+        
+    def test_logging_sample(self):
+        self.assertTrue(LogBuffer.sample(500))
+        
+    def test_logging_buffer(self):
+        self.registry.enter_test_mode(self.cr)
+        self.addCleanup(self.registry.leave_test_mode)
+        buffer = LogBuffer(size=10, batch_size=5, delay=0)
+        buffer.append(self.env.cr.dbname, {'url': '/api/v2/logging_test'})
+        buffer.flush()
+        self.assertEqual(len(buffer), 0)
+        self.assertTrue(self.env['muk_rest.logging'].search([
+            ('url', '=', '/api/v2/logging_test')
+        ]))
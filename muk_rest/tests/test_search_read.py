@@ -122,4 +122,30 @@ class SearchReadTestCase(RestfulCase):
         fields = json.dumps(fields)
         response = client.get(self.search_read_url, data={'model': 'res.partner', 'fields': fields, 'order': 'name desc'})
         self.assertTrue(response)
-        self.assertEqual(response.json(), tester)
\ No newline at end of file
+        self.assertEqual(response.json(), tester)
+        
+    @skip_check_authentication()
+    def test_search_read_cursor(self):
+        client = self.authenticate()
+        fields = ['name']
+        tester = self.json_prepare(self.env['res.partner'].search_read([], fields=fields, limit=2, order='id'))
+        fields = json.dumps(fields)
+        response = client.get(self.search_read_url, data={'model': 'res.partner', 'fields': fields, 'limit': 2, 'cursor': ''})
+        self.assertTrue(response)
+        self.assertEqual(response.json()['records'], tester)
+        tester = self.json_prepare(self.env['res.partner'].search_read([], fields=['name'], limit=2, offset=2, order='id'))
+        response = client.get(self.search_read_url, data={
+            'model': 'res.partner', 'fields': fields, 'limit': 2, 'cursor': response.json()['cursor']
+        })
+        self.assertTrue(response)
+        self.assertEqual(response.json()['records'], tester)
+        
+    @skip_check_authentication()
+    def test_search_read_stream(self):
+        client = self.authenticate()
+        fields = ['name']
+        tester = self.json_prepare(self.env['res.partner'].search_read([], fields=fields, order='id'))
+        fields = json.dumps(fields)
+        response = client.get(self.search_read_url, data={'model': 'res.partner', 'fields': fields, 'stream': True})
+        self.assertTrue(response)
+        self.assertEqual([json.loads(line) for line in response.text.splitlines()], tester)
\ No newline at end of file
@@ -0,0 +1,95 @@
+###################################################################################
+#
+#    Copyright (c) 2017-today MuK IT GmbH.
+#
+#    This file is part of MuK REST for Odoo
+#    (see https://mukit.at).
+#
+#    MuK Proprietary License v1.0
+#
+#    This software and associated files (the "Software") may only be used
+#    (executed, modified, executed after modifications) if you have
+#    purchased a valid license from MuK IT GmbH.
+#
+#    The above permissions are granted for a single database per purchased
+#    license. Furthermore, with a valid license it is permitted to use the
+#    software on other databases as long as the usage is limited to a testing
+#    or development environment.
+#
+#    You may develop modules based on the Software or that use the Software
+#    as a library (typically by depending on it, importing it and using its
+#    resources), but without copying any source code or material from the
+#    Software. You may distribute those modules under the license of your
+#    choice, provided that this license is compatible with the terms of the
+#    MuK Proprietary License (For example: LGPL, MIT, or proprietary licenses
+#    similar to this one).
+#
+#    It is forbidden to publish, distribute, sublicense, or sell copies of
+#    the Software or modified copies of the Software.
+#
+#    The above copyright notice and this permission notice must be included
+#    in all copies or substantial portions of the Software.
+#
+#    THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+#    OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#    FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+#    THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#    FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#    DEALINGS IN THE SOFTWARE.
+#
+###################################################################################
+
+
+import logging
+
+from odoo.tests import common
+
+from odoo.addons.muk_rest.tools import cache
+from odoo.addons.muk_rest.tools.common import generate_token, token_digest
+
+_logger = logging.getLogger(__name__)
+
+
+class TokenTestCase(common.TransactionCase):
+    
+    def setUp(self):
+        super(TokenTestCase, self).setUp()
+        self.oauth2 = self.env['muk_rest.oauth2'].create({
+            'name': 'OAuth2 Token Test',
+            'client_id': generate_token(),
+            'client_secret': generate_token(),
+            'state': 'password'
+        })
+        self.token = generate_token()
+        self.env['muk_rest.bearer_token']._save_bearer_token({
+            'oauth_id': self.oauth2.id,
+            'user_id': self.env.uid,
+            'access_token': self.token,
+            'expiration_date': None,
+        })
+        
+    def test_check_token(self):
+        model = self.env['muk_rest.bearer_token']
+        bearer_token = model._check_token(self.token)
+        self.assertTrue(bearer_token)
+        self.assertEqual(model._check_token(self.token), bearer_token)
+        self.assertFalse(model._check_token(generate_token()))
+        
+    def test_check_token_removed(self):
+        model = self.env['muk_rest.bearer_token']
+        model._check_token(self.token)._remove_bearer_token()
+        self.assertFalse(model._check_token(self.token))
+        
+    def test_check_token_cache(self):
+        model = self.env['muk_rest.bearer_token']
+        unknown_token = generate_token()
+        self.assertFalse(model._check_token(unknown_token))
+        self.assertIsNone(cache.tokens.get(
+            (self.env.cr.dbname, model._name, token_digest(unknown_token))
+        ))
+        cache_key = (self.env.cr.dbname, model._name, token_digest(self.token))
+        bearer_token = model._check_token(self.token)
+        self.assertEqual(cache.tokens.get(cache_key), bearer_token.id)
+        bearer_token.unlink()
+        self.assertIsNone(cache.tokens.get(cache_key))
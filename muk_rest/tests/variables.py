@@ -132,6 +132,7 @@ CREATE_URL = build_route('/create')[0]
 WRITE_URL = build_route('/write')[0]
 WRITE_MULTI_URL = build_route('/write_multi')[0]
 CREATE_UPDATE_URL = build_route('/create_update')[0]
+UPSERT_URL = build_route('/upsert')[0]
 UNLINK_URL = build_route('/unlink')[0]
 
 # Access
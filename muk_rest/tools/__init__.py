@@ -40,10 +40,12 @@
 #
 ###################################################################################
 
+from . import cache
 from . import common
 from . import docs
 from . import encoder
 from . import http
+from . import logger
 from . import safe_eval
 
 from . import security
\ No newline at end of file
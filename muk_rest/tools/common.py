@@ -43,6 +43,8 @@
 import re
 import ast
 import json
+import base64
+import hashlib
 import random
 import passlib
 import traceback
@@ -105,6 +107,21 @@ ACTIVE_OAUTH2_AUTHENTICATION = tools.config.get(
     'rest_authentication_oauth2', True
 )
 
+KEYSET_PAGE_SIZE = int(tools.config.get(
+    'rest_keyset_page_size', 1000
+))
+STREAM_CHUNK_SIZE = int(tools.config.get(
+    'rest_stream_chunk_size', 1000
+))
+
+UPSERT_BATCH_SIZE = int(tools.config.get(
+    'rest_upsert_batch_size', 500
+))
+
+TOKEN_CACHE_TTL = int(tools.config.get(
+    'rest_token_cache_ttl', 300
+))
+
 try:
     import oauthlib
 except ImportError:
@@ -188,8 +205,28 @@ def parse_exception(exc):
     return error
 
 
+def encode_cursor(last_id):
+    return base64.urlsafe_b64encode(
+        json.dumps({'id': last_id}).encode()
+    ).decode()
+
+
+def decode_cursor(cursor):
+    if not cursor:
+        return 0
+    try:
+        return int(json.loads(base64.urlsafe_b64decode(cursor.encode()))['id'])
+    except Exception:
+        raise werkzeug.exceptions.BadRequest('Invalid cursor!')
+
+
 def generate_token(length=40, chars=UNICODE_ASCII_CHARACTERS):
     return ''.join(random.SystemRandom().choice(chars) for index in range(length))
 
 
 hash_token = getattr(KEY_CRYPT_CONTEXT, 'hash', None) or KEY_CRYPT_CONTEXT.encrypt
+
+
+def token_digest(token):
+    return hashlib.sha256(token.encode()).hexdigest()
+
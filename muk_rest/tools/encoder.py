@@ -107,12 +107,16 @@ def encode_request(request):
             
 def encode_response(response):
     if isinstance(response, Response):
+        if response.is_streamed:
+            return '<streamed {}>'.format(response.mimetype)
         if response.mimetype == 'application/json':
-            return json.dumps(
+            return limit_text_size(json.dumps(
                 json.loads(response.data), indent=4, 
                 cls=LogEncoder, default=lambda o: str(o)
-            )
+            ))
         return limit_text_size(ustr_sql(response.data))
     if isinstance(response, Exception):
-        json.dumps(parse_exception(resposen), indent=4, default=lambda o: str(o))
+        return limit_text_size(json.dumps(
+            parse_exception(response), indent=4, default=lambda o: str(o)
+        ))
     return limit_text_size(ustr_sql(response))
@@ -79,3 +79,17 @@ def clean_query_params(query, clean_db=True, clean_debug=True):
         query=urlencode(cleaned_params, True)
     )
     return urlunparse(parsed_url)
+
+
+def make_ndjson_response(generator, headers=None):
+    return Response(
+        (
+            '{}\n'.format(json.dumps(
+                values, ensure_ascii=False, sort_keys=True, cls=RecordEncoder
+            ))
+            for values in generator
+        ),
+        headers=headers,
+        mimetype='application/x-ndjson',
+        direct_passthrough=True,
+    )
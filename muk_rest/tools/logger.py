@@ -0,0 +1,139 @@
+###################################################################################
+#
+#    Copyright (c) 2017-today MuK IT GmbH.
+#
+#    This file is part of MuK REST for Odoo
+#    (see https://mukit.at).
+#
+#    MuK Proprietary License v1.0
+#
+#    This software and associated files (the "Software") may only be used
+#    (executed, modified, executed after modifications) if you have
+#    purchased a valid license from MuK IT GmbH.
+#
+#    The above permissions are granted for a single database per purchased
+#    license. Furthermore, with a valid license it is permitted to use the
+#    software on other databases as long as the usage is limited to a testing
+#    or development environment.
+#
+#    You may develop modules based on the Software or that use the Software
+#    as a library (typically by depending on it, importing it and using its
+#    resources), but without copying any source code or material from the
+#    Software. You may distribute those modules under the license of your
+#    choice, provided that this license is compatible with the terms of the
+#    MuK Proprietary License (For example: LGPL, MIT, or proprietary licenses
+#    similar to this one).
+#
+#    It is forbidden to publish, distribute, sublicense, or sell copies of
+#    the Software or modified copies of the Software.
+#
+#    The above copyright notice and this permission notice must be included
+#    in all copies or substantial portions of the Software.
+#
+#    THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+#    OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#    FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+#    THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#    FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#    DEALINGS IN THE SOFTWARE.
+#
+###################################################################################
+
+
+import random
+import atexit
+import logging
+import threading
+import collections
+
+from odoo import api, tools, registry, SUPERUSER_ID
+from odoo.tools import mute_logger
+
+_logger = logging.getLogger(__name__)
+
+LOGGING_SAMPLE_RATE = float(tools.config.get('rest_logging_sample_rate', 1.0))
+LOGGING_BUFFER_SIZE = int(tools.config.get('rest_logging_buffer_size', 1000))
+LOGGING_BATCH_SIZE = int(tools.config.get('rest_logging_batch_size', 200))
+LOGGING_FLUSH_DELAY = float(tools.config.get('rest_logging_flush_delay', 5))
+
+
+class LogBuffer(object):
+    
+    
+    def __init__(self, size=LOGGING_BUFFER_SIZE, batch_size=LOGGING_BATCH_SIZE, delay=LOGGING_FLUSH_DELAY):
+        self.size = max(size, 1)
+        self.batch_size = max(batch_size, 1)
+        self.delay = delay
+        self.dropped = 0
+        self._queues = {}
+        self._lock = threading.Lock()
+        self._event = threading.Event()
+        self._thread = None
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(queue) for queue in self._queues.values())
+
+    @staticmethod
+    def sample(status=None):
+        if LOGGING_SAMPLE_RATE >= 1 or (status and int(status) >= 400):
+            return True
+        return random.random() < LOGGING_SAMPLE_RATE
+
+    def append(self, dbname, values):
+        if self.delay <= 0 or registry(dbname).in_test_mode():
+            return self._write(dbname, [values])
+        with self._lock:
+            queue = self._queues.setdefault(
+                dbname, collections.deque(maxlen=self.size)
+            )
+            if len(queue) == queue.maxlen:
+                self.dropped += 1
+            queue.append(values)
+            pending = len(queue)
+        self._start()
+        if pending >= self.batch_size:
+            self._event.set()
+
+    def flush(self, dbname=None):
+        with self._lock:
+            dbnames = [dbname] if dbname else list(self._queues)
+            entries = {
+                name: list(self._queues.pop(name, [])) 
+                for name in dbnames
+            }
+            dropped, self.dropped = self.dropped, 0
+        if dropped:
+            _logger.warning("REST logging buffer full, %s entries were dropped.", dropped)
+        for name, vals_list in entries.items():
+            for index in range(0, len(vals_list), self.batch_size):
+                self._write(name, vals_list[index:index + self.batch_size])
+
+    def _write(self, dbname, vals_list):
+        try:
+            with mute_logger('odoo.sql_db'), registry(dbname).cursor() as cr:
+                env = api.Environment(cr, SUPERUSER_ID, {})
+                env['muk_rest.logging'].create(vals_list)
+        except Exception:
+            _logger.exception("Failed to write %s REST log entries.", len(vals_list))
+
+    def _start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        with self._lock:
+            if not (self._thread and self._thread.is_alive()):
+                self._thread = threading.Thread(
+                    target=self._run, name='muk_rest.logging', daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            self._event.wait(self.delay)
+            self._event.clear()
+            self.flush()
+
+
+buffer = LogBuffer()
+atexit.register(buffer.flush)
@@ -42,10 +42,38 @@
 
 import werkzeug
 
-from odoo.tools.safe_eval import wrap_module
+from psycopg2 import OperationalError
+
+from odoo.tools import ustr
+from odoo.tools.safe_eval import wrap_module, test_expr, check_values
+from odoo.tools.safe_eval import unsafe_eval, _SAFE_OPCODES, _BUILTINS
 from odoo import exceptions
 
 
+def compile_expr(expr, mode='eval'):
+    return test_expr(expr, _SAFE_OPCODES, mode=mode), expr
+
+
+def eval_compiled(compiled_expr, globals_dict):
+    code, expr = compiled_expr
+    check_values(globals_dict)
+    globals_dict['__builtins__'] = _BUILTINS
+    try:
+        return unsafe_eval(code, globals_dict)
+    except (
+        exceptions.UserError, 
+        exceptions.RedirectWarning, 
+        werkzeug.exceptions.HTTPException, 
+        OperationalError, 
+        ZeroDivisionError
+    ):
+        raise
+    except Exception as exc:
+        raise ValueError('{}: "{}" while evaluating\n{}'.format(
+            ustr(type(exc)), ustr(exc), expr
+        ))
+
+
 responses = wrap_module(werkzeug.exceptions, [
     'HTTPException',
     'BadRequest',
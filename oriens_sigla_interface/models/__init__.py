@@ -1,2 +1,3 @@
+from . import sigla_shared
 from . import sale_order
 from . import stock_picking_batch
\ No newline at end of file
@@ -0,0 +1,117 @@
+from odoo import models
+from concurrent.futures import ThreadPoolExecutor
+
+from suds import WebFault
+from suds.cache import ObjectCache
+from suds.client import Client
+
+from urllib.error import URLError
+
+import threading
+import logging
+import socket
+import time
+_logger = logging.getLogger(__name__)
+
+sigla_soap_url="http://185.191.104.234:8081/wsdl/IMONService"
+
+# Timeout (secondi) delle chiamate SOAP e durata della cache del WSDL parsato
+SIGLA_TIMEOUT = 60
+SIGLA_WSDL_CACHE_DAYS = 1
+# Invii contemporanei verso SIGLA e tentativi ulteriori per record se la richiesta non e' partita
+SIGLA_MAX_WORKERS = 4
+SIGLA_RETRIES = 2
+SIGLA_RETRY_BACKOFF = 1.0
+
+# Un client per url parsato una sola volta per processo, ogni thread ne usa un clone (suds non e' thread-safe)
+_sigla_clients = {}
+_sigla_clients_lock = threading.Lock()
+_sigla_local = threading.local()
+
+
+def _default_sigla_client_factory(url):
+    return Client(url, timeout=SIGLA_TIMEOUT, cache=ObjectCache(days=SIGLA_WSDL_CACHE_DAYS))
+
+_sigla_client_factory = _default_sigla_client_factory
+
+
+# Sostituisce il servizio SOAP (es. con uno stub locale nei test): factory(url) deve restituire un oggetto con .service
+def set_sigla_client_factory(factory=None):
+    global _sigla_client_factory
+    with _sigla_clients_lock:
+        _sigla_client_factory = factory or _default_sigla_client_factory
+        _sigla_clients.clear()
+    _sigla_local.__dict__.clear()
+
+
+def _get_sigla_client(url):
+    clients = _sigla_local.__dict__.setdefault('clients', {})
+    if url not in clients:
+        with _sigla_clients_lock:
+            if url not in _sigla_clients: _sigla_clients[url] = _sigla_client_factory(url)
+            client = _sigla_clients[url]
+        clients[url] = client.clone() if hasattr(client, 'clone') else client
+    return clients[url]
+
+
+def _drop_sigla_client(url):
+    _sigla_local.__dict__.get('clients', {}).pop(url, None)
+
+
+# Connessione rifiutata o DNS non risolto: la richiesta non e' arrivata a SIGLA e si puo' ritentare
+def _sigla_not_sent(error):
+    if isinstance(error, URLError): error = error.reason
+    return isinstance(error, (socket.gaierror, ConnectionRefusedError))
+
+
+# Nessun accesso all'ORM: gira nei thread del pool
+def _sigla_call(url, api_method, record_id, error_code):
+    error = None
+    for attempt in range(SIGLA_RETRIES + 1):
+        try:
+            suds_response = getattr(_get_sigla_client(url).service, api_method)(record_id)
+            _logger.warning(f'Risposta SIGLA (API {api_method}). Id {record_id} - Res: {suds_response}')
+            return str(suds_response)
+
+        # Un fault SOAP e' una risposta elaborata da SIGLA: non si ritenta per non importare due volte il record
+        except WebFault as e:
+            error = e
+            break
+
+        # Timeout o errore a richiesta inviata: SIGLA potrebbe aver gia' importato il record, non si ritenta
+        except Exception as e:
+            error = e
+            _drop_sigla_client(url)
+            if not _sigla_not_sent(e): break
+            _logger.warning(f'ERR: SIGLA NON RAGGIUNGIBILE (tentativo {attempt + 1}/{SIGLA_RETRIES + 1}): {e}')
+            if attempt < SIGLA_RETRIES: time.sleep(SIGLA_RETRY_BACKOFF * 2 ** attempt)
+
+    _logger.warning(f'ERR: ECCEZIONE IN INTEGRAZIONE CON SIGLA: {error}')
+    try:
+        exception_response = _get_sigla_client(url).service.GetErrori(error_code + str(record_id))
+        odoo_exception_response = str(exception_response) if exception_response else 'Nessuna risposta'
+    except Exception as e:
+        odoo_exception_response = f'Impossibile leggere il log errori: {e}'
+    _logger.warning(f'ERR: LOG ERRORE DA SIGLA: {odoo_exception_response}')
+
+    return f'ECCEZIONE: {error}'
+
+
+class SiglaShared(models.AbstractModel):
+    _name = "sigla.shared"
+
+    def _get_sigla_soap_url(self):
+        return self.env['ir.config_parameter'].sudo().get_param('sigla_soap_url') or sigla_soap_url
+
+    # Invia i record a SIGLA tramite il pool, restituisce {id record: risposta}
+    def _sigla_send_records(self, api_method, error_code):
+        url = self._get_sigla_soap_url()
+        record_ids = self.ids
+        for record_id in record_ids: _logger.warning(f'Invio a SIGLA (API {api_method}). Id {record_id}')
+
+        def send(record_id): return record_id, _sigla_call(url, api_method, record_id, error_code)
+
+        workers = min(SIGLA_MAX_WORKERS, len(record_ids))
+        if workers <= 1: return dict(map(send, record_ids))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='sigla') as executor:
+            return dict(executor.map(send, record_ids))
@@ -21,5 +21,6 @@
         "views/res_partner_views.xml",
         "views/wf_paymentterm_views.xml",
         "views/wf_shippingmethod_views.xml",
+        "views/wf_sync_state_views.xml",
     ]
 }
@@ -2,4 +2,4 @@
 # License LGPL-3.0 or later (https://www.gnu.org/licenses/lgpl).
 
 from . import waterfitters_shared, res_partner, industry_group, res_config_settings, res_country, sale_order
-from . import wf_shippingmethod, sync_waterfitters_orders, wf_paymentterm, sale_order_line
+from . import wf_shippingmethod, sync_waterfitters_orders, wf_paymentterm, sale_order_line, wf_sync_state
@@ -20,3 +20,8 @@ class ResConfigSettings(models.TransientModel):
         config_parameter='waterfitters_customers_batch_limit',
         help=_('If the number is set to zero, all records will be sent in one cycle whatever the dimension of the sync.')
     )
+    waterfitters_orders_concurrency = fields.Integer(
+        config_parameter='waterfitters_orders_concurrency',
+        default=4,
+        help=_('Number of orders fetched in parallel from Waterfitters during the orders sync. Set to 1 to fetch them one at a time.')
+    )
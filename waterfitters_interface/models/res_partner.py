@@ -34,7 +34,10 @@ class ResPartner(models.Model):
             [('wf_is_ready_to_sync', '=', True), ('type', '=', 'contact')], order='write_date', limit=limit
         ).filtered(lambda p: any(so.name.startswith('OW') for so in p.sale_order_ids))
 
-        if synchable_partner_ids: synchable_partner_ids.wf_post_customers()
+        if synchable_partner_ids:
+            self._wf_reset_stats()
+            synchable_partner_ids.wf_post_customers()
+            self._wf_log_stats('customers POST sync')
 
     def _get_new_resource_data(self, response):
         if response and 'json' in response:
@@ -344,6 +347,7 @@ class ResPartner(models.Model):
 
     def wf_get_customers(self, sync_from_datetime=False):
         Partner = self.env['res.partner'].sudo()
+        self._wf_reset_stats()
         if not hasattr(self, '_connection_data'): self._get_connection_data()
 
         token = self._wf_get_token()
@@ -355,321 +359,348 @@ class ResPartner(models.Model):
         now_string = now.strftime('%d/%m/%Y')
         now_zulu = now.strftime('%Y-%m-%dT%H:%M:%SZ')
 
-        if not sync_from_datetime: sync_from_datetime = now - timedelta(minutes=30)
+        # Incremental sync: from the persisted watermark, skipping the customers already processed
+        SyncState = self.env['wf.sync.state']
+        sync_state = SyncState._get_state('customers')
+        seen_remote_ids = sync_state._get_seen_remote_ids()
+
+        if not sync_from_datetime: sync_from_datetime = sync_state.last_sync_date or now - timedelta(minutes=30)
         sync_from_zulu = sync_from_datetime.strftime('%Y-%m-%dT%H:%M:%SZ')
 
-        customer_response = self._wf_get_paginated('customers', token, f'[createdAt][gt]={sync_from_zulu}', 'createdAt')
-
-        _logger.warning(f'customer_response: {customer_response}')
-
-        if customer_response:
-            for partner_dict in customer_response:
-
-                partner_elem = partner_dict.get('element', {})
-                partner_rel = partner_elem.get('relationships', {})
-                _logger.warning(f'partner_elem: {partner_elem}')
-                partner_attrs = partner_elem.get('attributes', {})
-                waterfitters_id = int(partner_elem.get('id', 0))
-
-                # Addresses
-                shipping_addresses_list = []
-                billing_address = {}
-                addresses_data = partner_rel.get('addresses', {}).get('data', [])
-                if addresses_data:
-                    for address in addresses_data:
-                        address_id = int(address.get('id', 0))
-                        address_elem = self._wf_get_element("customeraddresses", address_id, token)
-                        address_attrs = address_elem.get('attributes') if address_elem else {}
-                        address_types_dict = address_attrs.get('types') if address_attrs else {}
-
-                        address_country_id = self._get_partner_country(address_elem) if address_elem else False
-                        country_id = self.env['res.country'].search([('code', '=', str(address_country_id).upper())],
-                                                                    limit=1)
-
-                        address_attrs['wf_id'] = address_id
-                        address_attrs['odoo_country_id'] = country_id
-                        address_attrs['odoo_country_code'] = country_id.code if country_id else False
-
-                        # Region\Province\State management
-                        region_id = False
-                        region_data = address_attrs.get('region', {}) if address_attrs else {}
-                        region_code = region_data.get('data', {}).get('id')
-                        if region_code:
-                            region_code = str(region_code).strip().upper()
-                            region_id = self.env['res.country.state'].search([('code', '=', region_code)], limit=1)
-                        address_attrs['odoo_region_id'] = region_id.id if region_id else False
-
-                        address_types = [addr.get('addressType') for addr in address_types_dict]
-                        if 'billing' in address_types: billing_address = address_attrs
-                        if 'shipping' in address_types:
-                            address_attrs['is_default_shipping'] = any(
-                                t.get('addressType') == 'shipping' and t.get('default', False) for t in
-                                address_types_dict)
-                            shipping_addresses_list.append(address_attrs)
-
-                # Customer Block Status
-                block_status_id = False
-                block_status_data = partner_rel.get('erpBlockStatus', {}).get('data')
-                block_status_wf_id = block_status_data.get('id', False) if block_status_data else False
-                if block_status_wf_id in dict(self._fields['solvency_block_status'].selection).keys():
-                    block_status_id = block_status_wf_id
-
-                # Customer Industry group
-                industry_group_id = False
-                group_id = self.get_relationship_id(token, partner_rel, 'group')
-                _logger.warning(f'industry group_id: {group_id}')
-                if group_id:
-                    industry_group_id = self.env['industry.group'].sudo().search(
-                        [('waterfitters_id', '=', group_id), ('is_wf_primary_match', '=', True)], limit=1
-                    )
-                    _logger.warning(f'industry industry_group_id: {industry_group_id}')
+        # Customers are streamed page by page (sorted by createdAt, so the watermark can follow them),
+        # with addresses and users sideloaded in the same response
+        new_sync_from = sync_from_datetime
+        last_remote_id = False
+        pagination_state = {}
+        customer_pages = self._wf_iter_paginated(
+            'customers', token, f'&sort=createdAt&filter[createdAt][gte]={sync_from_zulu}',
+            include='addresses,users', pagination_state=pagination_state
+        )
+
+        for partner_elem, included in customer_pages:
+
+            partner_rel = partner_elem.get('relationships', {})
+            partner_attrs = partner_elem.get('attributes', {})
+            partner_created_at = partner_attrs.get('createdAt')
+            if seen_remote_ids.get(str(partner_elem.get('id'))) == partner_created_at: continue
+
+            _logger.warning(f'partner_elem: {partner_elem}')
+            waterfitters_id = int(partner_elem.get('id', 0))
+
+            # Addresses
+            shipping_addresses_list = []
+            billing_address = {}
+            addresses_data = partner_rel.get('addresses', {}).get('data', [])
+            if addresses_data:
+                for address in addresses_data:
+                    address_id = int(address.get('id', 0))
+                    address_elem = included.get(('customeraddresses', str(address_id))) \
+                        or self._wf_get_element("customeraddresses", address_id, token)
+                    address_attrs = address_elem.get('attributes') if address_elem else {}
+                    address_types_dict = address_attrs.get('types') if address_attrs else {}
+
+                    address_country_id = self._get_partner_country(address_elem) if address_elem else False
+                    country_id = self.env['res.country'].search([('code', '=', str(address_country_id).upper())],
+                                                                limit=1)
+
+                    address_attrs['wf_id'] = address_id
+                    address_attrs['odoo_country_id'] = country_id
+                    address_attrs['odoo_country_code'] = country_id.code if country_id else False
+
+                    # Region\Province\State management
+                    region_id = False
+                    region_data = address_attrs.get('region', {}) if address_attrs else {}
+                    region_code = region_data.get('data', {}).get('id')
+                    if region_code:
+                        region_code = str(region_code).strip().upper()
+                        region_id = self.env['res.country.state'].search([('code', '=', region_code)], limit=1)
+                    address_attrs['odoo_region_id'] = region_id.id if region_id else False
+
+                    address_types = [addr.get('addressType') for addr in address_types_dict]
+                    if 'billing' in address_types: billing_address = address_attrs
+                    if 'shipping' in address_types:
+                        address_attrs['is_default_shipping'] = any(
+                            t.get('addressType') == 'shipping' and t.get('default', False) for t in
+                            address_types_dict)
+                        shipping_addresses_list.append(address_attrs)
+
+            # Customer Block Status
+            block_status_id = False
+            block_status_data = partner_rel.get('erpBlockStatus', {}).get('data')
+            block_status_wf_id = block_status_data.get('id', False) if block_status_data else False
+            if block_status_wf_id in dict(self._fields['solvency_block_status'].selection).keys():
+                block_status_id = block_status_wf_id
+
+            # Customer Industry group
+            industry_group_id = False
+            group_id = self.get_relationship_id(token, partner_rel, 'group')
+            _logger.warning(f'industry group_id: {group_id}')
+            if group_id:
+                industry_group_id = self.env['industry.group'].sudo().search(
+                    [('waterfitters_id', '=', group_id), ('is_wf_primary_match', '=', True)], limit=1
+                )
+                _logger.warning(f'industry industry_group_id: {industry_group_id}')
+
+            # Customer Payment Term
+            PaymentTerm = self.env['account.payment.term'].sudo()
+            WfPaymentTerm = self.env['wf.paymentterm'].sudo()
+
+            payment_term_id = False
+            term_id = self.get_relationship_id(token, partner_rel, 'paymentTerm')
+            if term_id:
+                wf_term_id = WfPaymentTerm.search([('waterfitters_id', '=', term_id)], limit=1)
+                if wf_term_id:
+                    payment_term_id = PaymentTerm.search([('x_studio_codice', '=', wf_term_id.code)], limit=1)
+
+            if not payment_term_id: payment_term_id = PaymentTerm.search([('x_studio_codice', '=', 'CACR')],
+                                                                         limit=1)
 
-                # Customer Payment Term
-                PaymentTerm = self.env['account.payment.term'].sudo()
-                WfPaymentTerm = self.env['wf.paymentterm'].sudo()
+            _logger.warning(f'Payment payment_term_id: {payment_term_id}')
+            _logger.warning(f'Payment term_id: {term_id}')
 
-                payment_term_id = False
-                term_id = self.get_relationship_id(token, partner_rel, 'paymentTerm')
-                if term_id:
-                    wf_term_id = WfPaymentTerm.search([('waterfitters_id', '=', term_id)], limit=1)
-                    if wf_term_id:
-                        payment_term_id = PaymentTerm.search([('x_studio_codice', '=', wf_term_id.code)], limit=1)
+            # Customer Account
+            wf_account_id = self.get_relationship_id(token, partner_rel, 'account')
 
-                if not payment_term_id: payment_term_id = PaymentTerm.search([('x_studio_codice', '=', 'CACR')],
-                                                                             limit=1)
+            # Search existing partner
+            partner_id = Partner.search(
+                [('type', '=', 'contact'), ('waterfitters_id', '=', waterfitters_id)],
+                limit=1)
 
-                _logger.warning(f'Payment payment_term_id: {payment_term_id}')
-                _logger.warning(f'Payment term_id: {term_id}')
+            # PARTNER CREATION - ONLY IF NOT ALREADY IN ODOO
+            if not partner_id:
 
-                # Customer Account
-                wf_account_id = self.get_relationship_id(token, partner_rel, 'account')
+                # Get the price category (both for the m2o record and the x_studio string)
+                price_category = partner_attrs.get('erp_discount_cat', False)
 
-                # Search existing partner
-                partner_id = Partner.search(
-                    [('type', '=', 'contact'), ('waterfitters_id', '=', waterfitters_id)],
+                pricelist_id = False
+                Pricelist = self.env['product.pricelist'].sudo()
+                if price_category: pricelist_id = Pricelist.search(
+                    [('x_studio_codice_sigla', '=', price_category)],
                     limit=1)
 
-                # PARTNER CREATION - ONLY IF NOT ALREADY IN ODOO
-                if not partner_id:
+                # If creating a new user and pricelist_id is not found, se standard Price List (WP1) # TODO: studio field, to be edited
+                if not pricelist_id and not partner_id: pricelist_id = Pricelist.search(
+                    [('x_studio_codice_sigla', '=', 'WF1')],
+                    limit=1)
 
-                    # Get the price category (both for the m2o record and the x_studio string)
-                    price_category = partner_attrs.get('erp_discount_cat', False)
+                fiscal_position_res = self._get_fiscal_position(billing_address)
+                fiscal_position = fiscal_position_res.get('fiscal_position')
+                is_italian = fiscal_position_res.get('is_italian')
+                odoo_country_id = billing_address.get('odoo_country_id')
+
+                partner_domain = {
+                    'parent_id': False,
+                    'is_company': True,
+                    'lang': 'it_IT' if fiscal_position == 1 else 'en_US',
+                    'type': 'contact',
+                    'street': billing_address.get('street'),
+                    'street2': billing_address.get('street2'),
+                    'city': billing_address.get('city'),
+                    'zip': billing_address.get('postalCode'),
+                    'state_id': billing_address.get('odoo_region_id'),
+                    'country_id': odoo_country_id.id if odoo_country_id else False,
+                    'name': partner_attrs.get('name') or _('Waterfitters customer ') + partner_attrs.get('email',
+                                                                                                         ''),
+                    'email': partner_attrs.get('email'),
+                    'x_studio_codice_soggetto': partner_attrs.get('erp_id'),  # TODO: studio field, to be edited
+                    'phone': partner_attrs.get('phone'),
+                    'fiscalcode': partner_attrs.get('fiscal_code'),
+                    'x_studio_iban': partner_attrs.get('iban'),  # TODO: studio field, to be edited
+                    'x_studio_codice_sdi': partner_attrs.get('sdi'),  # TODO: studio field, to be edited
+                    'x_studio_partita_iva_testo': partner_attrs.get('vat_code', ''),  # TODO: studio field, tbe
+                    'solvency_block_status': block_status_id,
+                    'x_studio_codice_categoria_sconto': price_category,  # TODO: studio field, to be edited
+                    'comment': _('Imported from Waterfitters on ') + now_string,
+                    'category_id': [1],
+                    'industry_group_id': industry_group_id.id if industry_group_id else False,
+                    'property_payment_term_id': payment_term_id.id if payment_term_id else False,
+                    'property_account_position_id': fiscal_position,
+                    'waterfitters_id': waterfitters_id,
+                    'wf_billing_address_id': billing_address.get('wf_id', 0),
+                    'wf_shipping_address_id': ','.join([str(s['wf_id']) for s in shipping_addresses_list]),
+                    'wf_account_id': wf_account_id,
+                }
 
-                    pricelist_id = False
-                    Pricelist = self.env['product.pricelist'].sudo()
-                    if price_category: pricelist_id = Pricelist.search(
-                        [('x_studio_codice_sigla', '=', price_category)],
-                        limit=1)
+                # Intl Vat code - if it has an international code, it gets priority first (for extra-ue and foreign customers)
+                int_identifier = partner_attrs.get('international_identifier_code')
+                intl_vat_code = int_identifier if not is_italian else False
+                if intl_vat_code: partner_domain['international_vat_code'] = intl_vat_code
 
-                    # If creating a new user and pricelist_id is not found, se standard Price List (WP1) # TODO: studio field, to be edited
-                    if not pricelist_id and not partner_id: pricelist_id = Pricelist.search(
-                        [('x_studio_codice_sigla', '=', 'WF1')],
-                        limit=1)
+                if pricelist_id: partner_domain['property_product_pricelist'] = pricelist_id.id
 
-                    fiscal_position_res = self._get_fiscal_position(billing_address)
-                    fiscal_position = fiscal_position_res.get('fiscal_position')
-                    is_italian = fiscal_position_res.get('is_italian')
-                    odoo_country_id = billing_address.get('odoo_country_id')
+                # Create an ERP ID if not set from origin
+                partner_erp_id = partner_domain.get('x_studio_codice_soggetto')
+                if not partner_erp_id:
+                    Sequence = self.env['ir.sequence'].sudo()
 
-                    partner_domain = {
-                        'parent_id': False,
-                        'is_company': True,
-                        'lang': 'it_IT' if fiscal_position == 1 else 'en_US',
-                        'type': 'contact',
-                        'street': billing_address.get('street'),
-                        'street2': billing_address.get('street2'),
-                        'city': billing_address.get('city'),
-                        'zip': billing_address.get('postalCode'),
-                        'state_id': billing_address.get('odoo_region_id'),
-                        'country_id': odoo_country_id.id if odoo_country_id else False,
-                        'name': partner_attrs.get('name') or _('Waterfitters customer ') + partner_attrs.get('email',
-                                                                                                             ''),
-                        'email': partner_attrs.get('email'),
-                        'x_studio_codice_soggetto': partner_attrs.get('erp_id'),  # TODO: studio field, to be edited
-                        'phone': partner_attrs.get('phone'),
-                        'fiscalcode': partner_attrs.get('fiscal_code'),
-                        'x_studio_iban': partner_attrs.get('iban'),  # TODO: studio field, to be edited
-                        'x_studio_codice_sdi': partner_attrs.get('sdi'),  # TODO: studio field, to be edited
-                        'x_studio_partita_iva_testo': partner_attrs.get('vat_code', ''),  # TODO: studio field, tbe
-                        'solvency_block_status': block_status_id,
-                        'x_studio_codice_categoria_sconto': price_category,  # TODO: studio field, to be edited
-                        'comment': _('Imported from Waterfitters on ') + now_string,
-                        'category_id': [1],
-                        'industry_group_id': industry_group_id.id if industry_group_id else False,
-                        'property_payment_term_id': payment_term_id.id if payment_term_id else False,
-                        'property_account_position_id': fiscal_position,
-                        'waterfitters_id': waterfitters_id,
-                        'wf_billing_address_id': billing_address.get('wf_id', 0),
-                        'wf_shipping_address_id': ','.join([str(s['wf_id']) for s in shipping_addresses_list]),
-                        'wf_account_id': wf_account_id,
-                    }
+                    # Avoid assigning non-unique codes
+                    while not partner_erp_id:
+                        candidate_code = Sequence.next_by_code('seq.partner.waterfitters.id') or 'CW000001'
+                        code_alreay_exists = self.env['res.partner'].sudo().search_count([
+                            ('x_studio_codice_soggetto', '=', candidate_code)
+                        ])
+                        if not code_alreay_exists: partner_erp_id = candidate_code
 
-                    # Intl Vat code - if it has an international code, it gets priority first (for extra-ue and foreign customers)
-                    int_identifier = partner_attrs.get('international_identifier_code')
-                    intl_vat_code = int_identifier if not is_italian else False
-                    if intl_vat_code: partner_domain['international_vat_code'] = intl_vat_code
-
-                    if pricelist_id: partner_domain['property_product_pricelist'] = pricelist_id.id
-
-                    # Create an ERP ID if not set from origin
-                    partner_erp_id = partner_domain.get('x_studio_codice_soggetto')
-                    if not partner_erp_id:
-                        Sequence = self.env['ir.sequence'].sudo()
-
-                        # Avoid assigning non-unique codes
-                        while not partner_erp_id:
-                            candidate_code = Sequence.next_by_code('seq.partner.waterfitters.id') or 'CW000001'
-                            code_alreay_exists = self.env['res.partner'].sudo().search_count([
-                                ('x_studio_codice_soggetto', '=', candidate_code)
-                            ])
-                            if not code_alreay_exists: partner_erp_id = candidate_code
-
-                        partner_domain['x_studio_codice_soggetto'] = partner_erp_id
-
-                    # Create the partner in Odoo, then if created PATCH the data back to
-                    partner_id = Partner.create(partner_domain)
-                    if not partner_id:
-                        _logger.error(f'Unable to create a customer partner for the following domain: {partner_domain}')
-                    if partner_id:
-                        _logger.info(f'Waterfitters customer {waterfitters_id} saved ad Odoo Partner {partner_id.id}')
-
-                        # PATCH the updated data back to Waterfitters
-                        patch_payload = {
-                            "data": {
-                                "type": "customers",
-                                "id": str(waterfitters_id),
-                                "attributes": {
-                                    "is_exportable": False,
-                                    "is_erp_exported": True, "erp_exported_at": now_zulu,
-                                    "erp_discount_cat": "WF1", "erp_id": partner_erp_id
-                                },
-                            }
-                        }
+                    partner_domain['x_studio_codice_soggetto'] = partner_erp_id
+
+                # Create the partner in Odoo, then if created PATCH the data back to
+                partner_id = Partner.create(partner_domain)
+                if not partner_id:
+                    _logger.error(f'Unable to create a customer partner for the following domain: {partner_domain}')
+                if partner_id:
+                    _logger.info(f'Waterfitters customer {waterfitters_id} saved ad Odoo Partner {partner_id.id}')
 
-                        # Pass payment term
-                        if payment_term_id:
-
-                            wf_payment_term_id = self.env['wf.paymentterm'].search([
-                                ('code', '=', payment_term_id.x_studio_codice)
-                            ], limit=1)
-
-                            if wf_payment_term_id:
-                                patch_payload['data']['relationships'] = {"paymentTerm":
-                                                                              {'data': {'type': 'paymentterms',
-                                                                                        'id': str(
-                                                                                            wf_payment_term_id.waterfitters_id)}}
-                                                                          }
-
-                        patch_response = self._wf_payload_request(
-                            'customers', patch_payload, token, 'PATCH', waterfitters_id
-                        )
-                        _logger.info(_(f'Customers PATCH payload: {patch_payload}'))
-                        _logger.info(_(f'Customers PATCH response: {patch_response}'))
-
-                # Customer Users
-                customer_users_list = []
-
-                customer_users_data = partner_rel.get('users', {}).get('data', [])
-
-                if customer_users_data:
-                    for customer_user_data in customer_users_data:
-                        wf_customer_user_id = int(customer_user_data.get('id', 0))
-                        if wf_customer_user_id:
-                            customer_user_elem = self._wf_get_element("customerusers", wf_customer_user_id, token)
-                            customer_user_attrs = customer_user_elem.get('attributes') if customer_user_elem else {}
-
-                            name_parts = [
-                                customer_user_attrs.get('namePrefix') or '',
-                                customer_user_attrs.get('firstName') or '',
-                                customer_user_attrs.get('middleName') or '',
-                                customer_user_attrs.get('lastName') or '',
-                                customer_user_attrs.get('nameSuffix') or ''
-                            ]
-
-                        customer_user_odoo_dict = {
-                            'name': ' '.join(name_parts),
-                            'parent_id': partner_id.id,
-                            'type': 'contact',
-                            'active': customer_user_attrs.get('enabled', True),
-                            'email': customer_user_attrs.get('email'),
-                            'wf_customer_user_id': wf_customer_user_id,
-                            'customer_rank': 1,
-                            'category_id': [11],
-                            'is_company': False
+                    # PATCH the updated data back to Waterfitters
+                    patch_payload = {
+                        "data": {
+                            "type": "customers",
+                            "id": str(waterfitters_id),
+                            "attributes": {
+                                "is_exportable": False,
+                                "is_erp_exported": True, "erp_exported_at": now_zulu,
+                                "erp_discount_cat": "WF1", "erp_id": partner_erp_id
+                            },
                         }
+                    }
+
+                    # Pass payment term
+                    if payment_term_id:
 
-                        # Write if existing else create the new shipping address
-                        customer_user_id = Partner.search([
-                            ('type', '=', 'contact'),
-                            ('parent_id', '=', partner_id.id),
-                            '|', '|', '|',
-                            ('wf_customer_user_id', '=', str(wf_customer_user_id)),
-                            ('wf_customer_user_id', '=like', f'{wf_customer_user_id},%'),
-                            ('wf_customer_user_id', '=like', f'%,{wf_customer_user_id},%'),
-                            ('wf_customer_user_id', '=like', f'%,{wf_customer_user_id}')
+                        wf_payment_term_id = self.env['wf.paymentterm'].search([
+                            ('code', '=', payment_term_id.x_studio_codice)
                         ], limit=1)
 
-                        if not customer_user_id:
-                            Partner.create(customer_user_odoo_dict)
-                        else:
-                            customer_user_id.write(customer_user_odoo_dict)
-
-                        customer_users_list.append(str(wf_customer_user_id))
-
-                partner_id.wf_customer_user_id = ','.join(customer_users_list)
-
-                # Shipping addresses creation and update
-                if shipping_addresses_list:
-                    for shipping_address in shipping_addresses_list:
-                        shipping_name = shipping_address.get('organization', _('Shipping Address'))
-                        shipping_wf_id = shipping_address.get('wf_id')
-
-                        country_id = shipping_address.get('odoo_country_id')
-                        fiscal_position_res = self._get_fiscal_position(shipping_address)
-                        fiscal_position = fiscal_position_res.get('fiscal_position')
-
-                        shipping_odoo_dict = {
-                            'parent_id': partner_id.id,
-                            'commercial_partner_id': partner_id.id,
-                            'category_id': [10],
-                            'is_company': False,
-                            'type': 'delivery',
-                            'street': shipping_address.get('street'),
-                            'street2': shipping_address.get('street2'),
-                            'city': shipping_address.get('city'),
-                            'zip': shipping_address.get('postalCode'),
-                            'state_id': shipping_address.get('odoo_region_id'),
-                            'country_id': country_id.id if country_id else False,
-                            'name': shipping_name,
-                            'email': partner_attrs.get('email'),
-                            'x_studio_codice_soggetto': partner_attrs.get('erp_id'),  # TODO: studio field, to be edited
-                            'phone': shipping_address.get('phone'),
-                            'comment': _('Imported from Waterfitters on ') + now_string,
-                            'waterfitters_id': shipping_wf_id,
-                            'wf_is_default_shipping_address': shipping_address.get('is_default_shipping', False),
-                        }
+                        if wf_payment_term_id:
+                            patch_payload['data']['relationships'] = {"paymentTerm":
+                                                                          {'data': {'type': 'paymentterms',
+                                                                                    'id': str(
+                                                                                        wf_payment_term_id.waterfitters_id)}}
+                                                                      }
+
+                    patch_response = self._wf_payload_request(
+                        'customers', patch_payload, token, 'PATCH', waterfitters_id
+                    )
+                    _logger.info(_(f'Customers PATCH payload: {patch_payload}'))
+                    _logger.info(_(f'Customers PATCH response: {patch_response}'))
+
+            # Customer Users
+            customer_users_list = []
+
+            customer_users_data = partner_rel.get('users', {}).get('data', [])
+
+            if customer_users_data:
+                for customer_user_data in customer_users_data:
+                    wf_customer_user_id = int(customer_user_data.get('id', 0))
+                    if wf_customer_user_id:
+                        customer_user_elem = included.get(('customerusers', str(wf_customer_user_id))) \
+                            or self._wf_get_element("customerusers", wf_customer_user_id, token)
+                        customer_user_attrs = customer_user_elem.get('attributes') if customer_user_elem else {}
+
+                        name_parts = [
+                            customer_user_attrs.get('namePrefix') or '',
+                            customer_user_attrs.get('firstName') or '',
+                            customer_user_attrs.get('middleName') or '',
+                            customer_user_attrs.get('lastName') or '',
+                            customer_user_attrs.get('nameSuffix') or ''
+                        ]
+
+                    customer_user_odoo_dict = {
+                        'name': ' '.join(name_parts),
+                        'parent_id': partner_id.id,
+                        'type': 'contact',
+                        'active': customer_user_attrs.get('enabled', True),
+                        'email': customer_user_attrs.get('email'),
+                        'wf_customer_user_id': wf_customer_user_id,
+                        'customer_rank': 1,
+                        'category_id': [11],
+                        'is_company': False
+                    }
+
+                    # Write if existing else create the new shipping address
+                    customer_user_id = Partner.search([
+                        ('type', '=', 'contact'),
+                        ('parent_id', '=', partner_id.id),
+                        '|', '|', '|',
+                        ('wf_customer_user_id', '=', str(wf_customer_user_id)),
+                        ('wf_customer_user_id', '=like', f'{wf_customer_user_id},%'),
+                        ('wf_customer_user_id', '=like', f'%,{wf_customer_user_id},%'),
+                        ('wf_customer_user_id', '=like', f'%,{wf_customer_user_id}')
+                    ], limit=1)
+
+                    if not customer_user_id:
+                        Partner.create(customer_user_odoo_dict)
+                    else:
+                        customer_user_id.write(customer_user_odoo_dict)
+
+                    customer_users_list.append(str(wf_customer_user_id))
+
+            partner_id.wf_customer_user_id = ','.join(customer_users_list)
+
+            # Shipping addresses creation and update
+            if shipping_addresses_list:
+                for shipping_address in shipping_addresses_list:
+                    shipping_name = shipping_address.get('organization', _('Shipping Address'))
+                    shipping_wf_id = shipping_address.get('wf_id')
+
+                    country_id = shipping_address.get('odoo_country_id')
+                    fiscal_position_res = self._get_fiscal_position(shipping_address)
+                    fiscal_position = fiscal_position_res.get('fiscal_position')
 
-                        # Write if existing else create the new shipping address
-                        shipping_partner_id = Partner.search(
-                            [('type', '=', 'delivery'), ('waterfitters_id', '=', shipping_wf_id)], limit=1)
-
-                        if not shipping_partner_id:
-                            shipping_partner_id = Partner.create(shipping_odoo_dict)
-                            # property_account_position_id is edited after the full write to avoid triggering
-                            if shipping_partner_id: shipping_partner_id.write(
-                                {'property_account_position_id': fiscal_position})
-                            _logger.warning(f'shipping dict IN CREATE: {shipping_odoo_dict}')
-                        else:
-                            shipping_partner_id.write(shipping_odoo_dict)
-                            shipping_partner_id.write({'property_account_position_id': fiscal_position})
-                            _logger.warning(
-                                f'shipping dict IN EDIT: {shipping_odoo_dict} - partner: {shipping_partner_id.id}')
-
-                _logger.warning(f'partner_id: {partner_id}')
-                self.env.cr.commit()
+                    shipping_odoo_dict = {
+                        'parent_id': partner_id.id,
+                        'commercial_partner_id': partner_id.id,
+                        'category_id': [10],
+                        'is_company': False,
+                        'type': 'delivery',
+                        'street': shipping_address.get('street'),
+                        'street2': shipping_address.get('street2'),
+                        'city': shipping_address.get('city'),
+                        'zip': shipping_address.get('postalCode'),
+                        'state_id': shipping_address.get('odoo_region_id'),
+                        'country_id': country_id.id if country_id else False,
+                        'name': shipping_name,
+                        'email': partner_attrs.get('email'),
+                        'x_studio_codice_soggetto': partner_attrs.get('erp_id'),  # TODO: studio field, to be edited
+                        'phone': shipping_address.get('phone'),
+                        'comment': _('Imported from Waterfitters on ') + now_string,
+                        'waterfitters_id': shipping_wf_id,
+                        'wf_is_default_shipping_address': shipping_address.get('is_default_shipping', False),
+                    }
+
+                    # Write if existing else create the new shipping address
+                    shipping_partner_id = Partner.search(
+                        [('type', '=', 'delivery'), ('waterfitters_id', '=', shipping_wf_id)], limit=1)
+
+                    if not shipping_partner_id:
+                        shipping_partner_id = Partner.create(shipping_odoo_dict)
+                        # property_account_position_id is edited after the full write to avoid triggering
+                        if shipping_partner_id: shipping_partner_id.write(
+                            {'property_account_position_id': fiscal_position})
+                        _logger.warning(f'shipping dict IN CREATE: {shipping_odoo_dict}')
+                    else:
+                        shipping_partner_id.write(shipping_odoo_dict)
+                        shipping_partner_id.write({'property_account_position_id': fiscal_position})
+                        _logger.warning(
+                            f'shipping dict IN EDIT: {shipping_odoo_dict} - partner: {shipping_partner_id.id}')
+
+            _logger.warning(f'partner_id: {partner_id}')
+            self.env.cr.commit()
+
+            seen_remote_ids[str(waterfitters_id)] = partner_created_at
+            new_sync_from = max(new_sync_from, SyncState._parse_wf_datetime(partner_created_at) or new_sync_from)
+            last_remote_id = waterfitters_id
+
+        if last_remote_id:
+            sync_state._save_sync_state(new_sync_from, seen_remote_ids, last_remote_id)
+            self.env.cr.commit()
+        if not pagination_state.get('complete'):
+            _logger.warning(f"Waterfitters customers sync stopped at page {pagination_state.get('page')}, it will resume from there")
+
+        self._wf_log_stats('customers GET sync')
 
     def wf_get_users(self, sync_from_datetime=False):
         Partner = self.env['res.partner'].sudo()
+        self._wf_reset_stats()
         if not hasattr(self, '_connection_data'): self._get_connection_data()
 
         token = self._wf_get_token()
@@ -680,17 +711,31 @@ class ResPartner(models.Model):
         now = datetime.now()
         now_zulu = now.strftime('%Y-%m-%dT%H:%M:%SZ')
 
-        if not sync_from_datetime: sync_from_datetime = now - timedelta(minutes=30)
+        # Incremental sync on updatedAt: a user is skipped only if already processed with the same updatedAt
+        SyncState = self.env['wf.sync.state']
+        sync_state = SyncState._get_state('customerusers')
+        seen_remote_ids = sync_state._get_seen_remote_ids()
+
+        if not sync_from_datetime: sync_from_datetime = sync_state.last_sync_date or now - timedelta(minutes=30)
         sync_from_zulu = sync_from_datetime.strftime('%Y-%m-%dT%H:%M:%SZ')
 
-        user_response = self._wf_get_paginated('customerusers', token, f'[updatedAt][gt]={sync_from_zulu}', 'createdAt')
+        user_response = self._wf_get_paginated('customerusers', token, f'[updatedAt][gte]={sync_from_zulu}', 'createdAt')
 
         if user_response:
+            new_sync_from = sync_from_datetime
+            last_remote_id = False
+
             for user_dict in user_response:
                 user_elem = user_dict.get('element', {})
                 user_rel = user_elem.get('relationships', {})
                 user_id = user_elem.get('id')
                 user_attrs = user_elem.get('attributes', {})
+                user_updated_at = user_attrs.get('updatedAt')
+                if seen_remote_ids.get(str(user_id)) == user_updated_at: continue
+
+                seen_remote_ids[str(user_id)] = user_updated_at
+                new_sync_from = max(new_sync_from, SyncState._parse_wf_datetime(user_updated_at) or new_sync_from)
+                last_remote_id = user_id
                 customer_rel = user_rel.get('customer', {})
                 customer_data = customer_rel.get('data', {})
                 customer_id = customer_data.get('id')
@@ -713,3 +758,7 @@ class ResPartner(models.Model):
                     )
                     if partners_with_updated_users: partners_with_updated_users.write({'wf_is_ready_to_sync': True})
 
+            sync_state._save_sync_state(new_sync_from, seen_remote_ids, last_remote_id)
+
+        self._wf_log_stats('customerusers GET sync')
+
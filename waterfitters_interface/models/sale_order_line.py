@@ -2,6 +2,8 @@
 # License LGPL-3.0 or later (https://www.gnu.org/licenses/lgpl).
 
 from odoo import _, api, models, fields
+from concurrent.futures import ThreadPoolExecutor
+from .waterfitters_shared import WF_POOL_MAXSIZE
 
 import datetime
 import logging
@@ -27,49 +29,82 @@ class SaleOrderLine(models.Model):
             if line.wf_order_line_item_id and order_id.state not in ['cancel', 'draft'] and line.qty_delivered:
                 line.wf_order_line_to_be_synched = True
 
+    # Latest batch departure date (x_studio_data_partenza_spedizione) by line id, for all the lines at once
+    def _get_wf_ship_by_dates(self):
+        ship_by_dates = {}
+        moves = self.env['stock.move'].search([('sale_line_id', 'in', self.ids), ('picking_id.batch_id', '!=', False)])
+        for move in moves:
+            confirmed_date = move.picking_id.batch_id.x_studio_data_partenza_spedizione
+            if not confirmed_date: continue
+            line_id = move.sale_line_id.id
+            if line_id not in ship_by_dates or confirmed_date > ship_by_dates[line_id]: ship_by_dates[line_id] = confirmed_date
+        return ship_by_dates
+
+    def _prepare_wf_shipping_payload(self, ship_by):
+        self.ensure_one()
+
+        status_id = 'shipped'
+        if self.qty_delivered == 0:  status_id = 'not_shipped'
+        elif self.qty_delivered < self.product_uom_qty: status_id = 'partially_shipped'
+
+        return {
+            "data": {
+                "type": "orderlineitems",
+                "id": str(self.wf_order_line_item_id),
+                "attributes": {"shipped_qty": self.qty_delivered, 'shipBy': ship_by},
+                "relationships": {
+                    "shipping_status": {"data": {"type": "wforderlineitemsshippingstatuses", "id": status_id}}
+                }
+            }
+        }
+
     def sync_waterfitters_shipping_state(self):
+        self._wf_reset_stats()
         token = self._wf_get_token()
         if not token:
             _logger.error(_('Unable to obtain a token - Cannot proceed'))
             return None
 
         # Exclude lines without wf_order_line_item_id
-        for line in self.filtered(lambda l: l.wf_order_line_item_id):
-
-            status_id = 'shipped'
-            if line.qty_delivered == 0:  status_id = 'not_shipped'
-            elif line.qty_delivered < line.product_uom_qty: status_id = 'partially_shipped'
-
-            wf_line_id = str(line.wf_order_line_item_id)
-
-            # Get the furthest DDT date for the given line, otherwise now.
-            moves = self.env['stock.move'].search([('sale_line_id', '=', line.id)])
-            pickings = moves.mapped('picking_id')
-            picking_batches = pickings.mapped('batch_id')
-            confirmed_dates = picking_batches.mapped('x_studio_data_partenza_spedizione')
-
-            valid_dates = [d for d in confirmed_dates if d]
-            max_date = max(valid_dates) if valid_dates else datetime.datetime.now()
-            ship_by = max_date.strftime('%Y-%m-%d')
-
-            payload = {
-                "data": {
-                    "type": "orderlineitems",
-                    "id": wf_line_id,
-                    "attributes": {"shipped_qty": line.qty_delivered, 'shipBy': ship_by},
-                    "relationships": {
-                        "shipping_status": {"data": {"type": "wforderlineitemsshippingstatuses", "id": status_id}}
-                    }
-                }
-            }
-
-            # payload['data']['attributes']['shipBy'] = datetime.datetime.now().strftime('%Y-%m-%d')
-
-            item_json = self._wf_payload_request(f'orderlineitems/{wf_line_id}', payload, token, 'PATCH')
-
-            if item_json.get('code'):
-                _logger.info(_(f"Line {line.id} processed: {item_json['code']}"))
-                line.wf_order_line_to_be_synched = False
-            else:
-                _logger.error(_(f'Unable to update the delivered quantity for line {line.id} - Passing to next..'))
-                pass
+        lines = self.filtered(lambda l: l.wf_order_line_item_id)
+        if not lines: return None
+
+        # Get the furthest DDT date for each line, otherwise now.
+        ship_by_dates = lines._get_wf_ship_by_dates()
+        today = datetime.datetime.now()
+
+        # Payloads are prepared on the cron cursor, the workers only do the PATCH calls
+        requests_data = [
+            (line.id, str(line.wf_order_line_item_id),
+             line._prepare_wf_shipping_payload(ship_by_dates.get(line.id, today).strftime('%Y-%m-%d')))
+            for line in lines
+        ]
+
+        connection_data = self._get_connection_data()
+        try: concurrency = int(connection_data.get('orders_concurrency') or 1)
+        except (TypeError, ValueError): concurrency = 1
+        concurrency = min(max(concurrency, 1), WF_POOL_MAXSIZE)
+
+        def send(request_data):
+            line_id, wf_line_id, payload = request_data
+            return line_id, self._wf_payload_request(
+                f'orderlineitems/{wf_line_id}', payload, token, 'PATCH', connection_data=connection_data
+            )
+
+        synched_line_ids = []
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='wf_lines') as executor:
+            for line_id, item_json in executor.map(send, requests_data):
+                code = item_json.get('code')
+
+                # Auth, throttling and server errors are transient: the line stays queued for the next run
+                if not code or code in (401, 429) or code >= 500:
+                    _logger.error(_(f'Unable to update the delivered quantity for line {line_id} - Passing to next..'))
+                    continue
+
+                if code >= 300: _logger.error(_(f"Line {line_id} rejected by Waterfitters: {code} {item_json.get('json')}"))
+                else: _logger.info(_(f"Line {line_id} processed: {code}"))
+                synched_line_ids.append(line_id)
+
+        if synched_line_ids: self.browse(synched_line_ids).write({'wf_order_line_to_be_synched': False})
+
+        self._wf_log_stats('order lines PATCH sync')
@@ -2,6 +2,9 @@
 # License LGPL-3.0 or later (https://www.gnu.org/licenses/lgpl).
 
 from odoo import _, models
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from .waterfitters_shared import WF_POOL_MAXSIZE
 import requests
 import datetime
 import json
@@ -9,6 +12,9 @@ import json
 import logging
 _logger = logging.getLogger(__name__)
 
+# Order resources sideloaded with the order (JSON:API include) #
+WF_ORDER_INCLUDE = 'customer,shippingAddress,lineItems'
+
 # Mapping metodi di pagamento #
 payment_methods_map = {
     'payment_term_1': 'customer_payment_term',
@@ -50,16 +56,17 @@ class SyncWaterfitters(models.Model):
         return parsed_date
 
     ### GENERIC FETCH FUNCTION - MULTI GET ###
-    def _fetch_paginated_data(self, model_uri, start_date_str=False, sort_str=False):
+    # connection_data and token can be passed to skip any ORM access (e.g. from a worker thread)
+    def _fetch_paginated_data(self, model_uri, start_date_str=False, sort_str=False, connection_data=False, token=False):
 
-        token = self._wf_get_token()
+        token = token or self._wf_get_token(connection_data=connection_data or None)
         if not token:
             _logger.error(_('Unable to obtain a token - Cannot proceed'))
             return None
 
-        connection_data = self._get_connection_data()
-        base_url = str(connection_data.get('endpoints_url', '')).rstrip('/')
-        page_dimension_setting = connection_data.get('customers_batch_limit', '')
+        connection_data_passed = connection_data
+        connection_data = connection_data or self._get_connection_data()
+        page_dimension_setting = str(connection_data.get('customers_batch_limit', ''))
         page_dimension = int(page_dimension_setting) if page_dimension_setting.strip().isdigit() else 50
 
         uri_sort_str = f"&sort={sort_str}" if sort_str else ''
@@ -80,93 +87,75 @@ class SyncWaterfitters(models.Model):
         # DOVREBBE ESSERE updatedAt MA ANCHE SE IN SPECIFICHE NON E' PRESENTE NEI FILTRI DELLE API DI OROCOMMERCE **TODO**
         date_uri = f"&filter[createdAt][gte]={iso_start_date_str}" if iso_start_date_str else ''
 
-        get_next_page = True
-        next_page = 0
-        incoming_data = []
-        concatenator_char = '&' if '?' in model_uri else '?'
-
-        while get_next_page:
-            next_page += 1
-            url = f"{base_url}/admin/api/{model_uri}{concatenator_char}page[number]={next_page}&page[size]={page_dimension}{uri_sort_str}{date_uri}"
-
-            headers = {
-                "Authorization": f"Bearer {token}",
-                "Accept": "application/vnd.api+json"
-            }
-
-            response = requests.get(url, headers=headers)
-
-            if response.status_code == 200:
-                response_json = response.json()
-                response_data = response_json.get('data', [])
-
-                # Pagination: as long as there are future results it will iterate the next page, otherwise it will exit
-                if not response_data:
-                    get_next_page = False
-                else:
-                    if len(response_data) < page_dimension:
-                        get_next_page = False
-
-                    for response_element in response_data:
-                        incoming_data.append({
-                            'id': response_element.get('id'),
-                            'attributes': response_element.get('attributes')
-                        })
+        # Pages are streamed (next one prefetched), but the list is returned only if complete
+        pagination_state = {}
+        incoming_data = [
+            {'id': response_element.get('id'), 'attributes': response_element.get('attributes')}
+            for response_element, _included in self._wf_iter_paginated(
+                model_uri, token, f"{uri_sort_str}{date_uri}", page_dimension,
+                connection_data=connection_data_passed, pagination_state=pagination_state
+            )
+        ]
 
-            else:
-                _logger.warning(
-                    f"Sync Waterfitters - Error fetching {model_uri}: {url} --- {response.status_code}, {response.text}")
-                return None
+        if not pagination_state['complete']:
+            _logger.warning(f"Sync Waterfitters - Error fetching {model_uri}, stopped at page {pagination_state['page']}")
+            return None
 
         return incoming_data
 
     ### GENERIC FETCH FUNCTION - SINGLE GET ###
-    def _fetch_element(self, model_name, model_id, post_model_str=False, join_model_string='/', return_attr='data'):
+    def _fetch_element(self, model_name, model_id, post_model_str=False, join_model_string='/', return_attr='data',
+                       connection_data=False, token=False):
 
-        token = self._wf_get_token()
+        connection_data = connection_data or self._get_connection_data()
+        token = token or self._wf_get_token(connection_data=connection_data)
         if not token:
             _logger.error(_('Unable to obtain a token - Cannot proceed'))
             return None
 
-        connection_data = self._get_connection_data()
         base_url = str(connection_data['endpoints_url']).rstrip('/')
 
         uri_post_model_str = f'/{post_model_str}' if post_model_str else ''
         url = f"{base_url}/admin/api/{model_name}{join_model_string}{model_id}{uri_post_model_str}"
 
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Accept": "application/vnd.api+json"
-        }
+        for attempt in range(2):
+            headers = {
+                "Authorization": f"Bearer {token}",
+                "Accept": "application/vnd.api+json"
+            }
+
+            try:
+                response = self._wf_request('GET', url, headers=headers)
+            except requests.RequestException as e:
+                _logger.warning(f"Sync Waterfitters - Error fetching {model_name}: {url} --- {e}")
+                return None
 
-        response = requests.get(url, headers=headers)
+            # Token expired or revoked during a long run: refreshed once, then the call is retried
+            if response.status_code != 401 or attempt: break
+            self._wf_invalidate_token(connection_data)
+            token = self._wf_get_token(connection_data=connection_data)
+            if not token: break
 
         if response.status_code == 200:
             response_json = response.json()
-            response_data = response_json.get(return_attr, [])
+            response_data = response_json.get(return_attr, []) if return_attr else response_json
             return response_data
 
         else:
+            if response.status_code == 401: self._wf_invalidate_token(connection_data)
             _logger.warning(
                 f"Sync Waterfitters - Error fetching {model_name}: {url} --- {response.status_code}, {response.text}")
             return None
 
-    ### ORDER METHOD - CALLED FOR EACH ELEMENT, LOGIG INSIDE ###
-
-    def order(self, token, order_id=False):
-
-        Partner = self.env['res.partner'].sudo()
-        now = datetime.datetime.now()
-        today = datetime.date.today()
-
-        order_elem = self._fetch_element("orders", f'{order_id}')
+    ### ODOO ORDER NAME - OWYY/00000 ###
+    def _get_order_name(self, order_elem_id, order_attrs, now):
+        order_created_at = order_attrs.get('createdAt')
+        order_elem_year = order_created_at[2:4] if order_created_at else now.strftime('%y')
+        return 'OW' + order_elem_year + '/' + str(order_elem_id).zfill(5)
 
-        # Order retrieval
-        order_attrs = order_elem['attributes'] if order_elem and 'attributes' in order_elem else None
-        if not order_attrs:
-            _logger.warning(f"Attributo 'attributes' non presente per il record: {order_elem}")
-            return
+    ### ORDER REMOTE DATA - NO ORM ACCESS, SAFE TO RUN IN A WORKER THREAD ###
 
+    def _is_order_too_recent(self, order_attrs, now):
         # Check if the order is too recent - if it is less than 30 mins old, skip it
         order_created_at_str = order_attrs.get('createdAt')
         if order_created_at_str:
@@ -176,13 +165,147 @@ class SyncWaterfitters(models.Model):
                 order_time_diff = now - order_created_at
 
                 # Check if the order is older than 30 minutes
-                if order_time_diff < datetime.timedelta(minutes=30):
-                    _logger.info("The order is too recent. Skipping...")
-                    return
+                if order_time_diff < datetime.timedelta(minutes=30): return True
 
             except Exception as e:
                 _logger.info(f"Unable to verify the order createdAt attribute: {e}. Ignoring it")
 
+        return False
+
+    # The order graph comes from the order's sideloaded resources (included, indexed by (type, id)):
+    # either from the orders list page or from a single GET. Only the payment transactions need their own call.
+    # The token is read from the shared cache on each call, so that it is refreshed during long runs.
+    def _fetch_order_data(self, order_id, connection_data, order_elem=False, included=None):
+        fetch_kwargs = {'connection_data': connection_data}
+
+        if not order_elem:
+            order_json = self._fetch_element(
+                "orders", f'{order_id}?include={WF_ORDER_INCLUDE}', False, '/', False, **fetch_kwargs
+            ) or {}
+            order_elem = order_json.get('data')
+            included = {(elem.get('type'), str(elem.get('id'))): elem for elem in order_json.get('included') or []}
+        included = included or {}
+
+        order_data = {
+            'order_elem': order_elem,
+            'order_included': None,
+            'payment_elems': None,
+            'shipping_order_elem': None,
+            'order_lines': None,
+        }
+
+        order_attrs = order_elem['attributes'] if order_elem and 'attributes' in order_elem else None
+        if not order_attrs or self._is_order_too_recent(order_attrs, datetime.datetime.now()): return order_data
+
+        order_rel = order_elem.get('relationships') or {}
+
+        customer_data = (order_rel.get('customer') or {}).get('data')
+        customer_elem = included.get(('customers', str(customer_data.get('id')))) if customer_data else None
+        order_data['order_included'] = [customer_elem] if customer_elem else self._fetch_element(
+            "orders", f'{order_id}?include=customer', False, '/', 'included', **fetch_kwargs
+        )
+
+        order_data['payment_elems'] = self._fetch_element(
+            "paymenttransactions",
+            f"filter[entityClass]=Oro\Bundle\OrderBundle\Entity\Order&filter[entityIdentifier]={order_id}&page[number]=1&page[size]=10&sort=-createdAt",
+            False,
+            "?",
+            **fetch_kwargs
+        )
+
+        shipping_add_data = (order_rel.get('shippingAddress') or {}).get('data')
+        if shipping_add_data and shipping_add_data.get('type') == 'orderaddresses':
+            order_data['shipping_order_elem'] = included.get(('orderaddresses', str(shipping_add_data['id']))) \
+                or self._fetch_element("orderaddresses", shipping_add_data['id'], **fetch_kwargs)
+
+        line_items_data = (order_rel.get('lineItems') or {}).get('data')
+        if customer_data is not None and 'customer' in order_rel and line_items_data:
+            line_elems = [included.get(('orderlineitems', str(line.get('id')))) for line in line_items_data]
+
+            # Fallback on the paginated line items if they were not all sideloaded
+            if all(line_elems):
+                order_data['order_lines'] = [
+                    {'id': line_elem.get('id'), 'attributes': line_elem.get('attributes')} for line_elem in line_elems
+                ]
+            else:
+                order_data['order_lines'] = self._fetch_paginated_data(
+                    f"orderlineitems?filter[order]={order_elem['id']}", **fetch_kwargs
+                )
+
+        return order_data
+
+    ### ORDER LINES LOOKUPS - SET BASED, MEMOISED FOR THE WHOLE RUN ###
+
+    def _prepare_order_lines_lookups(self, order_lines, memo, internal_location_uid=8):
+        products_memo = memo.setdefault('products', {})
+        currencies_memo = memo.setdefault('currencies', {})
+
+        line_attrs_list = [line.get('attributes') or {} for line in order_lines or []]
+        skus = {attrs['productSku'] for attrs in line_attrs_list if attrs.get('productSku')}
+        currency_names = {attrs['currency'] for attrs in line_attrs_list if attrs.get('currency')}
+
+        # Products by default_code - keep the first match as search(..., limit=1) did
+        missing_skus = skus - set(products_memo)
+        if missing_skus:
+            for product in self.env['product.product'].search([('default_code', 'in', list(missing_skus))]):
+                products_memo.setdefault(product.default_code, product)
+            for sku in missing_skus: products_memo.setdefault(sku, self.env['product.product'])
+
+        # Currencies by name, with the id 1 fallback
+        if 'fallback' not in currencies_memo:
+            currencies_memo['fallback'] = self.env['res.currency'].search([('id', '=', 1)], limit=1)
+        missing_currencies = currency_names - set(currencies_memo)
+        if missing_currencies:
+            for currency in self.env['res.currency'].search([('name', 'in', list(missing_currencies))]):
+                currencies_memo.setdefault(currency.name, currency)
+            for currency_name in missing_currencies: currencies_memo.setdefault(currency_name, currencies_memo['fallback'])
+
+        # Availability in the internal location (and its children) - never memoised across orders,
+        # since each confirmed order changes the reservations
+        product_ids = [products_memo[sku].id for sku in skus if products_memo[sku]]
+        available_qty_by_product = dict.fromkeys(product_ids, 0.0)
+        if product_ids:
+            quants_data = self.env['stock.quant'].read_group(
+                [
+                    ('product_id', 'in', product_ids),
+                    '|', ('location_id', '=', internal_location_uid), ('location_id.location_id', '=', internal_location_uid)
+                ],
+                ['quantity:sum', 'reserved_quantity:sum'],
+                ['product_id'],
+                lazy=False
+            )
+            for quant_data in quants_data:
+                available_qty_by_product[quant_data['product_id'][0]] = \
+                    quant_data['quantity'] - quant_data['reserved_quantity']
+
+        return {
+            'products': products_memo,
+            'currencies': currencies_memo,
+            'available_qty': available_qty_by_product,
+        }
+
+    ### ORDER METHOD - CALLED FOR EACH ELEMENT, LOGIG INSIDE ###
+
+    def order(self, token, order_id=False, order_data=None, memo=None):
+
+        Partner = self.env['res.partner'].sudo()
+        now = datetime.datetime.now()
+        today = datetime.date.today()
+
+        # Remote data is either prefetched by orders() or fetched here sequentially
+        if order_data is None: order_data = self._fetch_order_data(order_id, self._get_connection_data())
+        order_elem = order_data['order_elem']
+
+        # Order retrieval
+        order_attrs = order_elem['attributes'] if order_elem and 'attributes' in order_elem else None
+        if not order_attrs:
+            _logger.warning(f"Attributo 'attributes' non presente per il record: {order_elem}")
+            return
+
+        if self._is_order_too_recent(order_attrs, now):
+            _logger.info("The order is too recent. Skipping...")
+            return
+
         _logger.warning(f"data: {order_elem}")
 
         order_rel = order_elem['relationships'] if 'relationships' in order_elem else []
@@ -190,7 +313,7 @@ class SyncWaterfitters(models.Model):
         ### MAIN / BILLING PARTNER RETRIEVAL - START ###
 
         partner_id = False
-        order_included = self._fetch_element("orders", f'{order_id}?include=customer', False, '/', 'included')
+        order_included = order_data['order_included']
         if order_included:
             partner_erp_id = order_included[0].get('attributes', {}).get('erp_id')
 
@@ -216,12 +339,7 @@ class SyncWaterfitters(models.Model):
         PaymentTerm = self.env['account.payment.term'].sudo().with_context({'lang': 'it_IT'})
         payment_method_id = False
 
-        payment_elems = self._fetch_element(
-            "paymenttransactions",
-            f"filter[entityClass]=Oro\Bundle\OrderBundle\Entity\Order&filter[entityIdentifier]={order_id}&page[number]=1&page[size]=10&sort=-createdAt",
-            False,
-            "?"
-        )
+        payment_elems = order_data['payment_elems']
 
         _logger.warning("**** ORDER PAYMENT ELEM ****")
         _logger.warning(f"{payment_elems}")
@@ -274,7 +392,7 @@ class SyncWaterfitters(models.Model):
         if shipping_add_data and 'type' in shipping_add_data and shipping_add_data['type'] == 'orderaddresses':
             shipping_add_id = shipping_add_data['id']
 
-            shipping_order_elem = self._fetch_element("orderaddresses", shipping_add_id)
+            shipping_order_elem = order_data['shipping_order_elem']
 
             _logger.warning(f"orderaddresses id: {shipping_add_id} - shipping_order_elem: {shipping_order_elem}")
 
@@ -303,8 +421,7 @@ class SyncWaterfitters(models.Model):
 
         order_create_date = order_attrs['createdAt'][0:10] if order_attrs['createdAt'] else now.strftime('%Y-%m-%d')
         order_elem_id = order_elem['id']
-        order_elem_year = order_create_date[2:4] if order_attrs['createdAt'] else now.strftime('%y')
-        order_name = 'OW' + order_elem_year + '/' + order_elem_id.zfill(5)
+        order_name = self._get_order_name(order_elem_id, order_attrs, now)
         codice_sigla = order_attrs['erp_id'] if order_attrs['erp_id'] and order_attrs['is_erp_exported'] else False
         odoo_order_id = self.env['sale.order'].search([('name', '=', order_name)], limit=1)
 
@@ -382,7 +499,6 @@ class SyncWaterfitters(models.Model):
                 'pricelist_id': pricelist
             })
 
-            self.env.cr.commit()
             _logger.warning(f"ORDER ELEM: {order_elem['id']} - ODOO ID: {odoo_order_id.id}")
 
             # Recupero righe ordine
@@ -399,6 +515,10 @@ class SyncWaterfitters(models.Model):
 
             lines_total_to_be_rounded = 0.0
 
+            # All the line values are built first and created at once, the order is committed only when complete
+            SaleOrderLine = self.env['sale.order.line']
+            order_lines_vals = []
+
             # Calculate the shipping costs for the order
             try:
                 shipping_price = order_attrs[
@@ -408,9 +528,10 @@ class SyncWaterfitters(models.Model):
                 shipping_price = 0
 
             if order_lines_data:
-                order_lines_dict = self._fetch_paginated_data(f"orderlineitems?filter[order]={order_elem_id}")
+                order_lines_dict = order_data['order_lines']
                 if order_lines_dict:
 
+                    lookups = self._prepare_order_lines_lookups(order_lines_dict, memo if memo is not None else {})
                     total_lines_gross_amount = 0.0
 
                     for order_line_dict in order_lines_dict:
@@ -422,8 +543,8 @@ class SyncWaterfitters(models.Model):
 
                         if 'productSku' in order_line_attrs and 'productName' in order_line_attrs:
 
-                            order_line_product_id = self.env['product.product'].search(
-                                [('default_code', '=', order_line_attrs['productSku'])], limit=1)
+                            order_line_product_id = lookups['products'].get(
+                                order_line_attrs['productSku'], self.env['product.product'])
 
                             if not order_line_product_id:
                                 _logger.warning(
@@ -431,11 +552,8 @@ class SyncWaterfitters(models.Model):
                             else:
 
                                 # Gestione valuta #
-                                currency_id = self.env['res.currency'].search(
-                                    [('name', '=', order_line_attrs['currency'])], limit=1)
-                                if not currency_id: currency_id = self.env['res.currency'].search(
-                                    [('id', '=', 1)],
-                                    limit=1)
+                                currency_id = lookups['currencies'].get(
+                                    order_line_attrs['currency'], lookups['currencies']['fallback'])
 
                                 # Gestione prezzo #
                                 try:
@@ -445,8 +563,8 @@ class SyncWaterfitters(models.Model):
 
                                 line_quantity = float(order_line_attrs['quantity'])
 
-                                # Creazione riga ordine #
-                                odoo_order_line_id = self.env['sale.order.line'].create({
+                                # Valori riga ordine #
+                                order_line_vals = {
                                     'order_id': odoo_order_id.id,
                                     'product_id': order_line_product_id.id,
                                     'product_uom_qty': line_quantity,
@@ -457,46 +575,43 @@ class SyncWaterfitters(models.Model):
                                     'wf_order_line_item_id': order_line_id,
                                     'discount': 0,
                                     'name': f"[{order_line_attrs['productSku']}] {order_line_attrs['productName']}",
-                                })
+                                }
 
-                                # Gestione prezzi per confezione
+                                # Gestione prezzi per confezione - pieces per pack as computed on a line of the product
                                 if 'productUnitCode' in order_line_attrs and order_line_attrs[
                                     'productUnitCode'] == 'pack':
                                     total_line_quantity = line_quantity
                                     pz_x_conf = 1.0
-                                    if odoo_order_line_id and odoo_order_line_id.x_studio_pzxconf:
+                                    line_pzxconf = SaleOrderLine.new({
+                                        'order_id': odoo_order_id.id, 'product_id': order_line_product_id.id
+                                    }).x_studio_pzxconf
+                                    if line_pzxconf:
                                         try:
-                                            pz_x_conf = float(odoo_order_line_id.x_studio_pzxconf)
+                                            pz_x_conf = float(line_pzxconf)
                                             total_line_quantity = line_quantity * pz_x_conf
                                         except Exception as e:
+                                            pz_x_conf = 1.0
                                             _logger.warning(
-                                                f'Unable to parse x_studio_pzxconf on order line {odoo_order_line_id.id}: {e}')
+                                                f'Unable to parse x_studio_pzxconf on order line {order_line_id}: {e}')
 
-                                    odoo_order_line_id.write({
+                                    order_line_vals.update({
                                         'product_uom_qty': total_line_quantity,
                                         'price_unit': (price / pz_x_conf),
                                         'discount': 0,
                                         'price_subtotal': price * line_quantity
                                     })
 
+                                order_lines_vals.append(order_line_vals)
                                 lines_total_to_be_rounded += price * line_quantity
 
                                 # Gestione lead time - come in azione server, verifica la data del product.template collegato alla riga d'ordine
 
                                 line_tmpl_id = order_line_product_id.product_tmpl_id
-                                internal_location_uid = 8
 
                                 if line_tmpl_id:
-                                    available_qty = sum(
-                                        q.available_quantity
-                                        for q in self.env['stock.quant'].search([
-                                            ('product_id', '=', odoo_order_line_id.product_id.id)
-                                        ])
-                                        if
-                                        q.location_id.id == internal_location_uid or q.location_id.location_id.id == internal_location_uid
-                                    )
-
-                                    if available_qty >= odoo_order_line_id.product_uom_qty:
+                                    available_qty = lookups['available_qty'].get(order_line_product_id.id, 0.0)
+
+                                    if available_qty >= order_line_vals['product_uom_qty']:
                                         cutoff = now.replace(hour=11, minute=0, second=0, microsecond=0)
                                         base_days = 3 if now > cutoff else 2
 
@@ -514,16 +629,12 @@ class SyncWaterfitters(models.Model):
                                     planned_date = add_business_days(now, base_days)
                                     planned_dates_list.append(planned_date)
 
-                                self.env.cr.commit()
                                 total_lines_gross_amount += price * line_quantity
 
-                                _logger.warning(
-                                    f'ORDER LINE SINGOLA: {order_line_dict} - {odoo_order_line_id.id}')
-
                     ### Calcolo riga di spese trasporto ###
 
                     if shipping_price and shipping_price > 0:
-                        odoo_shipping_line_id = self.env['sale.order.line'].create({
+                        order_lines_vals.append({
                             'order_id': odoo_order_id.id,
                             'name': _('TRANSPORTATION'),
                             'product_id': 963,
@@ -536,8 +647,6 @@ class SyncWaterfitters(models.Model):
 
                         lines_total_to_be_rounded += shipping_price
 
-                        self.env.cr.commit()
-
                     ### Calcolo riga residua di aggiornamento prezzo (Sconto!) ###
 
                     # Fallback in case it's not working
@@ -552,7 +661,7 @@ class SyncWaterfitters(models.Model):
                     if total_lines_gross_amount != discounted_subtotal:
                         discount_amount = discounted_subtotal - total_lines_gross_amount
 
-                        odoo_order_line_id = self.env['sale.order.line'].create({
+                        order_lines_vals.append({
                             'order_id': odoo_order_id.id,
                             'price_unit': discount_amount,
                             'name': _('EXTRA DISCOUNT'),
@@ -566,8 +675,6 @@ class SyncWaterfitters(models.Model):
 
                         lines_total_to_be_rounded += discount_amount
 
-                        self.env.cr.commit()
-
             ### ROUNDING LINE - START ###
             substotal_with_discounts = order_attrs.get("subtotalWithDiscounts", 0)
 
@@ -581,7 +688,7 @@ class SyncWaterfitters(models.Model):
 
                     # Solo se la differenza è significativa
                     if abs(diff_amount) >= 0.005:
-                        self.env['sale.order.line'].create({
+                        order_lines_vals.append({
                             'order_id': odoo_order_id.id,
                             'product_id': 965,
                             'product_uom': 1,
@@ -591,18 +698,21 @@ class SyncWaterfitters(models.Model):
                             'sequence': 500,
                             'x_studio_data_richiesta': ship_until,  # TODO: Studio field, to be reviewed
                         })
-                        self.env.cr.commit()
 
             except Exception as e:
                 _logger.error(f'Could not verify the totals for order {odoo_order_id.id}: {e}, values might be unbalanced')
 
             ### ROUNDING LINE - STOP ###
 
-            ### SET THE SHIPPING DATE FOR EACH LINE - START ###
+            ### SET THE SHIPPING DATE FOR EACH LINE, THEN CREATE ALL THE LINES - START ###
             latest_date = max(planned_dates_list) if planned_dates_list else None
-            if latest_date: self.env['sale.order.line'].search([('order_id', '=', odoo_order_id.id)]).write({
-                'x_studio_data_spedizione_confermata': latest_date.strftime('%Y-%m-%d')
-            })
+            if latest_date:
+                for order_line_vals in order_lines_vals:
+                    order_line_vals['x_studio_data_spedizione_confermata'] = latest_date.strftime('%Y-%m-%d')
+
+            if order_lines_vals:
+                odoo_order_line_ids = SaleOrderLine.create(order_lines_vals)
+                _logger.warning(f'ORDER LINES: {odoo_order_id.id} - {odoo_order_line_ids.ids}')
 
             # Rounding the grand total
             order_total_value = order_attrs.get('totalValue')
@@ -621,7 +731,7 @@ class SyncWaterfitters(models.Model):
             self.env.cr.commit()
             _logger.warning(f"Sale order {odoo_order_id.display_name} ({odoo_order_id.id}) confirmed.")
 
-            ### SET THE SHIPPING DATE FOR EACH LINE - STOP ###
+            ### SET THE SHIPPING DATE FOR EACH LINE, THEN CREATE ALL THE LINES - STOP ###
 
             ### PATCH THE ORIGINAL WATERFITTERS ORDER - START ###
             patch_payload = {
@@ -636,8 +746,9 @@ class SyncWaterfitters(models.Model):
                 }
             }
 
+            # The run can outlast the token passed by orders(): the cached one is refreshed when expired
             patch_response = self._wf_payload_request(
-                'orders', patch_payload, token, 'PATCH', order_elem_id
+                'orders', patch_payload, self._wf_get_token() or token, 'PATCH', order_elem_id
             )
             _logger.info(_(f'Order PATCH payload: {patch_payload}'))
             _logger.info(_(f'Order PATCH response: {patch_response}'))
@@ -648,6 +759,7 @@ class SyncWaterfitters(models.Model):
 
     def orders(self, sync_from_datetime=False):
 
+        self._wf_reset_stats()
         token = self._wf_get_token()
         if not token:
             _logger.error(_('Unable to obtain a token - Cannot proceed'))
@@ -656,14 +768,115 @@ class SyncWaterfitters(models.Model):
         now = datetime.datetime.now()
         now_string = now.strftime('%d/%m/%Y')
 
-        if not sync_from_datetime: sync_from_datetime = now - datetime.timedelta(hours=4)
+        # Orders not imported yet (too recent, unpaid, unknown customer...) are retried for 4 hours, as before
+        retry_from = now - datetime.timedelta(hours=4)
+        SyncState = self.env['wf.sync.state']
+        sync_state = SyncState._get_state('orders')
+
+        if not sync_from_datetime: sync_from_datetime = sync_state.last_sync_date or retry_from
         sync_from_iso = sync_from_datetime.strftime('%Y-%m-%dT%H:%M:%SZ')
 
-        order_data = self._fetch_paginated_data("orders", sync_from_iso)
+        # The orders list pages carry the sideloaded customer, shipping address and line items
+        pagination_state = {}
+        prefetched_orders = {
+            str(element.get('id')): (element, included)
+            for element, included in self._wf_iter_paginated(
+                "orders", token, f"&filter[createdAt][gte]={sync_from_iso}", include=WF_ORDER_INCLUDE,
+                pagination_state=pagination_state
+            )
+        }
+        order_data = [
+            {'id': element.get('id'), 'attributes': element.get('attributes')}
+            for element, _included in prefetched_orders.values()
+        ] if pagination_state['complete'] else None
 
         if order_data:
-            order_ids = [element['id'] for element in order_data if 'id' in element]
-            for order_id in order_ids: self.order(token, order_id)
+            seen_remote_ids = sync_state._get_seen_remote_ids()
+            SaleOrder = self.env['sale.order']
+
+            # Skip the orders already seen or already in Odoo before any detail fetch
+            new_orders = {
+                self._get_order_name(element['id'], element.get('attributes') or {}, now): element
+                for element in order_data if 'id' in element and str(element['id']) not in seen_remote_ids
+            }
+            existing_names = set(SaleOrder.search([('name', 'in', list(new_orders))]).mapped('name'))
+
+            order_ids = [element['id'] for name, element in new_orders.items() if name not in existing_names]
+            self._import_orders(token, order_ids, prefetched_orders)
+
+            # Move the watermark forward, but not past the oldest order still to be imported
+            imported_names = set(SaleOrder.search([('name', 'in', list(new_orders))]).mapped('name'))
+            created_at_by_id = {
+                str(element['id']): (element.get('attributes') or {}).get('createdAt') for element in order_data
+            }
+            pending_dates = []
+            for name, element in new_orders.items():
+                if name in imported_names: seen_remote_ids[str(element['id'])] = created_at_by_id[str(element['id'])]
+                else: pending_dates.append(SyncState._parse_wf_datetime(created_at_by_id[str(element['id'])]))
+
+            fetched_dates = [d for d in map(SyncState._parse_wf_datetime, created_at_by_id.values()) if d]
+            new_sync_from = max(fetched_dates + [sync_from_datetime])
+            pending_dates = [d for d in pending_dates if d]
+            if pending_dates: new_sync_from = min(max(min(pending_dates), retry_from), new_sync_from)
+
+            last_remote_id = max(created_at_by_id, key=lambda remote_id: created_at_by_id[remote_id] or '')
+            sync_state._save_sync_state(new_sync_from, seen_remote_ids, last_remote_id)
+            self.env.cr.commit()
+
+        self._wf_log_stats('orders sync')
+
+    def _import_orders(self, token, order_ids, prefetched_orders=None):
+        connection_data = self._get_connection_data()
+        try: concurrency = int(connection_data.get('orders_concurrency') or 1)
+        except (TypeError, ValueError): concurrency = 1
+        concurrency = min(max(concurrency, 1), WF_POOL_MAXSIZE)
+        memo = {}
+        prefetched_orders = prefetched_orders or {}
+
+        def fetch_order_data(order_id):
+            order_elem, included = prefetched_orders.get(str(order_id), (False, None))
+            return self._fetch_order_data(order_id, connection_data, order_elem, included)
+
+        if concurrency == 1 or len(order_ids) < 2:
+            for order_id in order_ids:
+                try:
+                    order_data = fetch_order_data(order_id)
+                except Exception as e:
+                    _logger.error(f"Sync Waterfitters - Unable to fetch order {order_id}: {e}")
+                    continue
+                self._import_order(token, order_id, order_data, memo)
+            return
+
+        # Pipeline: the remote fetches run on the pool, the ORM writes stay on the cron cursor in order.
+        # At most 2 x concurrency orders are fetched ahead of the one being written.
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='wf_orders') as executor:
+            pending = deque()
+            order_ids_iter = iter(order_ids)
+
+            def submit_next():
+                order_id = next(order_ids_iter, None)
+                if order_id is None: return
+                pending.append((order_id, executor.submit(fetch_order_data, order_id)))
+
+            for _i in range(concurrency * 2): submit_next()
+
+            while pending:
+                order_id, future = pending.popleft()
+                submit_next()
+                try:
+                    order_data = future.result()
+                except Exception as e:
+                    _logger.error(f"Sync Waterfitters - Unable to fetch order {order_id}: {e}")
+                    continue
+                self._import_order(token, order_id, order_data, memo)
+
+    # An order is committed as a whole by order(): on failure its partial writes are discarded
+    def _import_order(self, token, order_id, order_data=None, memo=None):
+        try:
+            self.order(token, order_id, order_data, memo)
+        except Exception as e:
+            self.env.cr.rollback()
+            _logger.error(f"Sync Waterfitters - Order {order_id} not imported, changes rolled back: {e}")
 
     def products(self, start_date_str=False):
         product_data = self._fetch_paginated_data("products", start_date_str)
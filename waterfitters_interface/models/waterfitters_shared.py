@@ -4,22 +4,97 @@
 from odoo import _, models, fields, api
 from odoo.exceptions import UserError
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 import requests
+import threading
 import logging
+import time
 
 _logger = logging.getLogger(__name__)
 
+# Connect / read timeout (seconds) for every Waterfitters call
+WF_REQUEST_TIMEOUT = (10, 60)
+# Max keep-alive connections per host, also the upper bound for concurrent fetches
+WF_POOL_MAXSIZE = 16
+# A failing page is fetched again this many times before the pagination stops on it
+WF_PAGE_RETRIES = 2
+
+# Shared transport: keep-alive pool, bounded retries with backoff on 429/5xx.
+# POST is left out of the retried methods to avoid duplicated resources on the remote side.
+_wf_session = None
+_wf_session_lock = threading.Lock()
+_wf_stats = {'requests': 0, 'errors': 0, 'elapsed': 0.0}
+_wf_stats_lock = threading.Lock()
+
+# OAuth2 tokens shared by all syncs of the process, keyed by (endpoints_url, client_id).
+# A token is refreshed WF_TOKEN_REFRESH_MARGIN seconds before its expires_in runs out.
+WF_TOKEN_REFRESH_MARGIN = 60
+WF_TOKEN_DEFAULT_LIFETIME = 3600
+_wf_token_cache = {}
+_wf_token_lock = threading.Lock()
+
+
+def _get_wf_session():
+    global _wf_session
+    if _wf_session is None:
+        with _wf_session_lock:
+            if _wf_session is None:
+                retry = Retry(
+                    total=3, connect=3, read=3, backoff_factor=0.5,
+                    status_forcelist=(429, 500, 502, 503, 504),
+                    allowed_methods=frozenset(['GET', 'PUT', 'PATCH', 'DELETE', 'HEAD', 'OPTIONS']),
+                    respect_retry_after_header=True, raise_on_status=False
+                )
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=WF_POOL_MAXSIZE, max_retries=retry)
+                session = requests.Session()
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _wf_session = session
+    return _wf_session
+
+
 class WaterfittersShared(models.AbstractModel):
     _name = "waterfitters.shared"
 
+    ### HTTP TRANSPORT ###
+    def _wf_request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', WF_REQUEST_TIMEOUT)
+        start = time.monotonic()
+        response = None
+        try:
+            response = _get_wf_session().request(method, url, **kwargs)
+            return response
+        finally:
+            with _wf_stats_lock:
+                _wf_stats['requests'] += 1
+                _wf_stats['elapsed'] += time.monotonic() - start
+                if response is None or response.status_code >= 400: _wf_stats['errors'] += 1
+
+    def _wf_reset_stats(self):
+        with _wf_stats_lock:
+            _wf_stats.update({'requests': 0, 'errors': 0, 'elapsed': 0.0})
+
+    def _wf_log_stats(self, run_name):
+        with _wf_stats_lock:
+            stats = dict(_wf_stats)
+        avg_ms = (stats['elapsed'] / stats['requests'] * 1000) if stats['requests'] else 0.0
+        _logger.info(
+            f"WF {run_name}: {stats['requests']} requests, {stats['errors']} errors, "
+            f"{stats['elapsed']:.2f}s total, {avg_ms:.0f}ms avg"
+        )
+        return stats
+
     def _get_connection_data(self):
         config = self.env['ir.config_parameter'].sudo()
         conn_data = {
             'client_id': config.get_param('waterfitters_client_id'),
             'client_secret': config.get_param('waterfitters_client_secret'),
             'endpoints_url': config.get_param('waterfitters_endpoints_url'),
-            'customers_batch_limit': config.get_param('waterfitters_customers_batch_limit', 50)
+            'customers_batch_limit': config.get_param('waterfitters_customers_batch_limit', 50),
+            'orders_concurrency': config.get_param('waterfitters_orders_concurrency', 4)
         }
 
         if not conn_data['client_id'] or not conn_data['client_secret'] or not conn_data['endpoints_url']:
@@ -27,8 +102,35 @@ class WaterfittersShared(models.AbstractModel):
 
         return conn_data
 
-    def _wf_get_token(self):
-        connection_data = self._get_connection_data()
+    def _wf_token_cache_key(self, connection_data=None):
+        connection_data = connection_data or self._get_connection_data()
+        return (connection_data['endpoints_url'].rstrip('/'), connection_data['client_id'])
+
+    def _wf_invalidate_token(self, connection_data=None):
+        with _wf_token_lock:
+            _wf_token_cache.pop(self._wf_token_cache_key(connection_data), None)
+
+    # If connection_data is passed no ORM access is done, e.g. from a worker thread
+    def _wf_get_token(self, force_refresh=False, connection_data=None):
+        connection_data = connection_data or self._get_connection_data()
+        cache_key = self._wf_token_cache_key(connection_data)
+
+        with _wf_token_lock:
+            cached = _wf_token_cache.get(cache_key)
+            if cached and not force_refresh and cached['expires_at'] > time.monotonic():
+                return cached['access_token']
+
+            access_token, expires_in = self._wf_fetch_token(connection_data)
+            if access_token:
+                _wf_token_cache[cache_key] = {
+                    'access_token': access_token,
+                    'expires_at': time.monotonic() + max(expires_in - WF_TOKEN_REFRESH_MARGIN, 0),
+                }
+            else:
+                _wf_token_cache.pop(cache_key, None)
+            return access_token
+
+    def _wf_fetch_token(self, connection_data):
         endpoints_url = connection_data['endpoints_url'].rstrip('/')
 
         url = f"{endpoints_url}/oauth2-token"
@@ -38,18 +140,25 @@ class WaterfittersShared(models.AbstractModel):
             "client_secret": connection_data['client_secret']
         }
         headers = {"Content-Type": "application/json", "Accept": "application/vnd.api+json"}
-        response = requests.post(url, json=payload, headers=headers)
+        try:
+            response = self._wf_request('POST', url, json=payload, headers=headers)
+        except requests.RequestException as e:
+            _logger.warning(f"Login Error: {url} --- {e}")
+            return None, 0
 
         if response.status_code == 200:
             token_data = response.json()
             access_token = token_data.get("access_token")
-            return access_token
+            try: expires_in = int(token_data.get("expires_in") or WF_TOKEN_DEFAULT_LIFETIME)
+            except (TypeError, ValueError): expires_in = WF_TOKEN_DEFAULT_LIFETIME
+            return access_token, expires_in
         else:
             _logger.warning(_(f"Login Error: {url} --- {response.status_code}, {response.text}"))
-            return None
+            return None, 0
 
-    def _wf_payload_request(self, model_name, payload, token, method = 'POST', url_parameters = None):
-        connection_data = self._get_connection_data()
+    # If connection_data is passed no ORM access is done, e.g. from a worker thread
+    def _wf_payload_request(self, model_name, payload, token, method = 'POST', url_parameters = None, connection_data = None):
+        connection_data = connection_data or self._get_connection_data()
         base_url = str(connection_data['endpoints_url']).rstrip('/')
 
         response = None
@@ -57,53 +166,124 @@ class WaterfittersShared(models.AbstractModel):
         if url_parameters: url = f"{url}/{url_parameters}"
         headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json", "Accept": "application/vnd.api+json"}
 
-        if method == 'POST': response = requests.post(url, json = payload, headers = headers)
-        if method == 'PUT': response = requests.put(url, json = payload, headers = headers)
-        if method == 'PATCH': response = requests.patch(url, json = payload, headers = headers)
+        try:
+            if method in ('POST', 'PUT', 'PATCH'): response = self._wf_request(method, url, json = payload, headers = headers)
+        except requests.RequestException as e:
+            _logger.error(f"WF Request failed: {url} --- {e}")
+            return {'code': False, 'json': False}
 
         _logger.info(f"WF Request URL: {url}")
         _logger.info(f"WF Response Status: {response.status_code}")
+        if response.status_code == 401: self._wf_invalidate_token(connection_data)
 
         try: response_json = response.json()
         except: response_json = False
 
         return {'code': response.status_code, 'json': response_json}
 
-    # TODO: to be left for future use
-    def _wf_get_paginated(self, model_name, token, filter_str=False, sort_str=False, page_dimension = False):
-        connection_data = self._get_connection_data()
+    ### STREAMING PAGINATION ###
+
+    # Pure HTTP, no ORM access: also runs in the prefetch thread
+    def _wf_fetch_page(self, url, token):
+        headers = {"Authorization": f"Bearer {token}", "Accept": "application/vnd.api+json"}
+        try:
+            response = self._wf_request('GET', url, headers=headers)
+        except requests.RequestException as e:
+            return None, str(e)
+
+        if response.status_code == 200:
+            try: return 200, response.json()
+            except ValueError as e: return None, str(e)
+        return response.status_code, response.text
+
+    # Yields (element, included) page by page, included being the page's sideloaded resources by (type, id).
+    # The next page is prefetched while the current one is consumed, a failing page is fetched again
+    # without restarting from page 1. pagination_state, if passed, is updated with the current 'page' and
+    # 'complete' (False if stopped on an error): the sync can be resumed from pagination_state['page'].
+    # If connection_data is passed no ORM access is done, e.g. from a worker thread.
+    def _wf_iter_paginated(self, model_uri, token=False, query_str='', page_dimension=False, include=False,
+                           start_page=1, prefetch=True, connection_data=False, pagination_state=None):
+
+        connection_data = connection_data or self._get_connection_data()
+        token = token or self._wf_get_token(connection_data=connection_data)
+        pagination_state = pagination_state if pagination_state is not None else {}
+        pagination_state.update({'page': start_page, 'complete': False})
+        if not token:
+            _logger.error(_('Unable to obtain a token - Cannot proceed'))
+            return
+
         base_url = str(connection_data['endpoints_url']).rstrip('/')
+        try: page_dimension = int(page_dimension or connection_data.get('customers_batch_limit') or 50)
+        except (TypeError, ValueError): page_dimension = 50
+        if page_dimension <= 0: page_dimension = 50
+
+        concatenator = '&' if '?' in model_uri else '?'
+        include_str = f"&include={include}" if include else ''
+
+        def page_url(page_number):
+            return f"{base_url}/admin/api/{model_uri}{concatenator}page[number]={page_number}&page[size]={page_dimension}{query_str}{include_str}"
+
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='wf_pages') if prefetch else None
+        next_page_future = None
+        page_number = start_page
+        retries = 0
+
+        try:
+            while True:
+                if next_page_future:
+                    status_code, page_json = next_page_future.result()
+                    next_page_future = None
+                else:
+                    status_code, page_json = self._wf_fetch_page(page_url(page_number), token)
 
-        page_dimension = page_dimension or connection_data['customers_batch_limit']
-        uri_sort_str = f"&sort={sort_str}" if sort_str else ''
-        uri_filter_str = f"&filter{filter_str}" if filter_str else ''
+                if status_code != 200:
+                    if status_code == 401:
+                        self._wf_invalidate_token(connection_data)
+                        token = self._wf_get_token(connection_data=connection_data)
 
-        get_next_page = True
-        next_page = 0
-        incoming_data = []
-        concatenator = '&' if '?' in model_name else '?'
+                    if token and retries < WF_PAGE_RETRIES:
+                        retries += 1
+                        time.sleep(retries)
+                        continue
 
-        while get_next_page:
+                    _logger.error(f"Error fetching {model_uri} - {page_url(page_number)} ({status_code}) {page_json}")
+                    return
 
-            next_page += 1
-            url = f"{base_url}/admin/api/{model_name}{concatenator}page[number]={next_page}&page[size]={page_dimension}{uri_sort_str}{uri_filter_str}"
-            headers = {"Authorization": f"Bearer {token}", "Accept": "application/vnd.api+json"}
-            response = requests.get(url, headers=headers)
+                retries = 0
+                page_data = page_json.get('data') or []
+                is_last_page = len(page_data) < page_dimension
+                if executor and not is_last_page:
+                    next_page_future = executor.submit(self._wf_fetch_page, page_url(page_number + 1), token)
 
-            if response.status_code == 200:
-                res_data = response.json().get('data', [])
+                included = {
+                    (elem.get('type'), str(elem.get('id'))): elem for elem in page_json.get('included') or []
+                }
+                for elem in page_data: yield elem, included
 
-                # Loop through the paginated requests until there's no more content
-                if not res_data: get_next_page = False
-                else:
-                    if len(res_data) < int(page_dimension or 0): get_next_page = False
-                    for elem in res_data: incoming_data.append({ 'id': elem.get('id'), 'element': elem})
+                if is_last_page:
+                    pagination_state['complete'] = True
+                    return
 
-            else:
-                _logger.error(f"Error fetching {model_name} - {url} ({response.status_code}) {response.text}")
-                return None
+                page_number += 1
+                pagination_state['page'] = page_number
 
-        return incoming_data
+        finally:
+            if executor: executor.shutdown(wait=False, cancel_futures=True)
+
+    def _wf_get_paginated(self, model_name, token, filter_str=False, sort_str=False, page_dimension = False):
+        uri_sort_str = f"&sort={sort_str}" if sort_str else ''
+        uri_filter_str = f"&filter{filter_str}" if filter_str else ''
+
+        # The list is returned only if complete, as the callers rely on it
+        pagination_state = {}
+        incoming_data = [
+            {'id': elem.get('id'), 'element': elem}
+            for elem, _included in self._wf_iter_paginated(
+                model_name, token, f"{uri_sort_str}{uri_filter_str}", page_dimension,
+                pagination_state=pagination_state
+            )
+        ]
+        return incoming_data if pagination_state['complete'] else None
 
     def _wf_get_element(self, model_name, model_id, token, post_model_str=False, join_model_string='/'):
 
@@ -114,10 +294,16 @@ class WaterfittersShared(models.AbstractModel):
         url = f"{base_url}/admin/api/{model_name}{join_model_string}{model_id}{uri_post_model_str}"
 
         headers = {"Authorization": f"Bearer {token}", "Accept": "application/vnd.api+json"}
-        response = requests.get(url, headers=headers)
+        try:
+            response = self._wf_request('GET', url, headers=headers)
+        except requests.RequestException as e:
+            _logger.error(f"Error fetching {model_name} - {url}: {e}")
+            return None
+
         if response.status_code == 200: return response.json().get('data', [])
 
         else:
+            if response.status_code == 401: self._wf_invalidate_token()
             _logger.error(f"Error fetching {model_name} - {url} ({response.status_code}) {response.text}")
             return None
 
@@ -0,0 +1,56 @@
+# Copyright 2025-TODAY Digiduu S.r.L. (www.digiduu.it)
+# License LGPL-3.0 or later (https://www.gnu.org/licenses/lgpl).
+
+from odoo import _, models, fields, api
+from datetime import datetime
+
+import json
+import logging
+
+_logger = logging.getLogger(__name__)
+
+WF_DATETIME_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+
+
+class WfSyncState(models.Model):
+    _name = "wf.sync.state"
+
+    # One record per synchronised entity (orders, customers, customerusers)
+    name = fields.Char(required=True)
+    last_sync_date = fields.Datetime('Sync from')
+    last_remote_id = fields.Char('Last processed Waterfitters ID')
+    # JSON dict {waterfitters id: createdAt/updatedAt} of the records processed since last_sync_date
+    seen_remote_ids = fields.Text('Recently seen Waterfitters IDs', default='{}')
+
+    _sql_constraints = [('name_unique', 'unique(name)', 'There can only be one sync state per entity.')]
+
+    @api.model
+    def _get_state(self, name):
+        state = self.sudo().search([('name', '=', name)], limit=1)
+        return state or self.sudo().create({'name': name})
+
+    @api.model
+    def _parse_wf_datetime(self, date_str):
+        try: return datetime.strptime(str(date_str), WF_DATETIME_FORMAT)
+        except (TypeError, ValueError): return False
+
+    def _get_seen_remote_ids(self):
+        self.ensure_one()
+        try: return json.loads(self.seen_remote_ids or '{}')
+        except ValueError:
+            _logger.warning(f'Invalid seen ids on Waterfitters sync state {self.name}, resetting them')
+            return {}
+
+    def _save_sync_state(self, sync_from, seen_remote_ids, last_remote_id=False):
+        self.ensure_one()
+
+        # Records older than the new watermark won't be fetched anymore, no need to remember them
+        sync_from_str = sync_from.strftime(WF_DATETIME_FORMAT)
+        seen_remote_ids = {
+            str(remote_id): timestamp for remote_id, timestamp in seen_remote_ids.items()
+            if timestamp and timestamp >= sync_from_str
+        }
+
+        vals = {'last_sync_date': sync_from, 'seen_remote_ids': json.dumps(seen_remote_ids)}
+        if last_remote_id: vals['last_remote_id'] = str(last_remote_id)
+        self.write(vals)